@@ -0,0 +1,6 @@
+// api/src/columns.js
+// Issue columns for list views: everything except raw_content and the embedding.
+export const ISSUE_LIST_COLUMNS = `
+  i.id, i.application_id, i.version_id, i.title, i.summary,
+  i.source_type, i.source_url, i.severity, i.issue_type,
+  i.upvotes, i.comment_count, i.source_date, i.created_at`;
@@ -0,0 +1,16 @@
+// api/src/content.js
+// Reads raw page text from the crawler's content store (issue_contents).
+import zlib from 'zlib';
+
+// The crawler writes zlib unless CONTENT_CODEC=zstd. Returns null for content
+// this Node version cannot decode: zstd needs zlib.zstdDecompressSync (Node
+// 22.15+) and dictionary-compressed rows can only be read by the crawler.
+export function decodeContent({ codec, dictionary_id, data }) {
+  if (codec === 'zlib') {
+    return zlib.inflateSync(data).toString('utf8');
+  }
+  if (codec === 'zstd' && dictionary_id == null && zlib.zstdDecompressSync) {
+    return zlib.zstdDecompressSync(data).toString('utf8');
+  }
+  return null;
+}
@@ -35,3 +35,23 @@ export async function queryOne(text, params) {
   const rows = await query(text, params);
   return rows[0] || null;
 }
+
+// Run a query with transaction-local settings (SET LOCAL), e.g. hnsw.ef_search
+export async function queryWithSettings(text, params, settings) {
+  const pool = await getPool();
+  const client = await pool.connect();
+  try {
+    await client.query('BEGIN');
+    for (const [name, value] of Object.entries(settings)) {
+      await client.query('SELECT set_config($1, $2, true)', [name, String(value)]);
+    }
+    const result = await client.query(text, params);
+    await client.query('COMMIT');
+    return result.rows;
+  } catch (err) {
+    await client.query('ROLLBACK');
+    throw err;
+  } finally {
+    client.release();
+  }
+}
@@ -4,13 +4,14 @@ import dotenv from 'dotenv';
 import applicationsRouter from './routes/applications.js';
 import issuesRouter from './routes/issues.js';
 import searchRouter from './routes/search.js';
+import trendsRouter from './routes/trends.js';
 
 dotenv.config();
 
 const app = express();
 const PORT = process.env.PORT || 3001;
 
-app.use(cors());
+app.use(cors({ exposedHeaders: ['X-Next-Cursor'] }));
 app.use(express.json());
 
 // Routes
@@ -21,6 +22,7 @@ app.get('/api/health', (req, res) => {
 app.use('/api/applications', applicationsRouter);
 app.use('/api/issues', issuesRouter);
 app.use('/api/search', searchRouter);
+app.use('/api/trends', trendsRouter);
 
 app.listen(PORT, () => {
   console.log(`API server running on http://localhost:${PORT}`);
@@ -0,0 +1,37 @@
+// api/src/lru.js
+// Small in-process LRU cache with optional time-to-live.
+
+export class LRUCache {
+  constructor({ max = 500, ttlMs = 0 } = {}) {
+    this.max = max;
+    this.ttlMs = ttlMs;
+    this.entries = new Map();
+  }
+
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      return undefined;
+    }
+    if (this.ttlMs && Date.now() > entry.expiresAt) {
+      this.entries.delete(key);
+      return undefined;
+    }
+    // Re-insert so Map iteration order tracks recency
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  set(key, value) {
+    this.entries.delete(key);
+    this.entries.set(key, { value, expiresAt: Date.now() + this.ttlMs });
+    if (this.entries.size > this.max) {
+      this.entries.delete(this.entries.keys().next().value);
+    }
+  }
+
+  clear() {
+    this.entries.clear();
+  }
+}
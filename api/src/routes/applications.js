@@ -1,21 +1,40 @@
 // api/src/routes/applications.js
 import { Router } from 'express';
 import { query, queryOne } from '../db.js';
+import { ISSUE_LIST_COLUMNS } from '../columns.js';
 
 const router = Router();
 
-// List all applications with issue counts
+const MAX_PAGE_SIZE = 100;
+
+// Keyset cursors are the last row's (created_at, id), base64url-encoded.
+// created_at travels as text to keep Postgres' microsecond precision.
+function encodeCursor(createdAt, id) {
+  return Buffer.from(JSON.stringify([createdAt, id])).toString('base64url');
+}
+
+function decodeCursor(cursor) {
+  try {
+    const [createdAt, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString());
+    return typeof createdAt === 'string' && typeof id === 'string' ? [createdAt, id] : null;
+  } catch {
+    return null;
+  }
+}
+
+// List all applications with issue counts (from the trigger-maintained
+// issue_counts rollup, see database/04_issue_rollups.sql)
 router.get('/', async (req, res) => {
   try {
     const apps = await query(`
       SELECT
         a.*,
-        COALESCE(SUM(CASE WHEN i.severity = 'critical' THEN 1 ELSE 0 END), 0)::int as critical_count,
-        COALESCE(SUM(CASE WHEN i.severity = 'major' THEN 1 ELSE 0 END), 0)::int as major_count,
-        COALESCE(SUM(CASE WHEN i.severity = 'minor' THEN 1 ELSE 0 END), 0)::int as minor_count,
-        COUNT(i.id)::int as total_issues
+        COALESCE(SUM(c.issue_count) FILTER (WHERE c.severity = 'critical'), 0)::int as critical_count,
+        COALESCE(SUM(c.issue_count) FILTER (WHERE c.severity = 'major'), 0)::int as major_count,
+        COALESCE(SUM(c.issue_count) FILTER (WHERE c.severity = 'minor'), 0)::int as minor_count,
+        COALESCE(SUM(c.issue_count), 0)::int as total_issues
       FROM applications a
-      LEFT JOIN issues i ON i.application_id = a.id
+      LEFT JOIN issue_counts c ON c.application_id = a.id
       GROUP BY a.id
       ORDER BY a.name
     `);
@@ -43,24 +62,44 @@ router.get('/:id', async (req, res) => {
   }
 });
 
-// Get issues for application
+// Get issues for application, newest first. Pass the X-Next-Cursor response
+// header back as ?cursor= to fetch the next page.
 router.get('/:id/issues', async (req, res) => {
   try {
-    const { severity } = req.query;
+    const { severity, cursor, limit } = req.query;
+    const parsedLimit = Math.min(Math.max(parseInt(limit) || MAX_PAGE_SIZE, 1), MAX_PAGE_SIZE);
+
     let queryText = `
-      SELECT * FROM issues
-      WHERE application_id = $1
+      SELECT ${ISSUE_LIST_COLUMNS}, i.created_at::text as cursor_created_at
+      FROM issues i
+      WHERE i.application_id = $1
     `;
     const params = [req.params.id];
 
     if (severity) {
-      queryText += ' AND severity = $2';
       params.push(severity);
+      queryText += ` AND i.severity = $${params.length}`;
+    }
+
+    if (cursor) {
+      const position = decodeCursor(cursor);
+      if (!position) {
+        return res.status(400).json({ error: 'Invalid cursor' });
+      }
+      params.push(...position);
+      queryText += ` AND (i.created_at, i.id) < ($${params.length - 1}::timestamp, $${params.length}::uuid)`;
     }
 
-    queryText += ' ORDER BY created_at DESC LIMIT 100';
+    params.push(parsedLimit);
+    queryText += ` ORDER BY i.created_at DESC, i.id DESC LIMIT $${params.length}`;
 
-    const issues = await query(queryText, params);
+    const rows = await query(queryText, params);
+    const issues = rows.map(({ cursor_created_at, ...issue }) => issue);
+
+    if (rows.length === parsedLimit) {
+      const last = rows[rows.length - 1];
+      res.set('X-Next-Cursor', encodeCursor(last.cursor_created_at, last.id));
+    }
     res.json(issues);
   } catch (err) {
     console.error('Error fetching issues:', err);
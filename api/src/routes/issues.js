@@ -1,22 +1,46 @@
 // api/src/routes/issues.js
 import { Router } from 'express';
 import { query, queryOne } from '../db.js';
+import { ISSUE_LIST_COLUMNS } from '../columns.js';
+import { decodeContent } from '../content.js';
 
 const router = Router();
 
+// Heavy columns only returned when requested, e.g. ?include=raw_content,embedding
+const OPTIONAL_COLUMNS = {
+  raw_content: `i.raw_content, c.codec as content_codec, c.dictionary_id as content_dictionary_id,
+    c.data as content_data`,
+  embedding: 'i.embedding::real[] as embedding'
+};
+
 // Get single issue
 router.get('/:id', async (req, res) => {
   try {
+    const include = (req.query.include || '').split(',').filter(c => Object.hasOwn(OPTIONAL_COLUMNS, c));
+    const columns = [ISSUE_LIST_COLUMNS, ...include.map(c => OPTIONAL_COLUMNS[c])].join(', ');
+
     const issue = await queryOne(
-      `SELECT i.*, a.name as application_name, a.vendor
+      `SELECT ${columns}, a.name as application_name, a.vendor
        FROM issues i
        JOIN applications a ON a.id = i.application_id
+       LEFT JOIN issue_contents c ON c.content_hash = i.content_hash
        WHERE i.id = $1`,
       [req.params.id]
     );
     if (!issue) {
       return res.status(404).json({ error: 'Issue not found' });
     }
+    if (include.includes('raw_content')) {
+      const { content_codec, content_dictionary_id, content_data, ...rest } = issue;
+      if (rest.raw_content == null && content_data) {
+        rest.raw_content = decodeContent({
+          codec: content_codec,
+          dictionary_id: content_dictionary_id,
+          data: content_data
+        });
+      }
+      return res.json(rest);
+    }
     res.json(issue);
   } catch (err) {
     console.error('Error fetching issue:', err);
@@ -36,9 +60,9 @@ router.post('/', async (req, res) => {
     }
 
     const issue = await queryOne(
-      `INSERT INTO issues (application_id, title, summary, severity, issue_type, source_type, source_url)
+      `INSERT INTO issues AS i (application_id, title, summary, severity, issue_type, source_type, source_url)
        VALUES ($1, $2, $3, $4, $5, $6, $7)
-       RETURNING *`,
+       RETURNING ${ISSUE_LIST_COLUMNS}`,
       [application_id, title, summary, severity, issue_type || null, 'manual', source_url || `manual-${Date.now()}`]
     );
     res.status(201).json(issue);
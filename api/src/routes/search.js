@@ -1,10 +1,22 @@
 // api/src/routes/search.js
 import { Router } from 'express';
-import { query } from '../db.js';
+import { query, queryWithSettings } from '../db.js';
+import { LRUCache } from '../lru.js';
+import {
+  EMBEDDING_MODEL, SEARCH_MODES, isUuid, hnswSettings, candidateCount,
+  semanticQuery, keywordQuery, hybridQuery
+} from '../search.js';
 import OpenAI from 'openai';
 
 const router = Router();
 
+// Query embeddings never change; result pages go stale as the crawler adds issues
+const embeddingCache = new LRUCache({ max: 1000 });
+const resultCache = new LRUCache({
+  max: 200,
+  ttlMs: parseInt(process.env.SEARCH_CACHE_TTL_MS) || 60000
+});
+
 let openai = null;
 
 function getOpenAIClient() {
@@ -16,38 +28,57 @@ function getOpenAIClient() {
   return openai;
 }
 
-// Search issues (semantic + keyword)
+async function getQueryEmbedding(q) {
+  const key = q.trim().toLowerCase();
+  let embedding = embeddingCache.get(key);
+  if (!embedding) {
+    const embeddingResponse = await getOpenAIClient().embeddings.create({
+      model: EMBEDDING_MODEL,
+      input: q
+    });
+    embedding = `[${embeddingResponse.data[0].embedding.join(',')}]`;
+    embeddingCache.set(key, embedding);
+  }
+  return embedding;
+}
+
+// Search issues (hybrid semantic + full-text, or either alone)
 router.get('/', async (req, res) => {
   try {
-    const { q, limit = 20 } = req.query;
+    const { q, limit = 20, mode = 'hybrid', application_id, severity, issue_type } = req.query;
 
     if (!q) {
       return res.status(400).json({ error: 'Query parameter q is required' });
     }
+    if (!SEARCH_MODES.includes(mode)) {
+      return res.status(400).json({ error: `mode must be one of ${SEARCH_MODES.join(', ')}` });
+    }
+    if (application_id && !isUuid(application_id)) {
+      return res.status(400).json({ error: 'application_id must be a UUID' });
+    }
 
-    // Generate embedding for query
-    const embeddingResponse = await getOpenAIClient().embeddings.create({
-      model: 'text-embedding-3-small',
-      input: q
-    });
-    const queryEmbedding = embeddingResponse.data[0].embedding;
-
-    // Semantic search with cosine similarity
     const parsedLimit = Math.min(Math.max(parseInt(limit) || 20, 1), 100);
+    const filterValues = { application_id, severity, issue_type };
+
+    const cacheKey = JSON.stringify([q.trim().toLowerCase(), mode, parsedLimit, application_id, severity, issue_type]);
+    const cached = resultCache.get(cacheKey);
+    if (cached) {
+      return res.json(cached);
+    }
 
-    const issues = await query(`
-      SELECT
-        i.*,
-        a.name as application_name,
-        a.vendor,
-        1 - (i.embedding <=> $1::vector) as similarity
-      FROM issues i
-      JOIN applications a ON a.id = i.application_id
-      WHERE i.embedding IS NOT NULL
-      ORDER BY i.embedding <=> $1::vector
-      LIMIT $2
-    `, [`[${queryEmbedding.join(',')}]`, parsedLimit]);
+    let issues;
+    if (mode === 'keyword') {
+      issues = await query(...keywordQuery(q, parsedLimit, filterValues));
+    } else if (mode === 'semantic') {
+      const [text, params] = semanticQuery(await getQueryEmbedding(q), parsedLimit, filterValues);
+      issues = await queryWithSettings(text, params, hnswSettings('semantic', parsedLimit, filterValues));
+    } else {
+      const [text, params] = hybridQuery(q, await getQueryEmbedding(q), parsedLimit, filterValues);
+      issues = await queryWithSettings(text, params,
+        hnswSettings('hybrid', candidateCount(parsedLimit), filterValues));
+    }
 
+    resultCache.set(cacheKey, issues);
     res.json(issues);
   } catch (err) {
     console.error('Error searching:', err);
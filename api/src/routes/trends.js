@@ -0,0 +1,38 @@
+// api/src/routes/trends.js
+import { Router } from 'express';
+import { query } from '../db.js';
+import { isUuid } from '../search.js';
+
+const router = Router();
+
+// Recent issue spikes found by the crawler's trend detector, e.g. ?hours=24&application_id=...
+router.get('/', async (req, res) => {
+  const { application_id } = req.query;
+  if (application_id && !isUuid(application_id)) {
+    return res.status(400).json({ error: 'application_id must be a UUID' });
+  }
+
+  try {
+    const hours = Math.min(Math.max(parseInt(req.query.hours, 10) || 24, 1), 24 * 30);
+    const params = [hours];
+    let sql = `
+      SELECT t.application_id, a.name as application_name, t.severity, t.issue_type,
+             t.bucket_start, t.observed, t.expected, t.zscore
+      FROM trend_alerts t
+      JOIN applications a ON a.id = t.application_id
+      WHERE t.bucket_start >= NOW() - make_interval(hours => $1)
+    `;
+    if (application_id) {
+      params.push(application_id);
+      sql += ` AND t.application_id = $${params.length}`;
+    }
+    sql += ' ORDER BY t.bucket_start DESC, t.zscore DESC LIMIT 100';
+
+    res.json(await query(sql, params));
+  } catch (err) {
+    console.error('Error fetching trends:', err);
+    res.status(500).json({ error: 'Internal server error' });
+  }
+});
+
+export default router;
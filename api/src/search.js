@@ -0,0 +1,146 @@
+// api/src/search.js
+// SQL for /api/search. Kept free of the pool and the OpenAI client so the
+// query builders can be tested on their own.
+import { ISSUE_LIST_COLUMNS } from './columns.js';
+
+// Must match the crawler's embedding model so the query vector and the
+// per-model partial HNSW index (see database/03_embedding_models.sql) agree.
+export const EMBEDDING_MODEL = 'text-embedding-3-small';
+export const EMBEDDING_DIMENSION = 1536;
+
+// Reciprocal rank fusion constant and per-ranker candidate pool size
+export const RRF_K = 60;
+const MIN_CANDIDATES = 50;
+
+export const SEARCH_MODES = ['hybrid', 'semantic', 'keyword'];
+
+// hnsw.ef_search per search mode; tune with `python main.py index bench`.
+// Never below the number of rows a scan must return.
+const EF_SEARCH = {
+  semantic: parseInt(process.env.HNSW_EF_SEARCH_SEMANTIC) || 100,
+  hybrid: parseInt(process.env.HNSW_EF_SEARCH_HYBRID) || 64
+};
+
+// HNSW applies WHERE clauses after the index scan, so a selective filter can
+// leave fewer than `limit` rows. Filtered scans start wider and, on pgvector
+// 0.8+, keep scanning the graph until enough rows pass (bounded by
+// hnsw.max_scan_tuples, 20000 by default); past that bound a very selective
+// filter can still return fewer rows than asked for.
+const FILTERED_EF_SEARCH_FACTOR = 4;
+
+const UUID_PATTERN = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+
+export function isUuid(value) {
+  return typeof value === 'string' && UUID_PATTERN.test(value);
+}
+
+const RESULT_COLUMNS = `${ISSUE_LIST_COLUMNS},
+  a.name as application_name, a.vendor`;
+
+// Same expression as idx_issues_fulltext so the GIN index is used
+const TSVECTOR = `to_tsvector('english', i.title || ' ' || i.summary)`;
+const DISTANCE = `i.embedding::vector(${EMBEDDING_DIMENSION}) <=> $1::vector(${EMBEDDING_DIMENSION})`;
+
+function hasFilters({ application_id, severity, issue_type }) {
+  return Boolean(application_id || severity || issue_type);
+}
+
+// Build AND clauses for the optional filters, appending their values to params
+export function buildFilters({ application_id, severity, issue_type }, params) {
+  let clauses = '';
+  if (application_id) {
+    params.push(application_id);
+    clauses += ` AND i.application_id = $${params.length}`;
+  }
+  if (severity) {
+    params.push(severity);
+    clauses += ` AND i.severity = $${params.length}`;
+  }
+  if (issue_type) {
+    params.push(issue_type);
+    clauses += ` AND i.issue_type = $${params.length}`;
+  }
+  return clauses;
+}
+
+// Rank both ways with the filters applied inside each scan, then fuse the
+// two rankings with reciprocal rank fusion.
+export function candidateCount(limit) {
+  return Math.max(limit * 2, MIN_CANDIDATES);
+}
+
+// Transaction-local settings for a vector scan that must return `rows` rows
+export function hnswSettings(mode, rows, filterValues) {
+  const efSearch = Math.max(EF_SEARCH[mode], rows);
+  if (!hasFilters(filterValues)) {
+    return { 'hnsw.ef_search': efSearch };
+  }
+  return {
+    'hnsw.ef_search': Math.min(efSearch * FILTERED_EF_SEARCH_FACTOR, 1000),
+    'hnsw.iterative_scan': 'strict_order'
+  };
+}
+
+export function semanticQuery(embedding, limit, filterValues) {
+  const params = [embedding, limit];
+  const filters = buildFilters(filterValues, params);
+  return [`
+    SELECT ${RESULT_COLUMNS}, 1 - (${DISTANCE}) as similarity
+    FROM issues i
+    JOIN applications a ON a.id = i.application_id
+    WHERE i.embedding_model = '${EMBEDDING_MODEL}'${filters}
+    ORDER BY ${DISTANCE}
+    LIMIT $2
+  `, params];
+}
+
+export function keywordQuery(q, limit, filterValues) {
+  const params = [q, limit];
+  const filters = buildFilters(filterValues, params);
+  return [`
+    SELECT ${RESULT_COLUMNS}, ts_rank_cd(${TSVECTOR}, tsq) as score
+    FROM issues i
+    JOIN applications a ON a.id = i.application_id,
+      websearch_to_tsquery('english', $1) tsq
+    WHERE ${TSVECTOR} @@ tsq${filters}
+    ORDER BY score DESC
+    LIMIT $2
+  `, params];
+}
+
+export function hybridQuery(q, embedding, limit, filterValues) {
+  const params = [embedding, q, candidateCount(limit), limit];
+  const filters = buildFilters(filterValues, params);
+  return [`
+    WITH semantic AS (
+      SELECT id, ROW_NUMBER() OVER (ORDER BY distance) as rank
+      FROM (
+        SELECT i.id, ${DISTANCE} as distance
+        FROM issues i
+        WHERE i.embedding_model = '${EMBEDDING_MODEL}'${filters}
+        ORDER BY ${DISTANCE}
+        LIMIT $3
+      ) s
+    ),
+    keyword AS (
+      SELECT id, ROW_NUMBER() OVER (ORDER BY score DESC) as rank
+      FROM (
+        SELECT i.id, ts_rank_cd(${TSVECTOR}, tsq) as score
+        FROM issues i, websearch_to_tsquery('english', $2) tsq
+        WHERE ${TSVECTOR} @@ tsq${filters}
+        ORDER BY score DESC
+        LIMIT $3
+      ) k
+    )
+    SELECT ${RESULT_COLUMNS},
+      COALESCE(1.0 / (${RRF_K} + s.rank), 0) + COALESCE(1.0 / (${RRF_K} + k.rank), 0) as score,
+      s.rank as semantic_rank,
+      k.rank as keyword_rank
+    FROM semantic s
+    FULL OUTER JOIN keyword k ON k.id = s.id
+    JOIN issues i ON i.id = COALESCE(s.id, k.id)
+    JOIN applications a ON a.id = i.application_id
+    ORDER BY score DESC
+    LIMIT $4
+  `, params];
+}
@@ -0,0 +1,75 @@
+// api/tests/search.test.js
+import { test } from 'node:test';
+import assert from 'node:assert/strict';
+import {
+  EMBEDDING_MODEL, EMBEDDING_DIMENSION, RRF_K, isUuid, buildFilters, hnswSettings,
+  candidateCount, hybridQuery
+} from '../src/search.js';
+
+test('isUuid accepts UUIDs only', () => {
+  assert.ok(isUuid('4f8b2c1e-9a3d-4e5f-8b7a-1c2d3e4f5a6b'));
+  assert.ok(!isUuid('not-a-uuid'));
+  assert.ok(!isUuid('4f8b2c1e9a3d4e5f8b7a1c2d3e4f5a6b'));
+  assert.ok(!isUuid(['4f8b2c1e-9a3d-4e5f-8b7a-1c2d3e4f5a6b']));
+});
+
+test('buildFilters numbers placeholders after the existing params', () => {
+  const params = ['[0.1]', 'query'];
+  const clauses = buildFilters({ severity: 'major', issue_type: 'crash' }, params);
+
+  assert.equal(clauses, ' AND i.severity = $3 AND i.issue_type = $4');
+  assert.deepEqual(params, ['[0.1]', 'query', 'major', 'crash']);
+});
+
+test('hybridQuery applies the filters inside both rankers', () => {
+  const [text, params] = hybridQuery('crash on open', '[0.1]', 10, { application_id: 'app' });
+
+  assert.deepEqual(params, ['[0.1]', 'crash on open', candidateCount(10), 10, 'app']);
+  assert.equal(text.match(/AND i\.application_id = \$5/g).length, 2);
+  assert.match(text, new RegExp(`1\\.0 / \\(${RRF_K} \\+ s\\.rank\\)`));
+  assert.match(text, /FULL OUTER JOIN keyword/);
+});
+
+test('hnswSettings widens and iterates filtered scans', () => {
+  assert.deepEqual(hnswSettings('semantic', 20, {}), { 'hnsw.ef_search': 100 });
+
+  const filtered = hnswSettings('semantic', 20, { severity: 'critical' });
+  assert.equal(filtered['hnsw.ef_search'], 400);
+  assert.equal(filtered['hnsw.iterative_scan'], 'strict_order');
+});
+
+// Runs the fused query against a real database; every row is rolled back.
+test('hybrid search ranks issues found by both rankers first', { skip: !process.env.DATABASE_URL }, async () => {
+  const { getPool } = await import('../src/db.js');
+  const vector = (x) => `[${Array.from({ length: EMBEDDING_DIMENSION }, (_, i) => (i === 0 ? x : 0.001))}]`;
+  const client = await (await getPool()).connect();
+  try {
+    await client.query('BEGIN');
+    const { rows: [app] } = await client.query(
+      `INSERT INTO applications (name) VALUES ('RRF test app') RETURNING id`
+    );
+    const insert = (title, summary, x) => client.query(`
+      INSERT INTO issues (application_id, title, summary, source_type, source_url, severity,
+                          embedding, embedding_model, embedding_dim)
+      VALUES ($1, $2, $3, 'test', $4, 'minor', $5::vector, $6, $7)
+      RETURNING id
+    `, [app.id, title, summary, `https://example.com/${title}`, vector(x), EMBEDDING_MODEL, EMBEDDING_DIMENSION]);
+
+    const both = (await insert('printer spooler hang', 'The printer spooler hangs', 1.0)).rows[0].id;
+    const semanticOnly = (await insert('queue frozen', 'Jobs never leave the queue', 0.9)).rows[0].id;
+    const keywordOnly = (await insert('printer spooler', 'Unrelated printer spooler note', -1.0)).rows[0].id;
+
+    const [text, params] = hybridQuery('printer spooler', vector(1.0), 10, { application_id: app.id });
+    const { rows } = await client.query(text, params);
+
+    assert.equal(rows[0].id, both);
+    assert.ok(rows[0].semantic_rank && rows[0].keyword_rank);
+    // Found by one ranker only: still returned, with no keyword rank
+    const queueRow = rows.find((r) => r.id === semanticOnly);
+    assert.equal(queueRow.keyword_rank, null);
+    assert.ok(rows.some((r) => r.id === keywordOnly));
+  } finally {
+    await client.query('ROLLBACK');
+    client.release();
+  }
+});
@@ -1,7 +1,17 @@
 import click
+from datetime import datetime, timedelta
 from src.db import Database
-from src.repositories import ApplicationRepository
-from src.crawler import Crawler
+from src.repositories import ApplicationRepository, RollupRepository, FeedSourceRepository
+from src.embeddings import get_embedding_provider, EMBEDDING_MODEL
+from src.reembed import Reembedder
+from src.content_store import ContentStore
+from src.partitions import PartitionManager
+from src.trends import TrendDetector
+from src.vector_index import VectorIndexManager, DEFAULT_M, DEFAULT_EF_CONSTRUCTION
+
+# The crawler (LLM and HTTP clients) and clustering (numpy) are imported inside
+# the commands that use them, so cron jobs like list-apps start quickly.
+# Check with: python -X importtime -c "import main"
 
 @click.group()
 def cli():
@@ -10,24 +20,126 @@ def cli():
 
 @cli.command()
 @click.option('--app', 'app_name', help='Crawl specific application by name')
-def crawl(app_name: str | None):
+@click.option('--llm', 'llm_provider', default='anthropic',
+              type=click.Choice(['anthropic', 'anthropic-cached']),
+              help='LLM provider mode used for classification')
+@click.option('--embeddings', 'embedding_provider', type=click.Choice(['openai', 'local']),
+              help='Embedding backend (default: EMBEDDING_PROVIDER or openai)')
+@click.option('--feeds-only', is_flag=True, help='Only poll feed sources, skip paid web search')
+@click.option('--spool', 'spool_path', type=click.Path(dir_okay=False),
+              help='Write issues to this local spool first and load them in the background')
+def crawl(app_name: str | None, llm_provider: str, embedding_provider: str | None, feeds_only: bool,
+          spool_path: str | None):
     """Crawl sources for IT issues."""
-    db = Database()
+    from src.crawler import Crawler
+
+    # With a spool the crawl starts even if the database is down; the
+    # loader ensures the partitions before it inserts
+    db = Database(connect=not spool_path)
+    spool, loader = _open_spool(spool_path)
+    crawler = None
     try:
-        crawler = Crawler(db)
+        if not spool:
+            PartitionManager(db).ensure()
+        crawler = Crawler(db, llm_provider=llm_provider, embedding_provider=embedding_provider, spool=spool)
 
         if app_name:
-            # Find app by name
-            apps = ApplicationRepository(db).list_all()
-            app = next((a for a in apps if a['name'].lower() == app_name.lower()), None)
+            app = crawler.find_app(app_name)
             if not app:
                 click.echo(f"Application not found: {app_name}")
                 return
-            count = crawler.crawl_application(app['id'])
+            count = crawler.crawl_application(app['id'], search=not feeds_only)
         else:
-            count = crawler.crawl_all()
+            count = crawler.crawl_all(search=not feeds_only)
 
         click.echo(f"\nDone! Added {count} new issues.")
+
+        stats = getattr(crawler.llm, 'cache_stats', None)
+        if stats and stats.requests:
+            click.echo(
+                f"LLM requests: {stats.requests}, prompt cache hit rate: {stats.hit_rate:.0%} "
+                f"({stats.cache_read_input_tokens} cached input tokens)"
+            )
+    finally:
+        if crawler:
+            crawler.close()
+        _close_spool(spool, loader)
+        db.close()
+
+def _open_spool(spool_path: str | None):
+    """Open a spool and start its background loader (on its own connection)."""
+    if not spool_path:
+        return None, None
+    from src.spool import IssueSpool, SpoolLoader
+
+    spool = IssueSpool(spool_path)
+    loader = SpoolLoader(Database(connect=False), spool_path, spool=spool)
+    loader.start()
+    return spool, loader
+
+def _close_spool(spool, loader) -> None:
+    if loader:
+        loader.stop()
+        loader.db.close()
+    if spool:
+        spool.close()
+
+@cli.command()
+@click.option('--llm', 'llm_provider', default='anthropic',
+              type=click.Choice(['anthropic', 'anthropic-cached']),
+              help='LLM provider mode used for classification')
+@click.option('--embeddings', 'embedding_provider', type=click.Choice(['openai', 'local']),
+              help='Embedding backend (default: EMBEDDING_PROVIDER or openai)')
+@click.option('--min-interval', default=15, show_default=True, help='Minutes between crawls of the busiest apps')
+@click.option('--max-interval', default=1440, show_default=True, help='Minutes between crawls of quiet apps')
+@click.option('--status-port', default=8765, show_default=True, type=int,
+              help='Local port for the JSON status endpoint (0 picks a free port)')
+@click.option('--spool', 'spool_path', type=click.Path(dir_okay=False),
+              help='Write issues to this local spool first and load them in the background')
+def serve(llm_provider: str, embedding_provider: str | None, min_interval: int, max_interval: int,
+          status_port: int, spool_path: str | None):
+    """Run the crawler as a daemon, scheduling each app by how productive it is."""
+    import httpx
+    from src.crawler import Crawler
+    from src.daemon import CrawlDaemon
+    from src.scheduler import CrawlScheduler
+
+    db = Database(connect=not spool_path)
+    http_client = httpx.Client(timeout=15.0)
+    spool, loader = _open_spool(spool_path)
+    crawler = None
+    try:
+        crawler = Crawler(db, llm_provider=llm_provider, embedding_provider=embedding_provider,
+                          http_client=http_client, spool=spool)
+        scheduler = CrawlScheduler(min_interval=min_interval * 60, max_interval=max_interval * 60)
+        daemon = CrawlDaemon(db, crawler, scheduler, status_port=status_port)
+        daemon.install_signal_handlers()
+        daemon.run()
+    finally:
+        if crawler:
+            crawler.close()
+        _close_spool(spool, loader)
+        http_client.close()
+        db.close()
+
+@cli.command('load-spool')
+@click.option('--spool', 'spool_path', required=True, type=click.Path(exists=True, dir_okay=False),
+              help='Spool file written by crawl/serve --spool')
+@click.option('--batch-size', default=100, show_default=True, help='Issues per committed batch')
+@click.option('--truncate', is_flag=True, help='Empty the spool once fully loaded (no crawler may be writing)')
+def load_spool(spool_path: str, batch_size: int, truncate: bool):
+    """Load spooled issues into the database, skipping ones already stored."""
+    from src.spool import SpoolLoader
+
+    db = Database()
+    try:
+        PartitionManager(db).ensure()
+        loader = SpoolLoader(db, spool_path, batch_size=batch_size)
+        count = loader.load()
+        click.echo(f"Loaded {count} issues from {spool_path}.")
+        if truncate:
+            loader.truncate()
+            click.echo("Spool truncated.")
     finally:
         db.close()
 
@@ -61,11 +173,310 @@ def add_app(name: str, vendor: str | None, keywords: str):
     db = Database()
     try:
         repo = ApplicationRepository(db)
+        existing = repo.get_by_name(name)
+        if existing:
+            click.echo(f"Application already exists: {existing['name']} (id: {existing['id']})")
+            return
         keyword_list = [k.strip() for k in keywords.split(',')]
         app = repo.create(name, vendor, keyword_list)
         click.echo(f"Added: {app['name']} (id: {app['id']})")
     finally:
         db.close()
 
+@cli.command('add-feed')
+@click.option('--app', 'app_name', required=True, help='Application the feed reports on')
+@click.option('--kind', required=True, type=click.Choice(['rss', 'reddit']), help='Feed format')
+@click.option('--url', required=True, help='Feed URL, e.g. a Reddit search .json listing')
+def add_feed(app_name: str, kind: str, url: str):
+    """Add an RSS/Atom or Reddit feed to poll for an application."""
+    db = Database()
+    try:
+        app = ApplicationRepository(db).get_by_name(app_name)
+        if not app:
+            click.echo(f"Application not found: {app_name}")
+            return
+        feed = FeedSourceRepository(db).create(app['id'], kind, url)
+        click.echo(f"Added {feed['kind']} feed for {app['name']} (id: {feed['id']})")
+    finally:
+        db.close()
+
+@cli.command('list-feeds')
+def list_feeds():
+    """List feed sources per application with their poll cursors."""
+    db = Database()
+    try:
+        feeds = FeedSourceRepository(db)
+        for app in ApplicationRepository(db).list_all():
+            for feed in feeds.list_by_application(app['id']):
+                polled = f"{feed['last_polled_at']:%Y-%m-%d %H:%M}" if feed['last_polled_at'] else "never"
+                click.echo(f"  {app['name']}  [{feed['kind']}] {feed['url']}  (polled: {polled})")
+    finally:
+        db.close()
+
+@cli.command()
+@click.option('--embeddings', 'embedding_provider', type=click.Choice(['openai', 'local']),
+              help='Embedding backend (default: EMBEDDING_PROVIDER or openai)')
+@click.option('--missing-only', is_flag=True, help='Only fill issues that have no embedding')
+@click.option('--after', 'after_id', help='Resume after this issue id')
+@click.option('--page-size', default=1000, show_default=True, help='Rows per committed page')
+@click.option('--batch-size', default=100, show_default=True, help='Texts per embedding request')
+def reembed(embedding_provider: str | None, missing_only: bool, after_id: str | None,
+            page_size: int, batch_size: int):
+    """Backfill missing embeddings or re-embed issues with a different model."""
+    db = Database()
+    try:
+        provider = get_embedding_provider(embedding_provider)
+        reembedder = Reembedder(db, provider, page_size=page_size, batch_size=batch_size)
+        count = reembedder.run(after_id=after_id, missing_only=missing_only)
+        click.echo(f"\nDone! Embedded {count} issues with {provider.model_name}.")
+    finally:
+        db.close()
+
+@cli.command('rebuild-rollups')
+def rebuild_rollups():
+    """Recompute the per-application issue count rollups from scratch."""
+    db = Database()
+    try:
+        RollupRepository(db).rebuild()
+        click.echo("Rollups rebuilt.")
+    finally:
+        db.close()
+
+@cli.command('migrate-content')
+@click.option('--page-size', default=500, show_default=True, help='Issues per committed page')
+def migrate_content(page_size: int):
+    """Move issues.raw_content into the compressed content store."""
+    db = Database()
+    try:
+        count = ContentStore(db).migrate_issues(page_size=page_size)
+        click.echo(f"\nDone! Migrated {count} issues.")
+        if count:
+            click.echo("Run VACUUM on issues (or pg_repack) to return the freed space.")
+    finally:
+        db.close()
+
+@cli.command('train-content-dict')
+@click.option('--sample', 'sample_size', default=2000, show_default=True, help='Documents to train on')
+def train_content_dict(sample_size: int):
+    """Train a zstd dictionary on stored page text for new content."""
+    db = Database()
+    try:
+        dictionary_id = ContentStore(db).train_dictionary(sample_size=sample_size)
+        click.echo(f"Trained content dictionary {dictionary_id}.")
+    finally:
+        db.close()
+
+@cli.command()
+@click.option('--out', 'out_dir', required=True, type=click.Path(file_okay=False),
+              help='Directory for application_id=.../month=.../*.parquet files')
+@click.option('--model', default=EMBEDDING_MODEL, show_default=True, help='Embedding model to export vectors for')
+@click.option('--full', is_flag=True, help='Export everything instead of only issues changed since the last run')
+@click.option('--row-group-size', default=10000, show_default=True, help='Most rows per Parquet row group')
+@click.option('--row-group-mb', default=64, show_default=True, help='Most buffered megabytes per Parquet row group')
+def export(out_dir: str, model: str, full: bool, row_group_size: int, row_group_mb: int):
+    """Export issues to Parquet for offline analytics (requires pyarrow)."""
+    from src.export import ParquetExporter, read_watermark
+
+    db = Database()
+    try:
+        watermark = None if full else read_watermark(out_dir)
+        if watermark is not None:
+            click.echo(f"Resuming from transaction {watermark}")
+        exporter = ParquetExporter(db, out_dir, embedding_model=model, row_group_size=row_group_size,
+                                   row_group_bytes=row_group_mb * 1024 * 1024, on_progress=click.echo)
+        count = exporter.export(full=full)
+        click.echo(f"\nDone! Exported {count} issues to {out_dir}.")
+    finally:
+        db.close()
+
+@cli.command()
+@click.option('--app', 'app_name', help='Re-cluster one application (default: all)')
+@click.option('--model', default=EMBEDDING_MODEL, show_default=True, help='Embedding model to cluster on')
+@click.option('--threshold', type=float,
+              help='Minimum cosine similarity to join a cluster (default: 0.85)')
+def cluster(app_name: str | None, model: str, threshold: float | None):
+    """Rebuild incident clusters from stored issue embeddings."""
+    from src.clustering import IncidentClusterer
+
+    db = Database()
+    try:
+        if app_name:
+            app = ApplicationRepository(db).get_by_name(app_name)
+            if not app:
+                click.echo(f"Application not found: {app_name}")
+                return
+            apps = [app]
+        else:
+            apps = ApplicationRepository(db).list_all()
+
+        clusterer = IncidentClusterer(db, threshold=threshold)
+        for app in apps:
+            click.echo(f"Clustering: {app['name']}")
+            count = clusterer.recluster(app['id'], model)
+            click.echo(f"  {count} incident clusters")
+    finally:
+        db.close()
+
+@cli.command()
+@click.option('--app', 'app_name', help='Only show one application')
+@click.option('--hours', default=24, show_default=True, help='Look-back window in hours')
+@click.option('--top', default=10, show_default=True, help='Busiest series to list')
+def trends(app_name: str | None, hours: int, top: int):
+    """Show recent issue spikes and the busiest severity/type series."""
+    db = Database()
+    try:
+        app_id = None
+        if app_name:
+            app = ApplicationRepository(db).get_by_name(app_name)
+            if not app:
+                click.echo(f"Application not found: {app_name}")
+                return
+            app_id = app['id']
+
+        detector = TrendDetector(db)
+        since = datetime.now() - timedelta(hours=hours)
+        spikes = detector.recent_spikes(since, app_id)
+        click.echo(f"Spikes in the last {hours}h: {len(spikes)}")
+        for spike in spikes:
+            click.echo(
+                f"  {spike['bucket_start']:%Y-%m-%d %H:00}  {spike['application_name']}  "
+                f"{spike['severity']}/{spike['issue_type'] or '-'}  {spike['observed']} issues "
+                f"(expected {spike['expected']:.1f}, z={spike['zscore']:.1f})"
+            )
+
+        click.echo(f"\nBusiest series in the last {hours}h:")
+        for series in detector.series_summary(hours, app_id)[:top]:
+            click.echo(
+                f"  {series['application_name']}  {series['severity']}/{series['issue_type'] or '-'}  "
+                f"{series['recent']} issues (baseline {series['baseline']:.2f}/h)"
+            )
+    finally:
+        db.close()
+
+@cli.group('partitions')
+def partitions_group():
+    """Manage the monthly partitions of the issues table."""
+    pass
+
+@partitions_group.command('list')
+def partitions_list():
+    """List monthly partitions with approximate row counts."""
+    db = Database()
+    try:
+        for partition in PartitionManager(db).list_partitions():
+            click.echo(f"  {partition['name']}  {partition['month']:%Y-%m}  ~{max(partition['approx_rows'], 0)} rows")
+    finally:
+        db.close()
+
+@partitions_group.command('ensure')
+@click.option('--months-ahead', default=3, show_default=True, help='Future months to create')
+@click.option('--app-buckets', type=int,
+              help='Sub-partition new months into N hash buckets by application '
+                   '(default: ISSUE_PARTITION_APP_BUCKETS or 0)')
+def partitions_ensure(months_ahead: int, app_buckets: int | None):
+    """Create partitions for the current and upcoming months."""
+    db = Database()
+    try:
+        names = PartitionManager(db, app_buckets=app_buckets).ensure(months_ahead=months_ahead)
+        click.echo(f"Partitions ready: {', '.join(names)}")
+    finally:
+        db.close()
+
+@partitions_group.command('retention')
+@click.option('--keep-months', required=True, type=int, help='Months of issues to keep')
+@click.option('--keep-url-months', type=int,
+              help='Months of source URLs to keep for dedup (default: keep them all)')
+@click.option('--dry-run', is_flag=True, help='Only show which partitions would be dropped')
+def partitions_retention(keep_months: int, keep_url_months: int | None, dry_run: bool):
+    """Detach and drop partitions older than the retention window."""
+    db = Database()
+    try:
+        manager = PartitionManager(db)
+        if dry_run:
+            for partition in manager.expired(keep_months):
+                click.echo(f"  would drop {partition['name']}")
+            return
+        if keep_url_months is not None and keep_url_months < keep_months:
+            raise click.BadParameter('must be at least --keep-months', param_hint='--keep-url-months')
+        dropped = manager.apply_retention(keep_months, keep_url_months=keep_url_months)
+        click.echo(f"Dropped {len(dropped)} partitions{': ' + ', '.join(dropped) if dropped else ''}")
+    finally:
+        db.close()
+
+@cli.group('index')
+def index_group():
+    """Manage and benchmark the vector (HNSW) indexes."""
+    pass
+
+@index_group.command('list')
+def index_list():
+    """List HNSW indexes on issues with their size and parameters."""
+    db = Database()
+    try:
+        for idx in VectorIndexManager(db).list_indexes():
+            options = ", ".join(idx['options'] or []) or "defaults"
+            click.echo(f"  {idx['name']} ({idx['size']}, {options})")
+    finally:
+        db.close()
+
+@index_group.command('rebuild')
+@click.option('--model', default=EMBEDDING_MODEL, show_default=True, help='Embedding model the index covers')
+@click.option('--m', default=DEFAULT_M, show_default=True, help='Max connections per HNSW layer')
+@click.option('--ef-construction', default=DEFAULT_EF_CONSTRUCTION, show_default=True,
+              help='Candidate list size while building')
+@click.option('--app', 'app_name', help='Build a partial index for one application')
+@click.option('--maintenance-work-mem', help="e.g. '2GB'; a build that fits in memory is much faster")
+def index_rebuild(model: str, m: int, ef_construction: int, app_name: str | None,
+                  maintenance_work_mem: str | None):
+    """Build or rebuild an HNSW index concurrently and swap it in."""
+    db = Database()
+    try:
+        app_id = None
+        if app_name:
+            app = ApplicationRepository(db).get_by_name(app_name)
+            if not app:
+                click.echo(f"Application not found: {app_name}")
+                return
+            app_id = app['id']
+
+        name = VectorIndexManager(db).rebuild(
+            model, m=m, ef_construction=ef_construction,
+            application_id=app_id, maintenance_work_mem=maintenance_work_mem,
+        )
+        click.echo(f"Rebuilt {name} (m={m}, ef_construction={ef_construction})")
+    finally:
+        db.close()
+
+@index_group.command('bench')
+@click.option('--model', default=EMBEDDING_MODEL, show_default=True, help='Embedding model to benchmark')
+@click.option('--sample', 'sample_size', default=100, show_default=True, help='Number of query issues')
+@click.option('--k', default=10, show_default=True, help='Neighbours per query')
+@click.option('--ef-search', default='20,40,100,200,400', show_default=True,
+              help='Comma-separated hnsw.ef_search values to try')
+@click.option('--app', 'app_name', help='Restrict queries to one application')
+def index_bench(model: str, sample_size: int, k: int, ef_search: str, app_name: str | None):
+    """Measure recall@k and latency against exact search."""
+    db = Database()
+    try:
+        app_id = None
+        if app_name:
+            app = ApplicationRepository(db).get_by_name(app_name)
+            if not app:
+                click.echo(f"Application not found: {app_name}")
+                return
+            app_id = app['id']
+
+        ef_values = [int(v) for v in ef_search.split(',')]
+        results = VectorIndexManager(db).benchmark_recall(
+            model, ef_values, sample_size=sample_size, k=k, application_id=app_id,
+        )
+
+        click.echo(f"\nRecall@{k} over {sample_size} queries ({model}):")
+        click.echo(f"  {'ef_search':>9}  {'recall':>6}  {'p50 ms':>7}  {'p95 ms':>7}")
+        for r in results:
+            click.echo(f"  {r.ef_search:>9}  {r.recall:>6.3f}  {r.p50_ms:>7.2f}  {r.p95_ms:>7.2f}")
+    finally:
+        db.close()
+
 if __name__ == '__main__':
     cli()
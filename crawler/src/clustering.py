@@ -0,0 +1,278 @@
+from typing import Any, Callable
+from uuid import uuid4
+import numpy as np
+from src.db import Database
+
+# Minimum cosine similarity between an issue and a cluster centroid to join it
+DEFAULT_THRESHOLD = 0.85
+
+# Centroid rows allocated up front per (application, model) index
+INITIAL_CAPACITY = 16
+
+
+def normalize(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+class ClusterIndex:
+    """Centroids of one application's clusters as a contiguous float32 matrix.
+
+    Rows live in a preallocated buffer that doubles when full, so adding a
+    cluster writes one row instead of copying every centroid.
+    """
+
+    def __init__(self, dimension: int, ids: list[str] | None = None, centroids=None, sizes=None):
+        self.dimension = dimension
+        self.ids = list(ids or [])
+        capacity = max(INITIAL_CAPACITY, len(self.ids))
+        self._centroids = np.empty((capacity, dimension), dtype=np.float32)
+        self._sizes = np.empty(capacity, dtype=np.int64)
+        if self.ids:
+            self._centroids[:len(self.ids)] = centroids
+            self._sizes[:len(self.ids)] = sizes
+
+    @property
+    def centroids(self) -> np.ndarray:
+        return self._centroids[:len(self.ids)]
+
+    @property
+    def sizes(self) -> np.ndarray:
+        return self._sizes[:len(self.ids)]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def best_match(self, vector: np.ndarray) -> tuple[int, float]:
+        """Row index and cosine similarity of the nearest centroid, or (-1, -1.0) if empty."""
+        if not self.ids:
+            return -1, -1.0
+        similarities = self.centroids @ vector
+        best = int(np.argmax(similarities))
+        return best, float(similarities[best])
+
+    def add(self, cluster_id: str, vector: np.ndarray, size: int = 1) -> int:
+        row = len(self.ids)
+        if row == len(self._centroids):
+            self._grow()
+        self._centroids[row] = vector
+        self._sizes[row] = size
+        self.ids.append(cluster_id)
+        return row
+
+    def _grow(self) -> None:
+        count = len(self.ids)
+        centroids = np.empty((2 * len(self._centroids), self.dimension), dtype=np.float32)
+        centroids[:count] = self._centroids[:count]
+        sizes = np.empty(len(centroids), dtype=np.int64)
+        sizes[:count] = self._sizes[:count]
+        self._centroids, self._sizes = centroids, sizes
+
+    def merge(self, row: int, vector: np.ndarray) -> np.ndarray:
+        """Fold a member into a centroid as a running mean. Returns the new centroid."""
+        size = self.sizes[row]
+        self.centroids[row] = normalize(self.centroids[row] * size + vector)
+        self.sizes[row] = size + 1
+        return self.centroids[row]
+
+
+class IncidentClusterer:
+    """Assigns issues to incident clusters by cosine similarity to cluster centroids.
+
+    Centroids are loaded once per (application, embedding model) and kept in
+    memory, so matching an issue is a single matrix-vector product. Writers
+    in other processes (the spool loader, a second crawler, `main.py
+    cluster`) share an advisory lock per application and model: under it the
+    matched cluster's stored centroid and count are read back before the
+    merge, and the centroids are reloaded before a new cluster is created or
+    when the matched cluster has been deleted by a re-cluster.
+    """
+
+    def __init__(self, db: Database, threshold: float | None = None):
+        self.db = db
+        self.threshold = threshold if threshold is not None else DEFAULT_THRESHOLD
+        self._indexes: dict[tuple[str, str], ClusterIndex] = {}
+
+    def refresh(self) -> None:
+        """Drop cached centroids, e.g. after another process re-clustered."""
+        self._indexes.clear()
+
+    def _index(self, application_id: str, embedding_model: str, dimension: int,
+               reload: bool = False) -> ClusterIndex:
+        key = (str(application_id), embedding_model)
+        if reload or key not in self._indexes:
+            rows = self.db.execute(
+                """
+                SELECT id, centroid::real[] AS centroid, issue_count
+                FROM incident_clusters
+                WHERE application_id = %s AND embedding_model = %s
+                """,
+                (application_id, embedding_model)
+            )
+            self._indexes[key] = ClusterIndex(
+                dimension,
+                ids=[str(r["id"]) for r in rows],
+                centroids=np.array([r["centroid"] for r in rows], dtype=np.float32),
+                sizes=np.array([r["issue_count"] for r in rows], dtype=np.int64),
+            )
+        return self._indexes[key]
+
+    def _lock(self, application_id: str, embedding_model: str) -> None:
+        """Serialize cluster writes per application and model. Released on commit."""
+        self.db.execute(
+            "SELECT pg_advisory_xact_lock(hashtext(%s))",
+            (f"incident_clusters:{application_id}:{embedding_model}",)
+        )
+
+    def _match(self, index: ClusterIndex, vector: np.ndarray) -> int:
+        """Row of the cluster the vector joins (centroid updated), or -1 for a new cluster."""
+        row, similarity = index.best_match(vector)
+        if row >= 0 and similarity >= self.threshold:
+            index.merge(row, vector)
+            return row
+        return -1
+
+    def _join(self, index: ClusterIndex, vector: np.ndarray) -> str | None:
+        """Merge the vector into its nearest stored cluster. Returns the cluster id,
+        or None if no cluster is close or the matched one no longer exists."""
+        row, similarity = index.best_match(vector)
+        if row < 0 or similarity < self.threshold:
+            return None
+
+        # Other writers may have merged into this cluster since it was cached
+        cluster_id = index.ids[row]
+        results = self.db.execute(
+            "SELECT centroid::real[] AS centroid, issue_count FROM incident_clusters WHERE id = %s",
+            (cluster_id,)
+        )
+        if not results:
+            return None
+        index.centroids[row] = results[0]["centroid"]
+        index.sizes[row] = results[0]["issue_count"]
+
+        index.merge(row, vector)
+        self.db.execute(
+            """
+            UPDATE incident_clusters
+            SET centroid = %s::vector, issue_count = %s, updated_at = NOW()
+            WHERE id = %s
+            """,
+            (index.centroids[row].tolist(), int(index.sizes[row]), cluster_id)
+        )
+        return cluster_id
+
+    def assign(self, issue: dict[str, Any], embedding: list[float]) -> str:
+        """Assign a stored issue to a cluster, creating one if none is close. Returns the cluster id."""
+        application_id, embedding_model = issue["application_id"], issue["embedding_model"]
+        vector = normalize(embedding)
+        self._lock(application_id, embedding_model)
+        try:
+            index = self._index(application_id, embedding_model, len(vector))
+            cluster_id = self._join(index, vector)
+            if cluster_id is None:
+                # Pick up clusters created, or deleted by a re-cluster, in
+                # other processes since these centroids were cached
+                index = self._index(application_id, embedding_model, len(vector), reload=True)
+                cluster_id = self._join(index, vector)
+
+            if cluster_id is None:
+                results = self.db.execute(
+                    """
+                    INSERT INTO incident_clusters (application_id, embedding_model, centroid, issue_count, title)
+                    VALUES (%s, %s, %s::vector, 1, %s)
+                    RETURNING id
+                    """,
+                    (application_id, embedding_model, vector.tolist(), issue.get("title"))
+                )
+                cluster_id = str(results[0]["id"])
+                index.add(cluster_id, vector)
+
+            self.db.execute(
+                "UPDATE issues SET cluster_id = %s WHERE id = %s AND created_at = %s",
+                (cluster_id, issue["id"], issue["created_at"])
+            )
+            self.db.commit()
+        except Exception:
+            # The caller rolls back; the cached centroids may hold uncommitted merges
+            self._indexes.pop((str(application_id), embedding_model), None)
+            raise
+        return cluster_id
+
+    def recluster(
+        self,
+        application_id: str,
+        embedding_model: str,
+        page_size: int = 1000,
+        on_progress: Callable[[str], None] | None = None,
+    ) -> int:
+        """Rebuild an application's clusters from scratch over all its embedded issues.
+
+        Issues are streamed oldest first and clustered in memory, then the
+        clusters and assignments are written in one transaction. Returns the
+        number of clusters.
+        """
+        log = on_progress or print
+        index = None
+        assignments: list[tuple[str, Any, int]] = []
+        titles: list[str | None] = []
+
+        for row in self.db.stream(
+            """
+            SELECT id, created_at, title, embedding::real[] AS embedding
+            FROM issues
+            WHERE application_id = %s AND embedding_model = %s
+            ORDER BY created_at, id
+            """,
+            (application_id, embedding_model),
+            itersize=page_size
+        ):
+            vector = normalize(row["embedding"])
+            if index is None:
+                index = ClusterIndex(len(vector))
+            cluster_row = self._match(index, vector)
+            if cluster_row < 0:
+                cluster_row = index.add(str(uuid4()), vector)
+                titles.append(row["title"])
+            assignments.append((row["id"], row["created_at"], cluster_row))
+
+        self._lock(application_id, embedding_model)
+        self.db.execute(
+            "DELETE FROM incident_clusters WHERE application_id = %s AND embedding_model = %s",
+            (application_id, embedding_model)
+        )
+        self._indexes.pop((str(application_id), embedding_model), None)
+        if index is None:
+            self.db.commit()
+            return 0
+
+        for start in range(0, len(index), page_size):
+            rows = range(start, min(start + page_size, len(index)))
+            values = ", ".join(["(%s::uuid, %s, %s, %s::vector, %s, %s)"] * len(rows))
+            params = []
+            for row in rows:
+                params.extend((index.ids[row], application_id, embedding_model,
+                               index.centroids[row].tolist(), int(index.sizes[row]), titles[row]))
+            self.db.execute(
+                f"""
+                INSERT INTO incident_clusters (id, application_id, embedding_model, centroid, issue_count, title)
+                VALUES {values}
+                """,
+                tuple(params)
+            )
+
+        for start in range(0, len(assignments), page_size):
+            page = assignments[start:start + page_size]
+            values = ", ".join(["(%s::uuid, %s::timestamp, %s::uuid)"] * len(page))
+            self.db.execute(
+                f"""
+                UPDATE issues AS i SET cluster_id = v.cluster_id
+                FROM (VALUES {values}) AS v(id, created_at, cluster_id)
+                WHERE i.id = v.id AND i.created_at = v.created_at
+                """,
+                tuple(p for issue_id, created_at, row in page for p in (issue_id, created_at, index.ids[row]))
+            )
+            log(f"  Assigned {min(start + page_size, len(assignments))}/{len(assignments)} issues")
+
+        self.db.commit()
+        return len(index)
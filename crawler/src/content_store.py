@@ -0,0 +1,191 @@
+import os
+import zlib
+import hashlib
+from typing import Callable
+import zstandard
+from src.db import Database, MIN_UUID
+
+CODECS = ("zstd", "zlib")
+
+ZSTD_LEVEL = 9
+ZLIB_LEVEL = 6
+
+# 110 KB, the zstd CLI's default dictionary size
+DEFAULT_DICT_SIZE = 112640
+
+
+def content_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def compress(text: str, codec: str, dictionary: bytes | None = None) -> bytes:
+    data = text.encode("utf-8")
+    if codec == "zstd":
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data).compress(data)
+    if codec == "zlib":
+        return zlib.compress(data, ZLIB_LEVEL)
+    raise ValueError(f"Unknown content codec: {codec}")
+
+
+def decompress(data: bytes, codec: str, dictionary: bytes | None = None) -> str:
+    if codec == "zstd":
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data).decode("utf-8")
+    if codec == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    raise ValueError(f"Unknown content codec: {codec}")
+
+
+class ContentStore:
+    """Deduplicated, compressed storage for raw page text (the issue_contents table).
+
+    Uses zlib by default, which the Node API can decompress itself. Set
+    CONTENT_CODEC=zstd for smaller rows compressed with the most recently
+    trained dictionary; the API cannot serve those.
+    """
+
+    def __init__(self, db: Database, codec: str | None = None):
+        self.db = db
+        self.codec = codec or os.environ.get("CONTENT_CODEC", "zlib")
+        if self.codec not in CODECS:
+            raise ValueError(f"Unknown content codec: {self.codec}")
+        self._dictionaries: dict[int, bytes] = {}
+        self._current_dictionary_id: int | None = None
+        self._dictionary_loaded = False
+
+    def _current_dictionary(self) -> tuple[int | None, bytes | None]:
+        if self.codec != "zstd":
+            return None, None
+        if not self._dictionary_loaded:
+            results = self.db.execute(
+                "SELECT id, data FROM content_dictionaries ORDER BY id DESC LIMIT 1"
+            )
+            if results:
+                self._current_dictionary_id = results[0]["id"]
+                self._dictionaries[results[0]["id"]] = bytes(results[0]["data"])
+            self._dictionary_loaded = True
+        if self._current_dictionary_id is None:
+            return None, None
+        return self._current_dictionary_id, self._dictionaries[self._current_dictionary_id]
+
+    def _dictionary(self, dictionary_id: int | None) -> bytes | None:
+        if dictionary_id is None:
+            return None
+        if dictionary_id not in self._dictionaries:
+            results = self.db.execute(
+                "SELECT data FROM content_dictionaries WHERE id = %s",
+                (dictionary_id,)
+            )
+            self._dictionaries[dictionary_id] = bytes(results[0]["data"])
+        return self._dictionaries[dictionary_id]
+
+    def put(self, text: str) -> bytes:
+        """Store text if not already present. Returns its hash. Does not commit."""
+        digest = content_hash(text)
+        # Most pages are reposts of stored content: skip compressing them again
+        if self.db.execute("SELECT 1 FROM issue_contents WHERE content_hash = %s", (digest,)):
+            return digest
+        dictionary_id, dictionary = self._current_dictionary()
+        self.db.execute(
+            """
+            INSERT INTO issue_contents (content_hash, codec, dictionary_id, raw_size, data)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (content_hash) DO NOTHING
+            """,
+            (digest, self.codec, dictionary_id, len(text.encode("utf-8")),
+             compress(text, self.codec, dictionary))
+        )
+        return digest
+
+    def get(self, digest: bytes) -> str | None:
+        results = self.db.execute(
+            "SELECT codec, dictionary_id, data FROM issue_contents WHERE content_hash = %s",
+            (digest,)
+        )
+        if not results:
+            return None
+        row = results[0]
+        return decompress(bytes(row["data"]), row["codec"], self._dictionary(row["dictionary_id"]))
+
+    def train_dictionary(self, sample_size: int = 2000, dict_size: int = DEFAULT_DICT_SIZE) -> int:
+        """Train a zstd dictionary on a sample of stored content. Returns its id.
+
+        Only content written afterwards uses it; existing rows keep the
+        dictionary they were compressed with.
+        """
+        samples = [
+            r["raw_content"].encode("utf-8")
+            for r in self.db.execute(
+                "SELECT raw_content FROM issues WHERE raw_content IS NOT NULL ORDER BY random() LIMIT %s",
+                (sample_size,)
+            )
+        ]
+        if len(samples) < sample_size:
+            for row in self.db.execute(
+                "SELECT codec, dictionary_id, data FROM issue_contents ORDER BY random() LIMIT %s",
+                (sample_size - len(samples),)
+            ):
+                text = decompress(bytes(row["data"]), row["codec"], self._dictionary(row["dictionary_id"]))
+                samples.append(text.encode("utf-8"))
+
+        if not samples:
+            raise ValueError("No stored content to train a dictionary on")
+
+        dictionary = zstandard.train_dictionary(dict_size, samples).as_bytes()
+        results = self.db.execute(
+            "INSERT INTO content_dictionaries (data) VALUES (%s) RETURNING id",
+            (dictionary,)
+        )
+        self.db.commit()
+
+        self._dictionaries[results[0]["id"]] = dictionary
+        self._current_dictionary_id = results[0]["id"]
+        self._dictionary_loaded = True
+        return results[0]["id"]
+
+    def migrate_issues(
+        self,
+        page_size: int = 500,
+        on_progress: Callable[[str], None] | None = None,
+    ) -> int:
+        """Move issues.raw_content into the store, one committed page at a time.
+
+        Safe to interrupt and rerun: migrated rows no longer have raw_content.
+        Returns the number of issues migrated.
+        """
+        log = on_progress or print
+        total = 0
+        after_id = MIN_UUID
+
+        while True:
+            rows = self.db.execute(
+                """
+                SELECT id, raw_content FROM issues
+                WHERE id > %s AND raw_content IS NOT NULL
+                ORDER BY id
+                LIMIT %s
+                """,
+                (after_id, page_size)
+            )
+            if not rows:
+                break
+            after_id = rows[-1]["id"]
+
+            pairs = [(row["id"], self.put(row["raw_content"])) for row in rows]
+            values = ", ".join(["(%s::uuid, %s::bytea)"] * len(pairs))
+            self.db.execute(
+                f"""
+                UPDATE issues AS i
+                SET content_hash = v.content_hash, raw_content = NULL
+                FROM (VALUES {values}) AS v(id, content_hash)
+                WHERE i.id = v.id
+                """,
+                tuple(p for pair in pairs for p in pair)
+            )
+            self.db.commit()
+
+            total += len(rows)
+            log(f"  Migrated {total} issues")
+
+        return total
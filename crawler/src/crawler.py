@@ -1,11 +1,18 @@
+import time
+from datetime import datetime
 from typing import Callable
+import httpx
 from src.db import Database
-from src.repositories import ApplicationRepository, IssueRepository
+from src.repositories import ApplicationRepository, IssueRepository, FeedSourceRepository
 from src.sources.web_search import WebSearch
 from src.sources.web_fetcher import WebFetcher
 from src.sources.models import FetchedPage
+from src.sources.connectors import FeedCursor, get_connector
 from src.llm import get_llm_provider, IssueAnalysis
-from src.embeddings import get_embedding
+from src.embeddings import get_embeddings, get_embedding_provider, embedding_text
+from src.clustering import IncidentClusterer
+from src.trends import TrendDetector
+from src.spool import IssueSpool
 
 
 class Crawler:
@@ -13,35 +20,135 @@ class Crawler:
         self,
         db: Database,
         llm_provider: str = "anthropic",
+        embedding_provider: str | None = None,
         on_progress: Callable[[str], None] | None = None,
+        http_client: httpx.Client | None = None,
+        should_stop: Callable[[], bool] | None = None,
+        spool: IssueSpool | None = None,
+        embed_batch_size: int = 16,
+        embed_max_wait: float = 5.0,
     ):
         self.db = db
         self.app_repo = ApplicationRepository(db)
         self.issue_repo = IssueRepository(db)
+        self.feed_repo = FeedSourceRepository(db)
         self.llm = get_llm_provider(llm_provider)
-        self.search = WebSearch()
-        self.fetcher = WebFetcher()
+        self.embedder = get_embedding_provider(embedding_provider)
+        self.clusterer = IncidentClusterer(db)
+        self.trends = TrendDetector(db)
+        self.search = WebSearch(client=http_client)
+        self.fetcher = WebFetcher(client=http_client)
+        self.http_client = http_client
         self.on_progress = on_progress or print
+        # Checked between search results so a daemon can stop mid-application
+        self.should_stop = should_stop or (lambda: False)
+        # When set, issues are appended here and a SpoolLoader stores them
+        self.spool = spool
+        # Classified pages wait here so their embeddings are computed in one
+        # batch, flushed at embed_batch_size pages or after embed_max_wait seconds
+        self.embed_batch_size = embed_batch_size
+        self.embed_max_wait = embed_max_wait
+        self._pending: list[tuple[dict, FetchedPage, IssueAnalysis]] = []
+        self._pending_since = 0.0
+        # Application rows last read, for crawling into the spool while the
+        # database is down; kept next to the spool so a fresh process has them
+        self._apps: dict[str, dict] = {}
+        if spool is not None:
+            self._apps.update((str(app["id"]), app) for app in spool.load_apps())
+        # Queued pages that could not be embedded or stored, so feed polls can tell
+        self._store_failures = 0
 
     def log(self, message: str) -> None:
         self.on_progress(message)
 
-    def crawl_application(self, app_id: str) -> int:
-        """Crawl web sources for a single application. Returns count of new issues."""
-        app = self.app_repo.get_by_id(app_id)
+    def _reset_db(self) -> None:
+        """Roll back after a failed statement; a failed reconnect is only logged."""
+        try:
+            self.db.reset()
+        except Exception as e:
+            self.log(f"  Database unavailable: {e}")
+
+    def _is_known(self, url: str) -> bool:
+        if any(page.url == url for _, page, _ in self._pending):
+            return True
+        if self.spool is None:
+            return self.issue_repo.exists_by_url(url)
+        if self.spool.contains(url):
+            return True
+        try:
+            return self.issue_repo.exists_by_url(url)
+        except Exception:
+            # Database unavailable: keep crawling into the spool; the loader skips duplicates
+            self._reset_db()
+            return False
+
+    def _remember_apps(self, apps: list[dict]) -> None:
+        self._apps.update((str(app["id"]), app) for app in apps)
+        if self.spool is not None:
+            self.spool.save_apps(list(self._apps.values()))
+
+    def list_apps(self) -> list[dict]:
+        """All applications; with a spool, the last list read if the database is down."""
+        try:
+            apps = self.app_repo.list_all()
+        except Exception as e:
+            if self.spool is None or not self._apps:
+                raise
+            self.log(f"  Database unavailable, crawling the last known applications: {e}")
+            self._reset_db()
+            return list(self._apps.values())
+        self._apps.clear()
+        self._remember_apps(apps)
+        return apps
+
+    def find_app(self, name: str) -> dict | None:
+        """The application with this name; with a spool, from the last list read if the database is down."""
+        try:
+            app = self.app_repo.get_by_name(name)
+        except Exception:
+            cached = [app for app in self._apps.values() if app["name"] == name]
+            if self.spool is None or not cached:
+                raise
+            self._reset_db()
+            return cached[0]
+        if app:
+            self._remember_apps([app])
+        return app
+
+    def _get_app(self, app_id: str) -> dict | None:
+        try:
+            app = self.app_repo.get_by_id(app_id)
+        except Exception:
+            if self.spool is None or str(app_id) not in self._apps:
+                raise
+            # Database unavailable: the spool takes the issues, so crawl from the cached row
+            self._reset_db()
+            return self._apps[str(app_id)]
+        if app:
+            self._apps[str(app_id)] = app
+        return app
+
+    def crawl_application(self, app_id: str, search: bool = True) -> int:
+        """Crawl feeds, then web search, for a single application. Returns count of new issues."""
+        app = self._get_app(app_id)
         if not app:
             raise ValueError(f"Application not found: {app_id}")
 
         self.log(f"Crawling: {app['name']}")
-        keywords = app["keywords"]
-        new_count = 0
+        # Feeds first: their items need no search query or page fetch
+        new_count = self.crawl_feeds(app)
+        result_count = 0
 
         try:
-            results = self.search.search(keywords)
-            self.log(f"  Found {len(results)} search results")
-
+            # Results stream in per query; each is processed before the next search
+            results = self.search.iter_search(app["keywords"]) if search else ()
             for result in results:
-                if self.issue_repo.exists_by_url(result.url):
+                if self.should_stop():
+                    self.log("  Stopping early")
+                    break
+                result_count += 1
+                new_count += self._flush_if_due()
+                if self._is_known(result.url):
                     continue
 
                 try:
@@ -51,7 +158,64 @@ class Crawler:
         except Exception as e:
             self.log(f"  Search error: {e}")
 
-        self.log(f"  Added {new_count} new issues")
+        new_count += self._flush_pending()
+
+        try:
+            self.trends.flush()
+        except Exception as e:
+            self._reset_db()
+            self.log(f"  Trend state error: {e}")
+
+        self.log(f"  Added {new_count} new issues from {result_count} search results")
+        return new_count
+
+    def crawl_feeds(self, app: dict) -> int:
+        """Poll the application's feed sources from their stored cursors. Returns count of new issues."""
+        new_count = 0
+        try:
+            feeds = self.feed_repo.list_by_application(app["id"])
+        except Exception as e:
+            self.log(f"  Feed list error: {e}")
+            self._reset_db()
+            return 0
+        for feed in feeds:
+            cursor = FeedCursor(feed["etag"], feed["last_modified"], feed["last_seen"])
+            try:
+                poll = get_connector(feed["kind"], self.http_client).poll(feed["url"], cursor)
+            except Exception as e:
+                self.log(f"  Feed error for {feed['url']}: {e}")
+                continue
+            if poll.not_modified:
+                continue
+            self.log(f"  Feed {feed['url']}: {len(poll.pages)} new items")
+
+            completed = True
+            failures = self._store_failures
+            for page in poll.pages:
+                if self.should_stop():
+                    completed = False
+                    break
+                new_count += self._flush_if_due()
+                if self._is_known(page.url):
+                    continue
+                try:
+                    new_count += self._process_page(app, page)
+                except Exception as e:
+                    completed = False
+                    self.log(f"  Error processing {page.url}: {e}")
+            new_count += self._flush_pending()
+            if self._store_failures > failures:
+                completed = False
+
+            # An interrupted or partly failed poll keeps its old cursor, so the
+            # items not stored are polled again; stored ones are skipped as known
+            if completed:
+                cursor = poll.cursor
+                try:
+                    self.feed_repo.update_cursor(feed["id"], cursor.etag, cursor.last_modified, cursor.last_seen)
+                except Exception as e:
+                    self.log(f"  Feed cursor error for {feed['url']}: {e}")
+                    self._reset_db()
         return new_count
 
     def _process_result(self, app: dict, result) -> int:
@@ -61,7 +225,10 @@ class Crawler:
         page = self.fetcher.fetch(result.url)
         if page is None:
             return 0
+        return self._process_page(app, page)
 
+    def _process_page(self, app: dict, page: FetchedPage) -> int:
+        """Classify a fetched page and queue it for embedding. Returns count of issues stored."""
         # Analyze with LLM
         analysis = self.llm.analyze_issue(page.content, app["name"])
 
@@ -69,28 +236,109 @@ class Crawler:
         if len(analysis.summary) < 20:
             return 0
 
-        # Generate embedding
-        embedding = get_embedding(f"{analysis.title} {analysis.summary}")
+        if not self._pending:
+            self._pending_since = time.monotonic()
+        self._pending.append((app, page, analysis))
+        if len(self._pending) >= self.embed_batch_size:
+            return self._flush_pending()
+        return self._flush_if_due()
+
+    def _flush_if_due(self) -> int:
+        """Flush the queue once its oldest page has waited embed_max_wait seconds."""
+        if self._pending and time.monotonic() - self._pending_since >= self.embed_max_wait:
+            return self._flush_pending()
+        return 0
+
+    def _embed_pending(self, pending: list[tuple[dict, FetchedPage, IssueAnalysis]]) -> list[list[float] | None]:
+        """Embeddings for the queued pages, retried once; None each if the provider keeps failing."""
+        texts = [embedding_text(analysis.title, analysis.summary) for _, _, analysis in pending]
+        for attempt in range(2):
+            try:
+                return get_embeddings(texts, provider=self.embedder)
+            except Exception as e:
+                self.log(f"  Embedding error for {len(pending)} pages (attempt {attempt + 1}): {e}")
+        # The classifications are paid for: store them unembedded for `reembed --missing-only`
+        return [None] * len(pending)
+
+    def _flush_pending(self) -> int:
+        """Embed the queued pages in one batch and store them. Returns count of issues stored."""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+
+        embeddings = self._embed_pending(pending)
+
+        stored = 0
+        for (app, page, analysis), embedding in zip(pending, embeddings):
+            try:
+                stored += self._store(app, page, analysis, embedding)
+            except Exception as e:
+                self._store_failures += 1
+                self.log(f"  Error storing {page.url}: {e}")
+        return stored
+
+    def _store(self, app: dict, page: FetchedPage, analysis: IssueAnalysis, embedding: list[float] | None) -> int:
+        """Write one classified page, embedded if possible, to the spool or the database. Returns 1."""
+        embedding_model = self.embedder.model_name if embedding is not None else None
+        if self.spool is not None:
+            self.spool.append({
+                "application_id": str(app["id"]),
+                "title": analysis.title,
+                "summary": analysis.summary,
+                "raw_content": page.content,
+                "source_type": page.source,
+                "source_url": page.url,
+                "source_date": page.published,
+                "severity": analysis.severity,
+                "issue_type": analysis.issue_type,
+                "embedding_model": embedding_model,
+                "spooled_at": datetime.now().isoformat(),
+            }, embedding)
+            return 1
 
         # Store issue
-        self.issue_repo.create(
+        issue = self.issue_repo.create(
             application_id=app["id"],
             title=analysis.title,
             summary=analysis.summary,
             raw_content=page.content,
             source_type=page.source,
             source_url=page.url,
+            source_date=datetime.fromisoformat(page.published) if page.published else None,
             severity=analysis.severity,
             issue_type=analysis.issue_type,
             embedding=embedding,
+            embedding_model=embedding_model,
         )
 
+        # Group with earlier reports of the same incident; the issue is stored either way
+        if embedding is not None:
+            try:
+                self.clusterer.assign(issue, embedding)
+            except Exception as e:
+                # Roll back so the failed statement does not poison the next ones
+                self._reset_db()
+                self.log(f"  Clustering error for {page.url}: {e}")
+
+        try:
+            spike = self.trends.record(issue)
+            if spike:
+                self.log(f"  Spike: {spike.observed} {spike.severity} issues this hour "
+                         f"(expected {spike.expected:.1f}, z={spike.zscore:.1f})")
+        except Exception as e:
+            self._reset_db()
+            self.log(f"  Trend error for {page.url}: {e}")
+
         return 1
 
-    def crawl_all(self) -> int:
+    def crawl_all(self, search: bool = True) -> int:
         """Crawl all applications. Returns total new issues."""
-        apps = self.app_repo.list_all()
+        apps = self.list_apps()
         total = 0
         for app in apps:
-            total += self.crawl_application(app["id"])
+            total += self.crawl_application(app["id"], search=search)
         return total
+
+    def close(self) -> None:
+        """Release the embedding provider's worker threads."""
+        self.embedder.close()
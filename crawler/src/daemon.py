@@ -0,0 +1,221 @@
+import json
+import signal
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+import psycopg
+from src.db import Database
+from src.repositories import CrawlScheduleRepository
+from src.partitions import PartitionManager
+from src.scheduler import AppSchedule, CrawlScheduler
+
+# Seconds between re-reading the application list
+APP_REFRESH_INTERVAL = 60.0
+
+# Wait between attempts while the database is unreachable, doubling up to the max
+MIN_BACKOFF = 5.0
+MAX_BACKOFF = 300.0
+
+
+def make_status_handler(get_status: Callable[[], dict[str, Any]]) -> type[BaseHTTPRequestHandler]:
+    class StatusHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in ("/", "/status"):
+                self.send_error(404)
+                return
+            body = json.dumps(get_status(), default=str).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StatusHandler
+
+
+class CrawlDaemon:
+    """Long-running crawl loop: one warm Crawler, scheduled per application.
+
+    SIGTERM/SIGINT stop the loop after the page being processed; the crawl in
+    progress skips its remaining results and records what it stored so far.
+    Database outages are waited out with backoff, and the schedule is saved
+    after every crawl so a restart resumes it. With a spooling crawler the
+    crawl goes on through an outage from the last known application list;
+    partition checks and schedule saves wait until the database is back.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        crawler,
+        scheduler: CrawlScheduler,
+        status_port: int | None = None,
+        on_progress: Callable[[str], None] | None = None,
+    ):
+        self.db = db
+        self.crawler = crawler
+        self.scheduler = scheduler
+        self.status_port = status_port
+        self.on_progress = on_progress or print
+        self.schedule_repo = CrawlScheduleRepository(db)
+
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._last_refresh: float | None = None
+        self._partitions_checked: date | None = None
+        self._restored = False
+        # Crawled schedules not saved yet, by application id
+        self._unsaved: dict[str, AppSchedule] = {}
+        self.started_at = time.time()
+        self.current: str | None = None
+        self.total_new = 0
+        self.crawler.should_stop = self._stop.is_set
+
+    def log(self, message: str) -> None:
+        self.on_progress(message)
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def request_stop(self, *_args) -> None:
+        if not self._stop.is_set():
+            self.log("Stop requested, draining...")
+        self._stop.set()
+
+    def install_signal_handlers(self) -> None:
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            status = {
+                "state": "draining" if self.stopping else ("crawling" if self.current else "idle"),
+                "uptime": round(time.time() - self.started_at),
+                "current": self.current,
+                "new_issues": self.total_new,
+                "applications": self.scheduler.snapshot(),
+            }
+        stats = getattr(self.crawler.llm, "cache_stats", None)
+        if stats and stats.requests:
+            status["llm_requests"] = stats.requests
+            status["llm_cache_hit_rate"] = round(stats.hit_rate, 3)
+        return status
+
+    def _start_status_server(self) -> ThreadingHTTPServer:
+        server = ThreadingHTTPServer(("127.0.0.1", self.status_port), make_status_handler(self.status))
+        threading.Thread(target=server.serve_forever, name="status-server", daemon=True).start()
+        self.log(f"Status: http://127.0.0.1:{server.server_address[1]}/status")
+        return server
+
+    def _reset_db(self) -> None:
+        try:
+            self.db.reset()
+        except psycopg.OperationalError:
+            pass
+
+    def _deferred(self, what: str, error: Exception) -> None:
+        """Log a database write put off until the next attempt; raises without a spool."""
+        if self.crawler.spool is None:
+            raise error
+        self.log(f"Database unavailable, {what} deferred: {error}")
+        self._reset_db()
+
+    def _refresh_apps(self) -> None:
+        now = time.monotonic()
+        if self._last_refresh is not None and now - self._last_refresh < APP_REFRESH_INTERVAL:
+            return
+        # A daemon outlives cron's per-run partition check, so repeat it daily
+        if self._partitions_checked != date.today():
+            try:
+                PartitionManager(self.db).ensure()
+                self._partitions_checked = date.today()
+            except Exception as e:
+                self._deferred("partition check", e)
+        apps = self.crawler.list_apps()
+        saved = {}
+        if not self._restored:
+            try:
+                saved = self.schedule_repo.load()
+                self._restored = True
+            except Exception as e:
+                self._deferred("schedule restore", e)
+        with self._lock:
+            self.scheduler.sync(apps)
+            # Crawled while the saved schedule was out of reach: keep the newer state
+            self.scheduler.restore({k: v for k, v in saved.items() if k not in self._unsaved})
+        self._last_refresh = now
+
+    def _save_schedules(self) -> None:
+        """Save the crawled schedules, keeping them for the next crawl if the database is down."""
+        for app_id, schedule in list(self._unsaved.items()):
+            try:
+                self.schedule_repo.save(schedule)
+            except Exception as e:
+                self._deferred("schedule save", e)
+                return
+            del self._unsaved[app_id]
+
+    def run_once(self) -> bool:
+        """Crawl the most overdue application, if any. Returns whether one ran."""
+        self._refresh_apps()
+        if self._unsaved:
+            self._save_schedules()
+        with self._lock:
+            schedule = self.scheduler.next_due()
+            if schedule is None:
+                return False
+            self.current = schedule.name
+
+        new_issues, error = 0, None
+        try:
+            new_issues = self.crawler.crawl_application(schedule.app_id)
+        except Exception as e:
+            error = str(e)
+            self.log(f"Crawl error for {schedule.name}: {e}")
+            # Clear the failed transaction (or dropped connection) for the next crawl
+            try:
+                self.db.reset()
+            except psycopg.OperationalError:
+                # Database down: leave the app due and let run() back off
+                with self._lock:
+                    self.current = None
+                raise
+
+        with self._lock:
+            self.scheduler.record(schedule, new_issues, error)
+            self.total_new += new_issues
+            self.current = None
+            self._unsaved[schedule.app_id] = schedule
+        self._save_schedules()
+        self.log(f"  Next crawl of {schedule.name} in {schedule.interval / 60:.0f} min")
+        return True
+
+    def run(self) -> None:
+        server = self._start_status_server() if self.status_port is not None else None
+        try:
+            backoff = 0.0
+            while not self.stopping:
+                try:
+                    ran = self.run_once()
+                except Exception as e:
+                    backoff = min(max(2 * backoff, MIN_BACKOFF), MAX_BACKOFF)
+                    self.log(f"Daemon error: {e}; retrying in {backoff:.0f}s")
+                    self._stop.wait(backoff)
+                    self._reset_db()
+                    continue
+                backoff = 0.0
+                if ran:
+                    continue
+                wait = self.scheduler.seconds_until_next()
+                self._stop.wait(min(wait if wait is not None else APP_REFRESH_INTERVAL, APP_REFRESH_INTERVAL))
+        finally:
+            if server:
+                server.shutdown()
+                server.server_close()
+        self.log(f"Stopped. Added {self.total_new} new issues.")
@@ -1,17 +1,35 @@
 import os
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Iterator
+from uuid import uuid4
 import psycopg
 from psycopg.rows import dict_row
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Keyset start for id-ordered scans
+MIN_UUID = "00000000-0000-0000-0000-000000000000"
+
 class Database:
-    def __init__(self, database_url: str | None = None):
+    def __init__(self, database_url: str | None = None, connect: bool = True):
+        """With connect=False the connection is opened by the first statement,
+        so a spooling crawler can start while the database is down."""
         self.database_url = database_url or os.environ.get('DATABASE_URL')
         if not self.database_url:
             raise ValueError("DATABASE_URL not set")
-        self.conn = psycopg.connect(self.database_url, row_factory=dict_row)
+        self._conn: psycopg.Connection | None = None
+        if connect:
+            self._connect()
+
+    def _connect(self) -> None:
+        self._conn = psycopg.connect(self.database_url, row_factory=dict_row)
+
+    @property
+    def conn(self) -> psycopg.Connection:
+        if self._conn is None:
+            self._connect()
+        return self._conn
 
     def is_connected(self) -> bool:
         try:
@@ -28,13 +46,42 @@ class Database:
                 return cur.fetchall()
             return []
 
+    def stream(self, query: str, params: tuple = (), itersize: int = 500) -> Iterator[dict[str, Any]]:
+        """Iterate over query results through a server-side cursor, fetching itersize rows at a time."""
+        with self.conn.cursor(name=f"stream_{uuid4().hex}") as cur:
+            cur.itersize = itersize
+            cur.execute(query, params)
+            yield from cur
+
     def execute_many(self, query: str, params_list: list[tuple]) -> None:
         with self.conn.cursor() as cur:
             cur.executemany(query, params_list)
         self.conn.commit()
 
+    @contextmanager
+    def autocommit(self) -> Iterator[None]:
+        """Run statements outside a transaction, e.g. CREATE INDEX CONCURRENTLY."""
+        self.conn.commit()
+        previous = self.conn.autocommit
+        self.conn.autocommit = True
+        try:
+            yield
+        finally:
+            self.conn.autocommit = previous
+
     def commit(self) -> None:
         self.conn.commit()
 
+    def reset(self) -> None:
+        """Roll back a failed transaction, reconnecting if the connection was lost."""
+        try:
+            if self._conn is not None and not self._conn.closed:
+                self._conn.rollback()
+                return
+        except psycopg.OperationalError:
+            pass
+        self._connect()
+
     def close(self) -> None:
-        self.conn.close()
+        if self._conn is not None:
+            self._conn.close()
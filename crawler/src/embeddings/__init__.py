@@ -0,0 +1,52 @@
+import os
+from dotenv import load_dotenv
+from .interface import EmbeddingProvider
+from .openai_provider import OpenAIEmbeddingProvider, EMBEDDING_DIMENSION, EMBEDDING_MODEL
+from .local_provider import LocalEmbeddingProvider, DEFAULT_LOCAL_MODEL
+
+load_dotenv()
+
+_default_provider = None
+
+
+def get_embedding_provider(provider_name: str | None = None) -> EmbeddingProvider:
+    provider_name = provider_name or os.environ.get("EMBEDDING_PROVIDER", "openai")
+    if provider_name == "openai":
+        return OpenAIEmbeddingProvider()
+    elif provider_name == "local":
+        return LocalEmbeddingProvider(
+            model_name=os.environ.get("LOCAL_EMBEDDING_MODEL", DEFAULT_LOCAL_MODEL)
+        )
+    else:
+        raise ValueError(f"Unknown embedding provider: {provider_name}")
+
+
+def embedding_text(title: str, summary: str) -> str:
+    """Text an issue's embedding is computed from."""
+    return f"{title} {summary}"
+
+
+def get_embedding(text: str, provider: EmbeddingProvider | None = None) -> list[float]:
+    """Generate embedding for the given text, using the configured provider by default."""
+    global _default_provider
+    if provider is None:
+        if _default_provider is None:
+            _default_provider = get_embedding_provider()
+        provider = _default_provider
+    return provider.embed(text)
+
+
+def get_embeddings(texts: list[str], provider: EmbeddingProvider | None = None) -> list[list[float]]:
+    """Embed several texts in one batch, in input order."""
+    global _default_provider
+    if provider is None:
+        if _default_provider is None:
+            _default_provider = get_embedding_provider()
+        provider = _default_provider
+    return provider.embed_batch(texts)
+
+
+__all__ = [
+    'EmbeddingProvider', 'OpenAIEmbeddingProvider', 'LocalEmbeddingProvider',
+    'get_embedding_provider', 'get_embedding', 'get_embeddings', 'embedding_text', 'EMBEDDING_DIMENSION', 'EMBEDDING_MODEL',
+]
@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+
+
+class EmbeddingProvider(ABC):
+    model_name: str
+
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        """Number of dimensions in the vectors this provider produces."""
+        pass
+
+    @abstractmethod
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for a batch of texts, in input order."""
+        pass
+
+    def embed(self, text: str) -> list[float]:
+        """Generate an embedding for a single text."""
+        return self.embed_batch([text])[0]
+
+    def close(self) -> None:
+        """Release worker threads or clients held by the provider."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,81 @@
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .interface import EmbeddingProvider
+
+DEFAULT_LOCAL_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """CPU embedding backend using a sentence-transformers model.
+
+    Batches are split into chunks and encoded on a thread pool; the model's
+    tensor ops release the GIL, so chunks run in parallel across cores.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_LOCAL_MODEL,
+        batch_size: int = 32,
+        workers: int | None = None,
+        model=None,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self._model = model
+        self._executor = None
+        self._model_lock = threading.Lock()
+
+    def _get_model(self):
+        # Workers share one model; loading it once per thread multiplies memory
+        with self._model_lock:
+            if self._model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError as e:
+                    raise ValueError(
+                        "sentence-transformers is not installed (pip install sentence-transformers)"
+                    ) from e
+                self._model = SentenceTransformer(self.model_name, device="cpu")
+            return self._model
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    @property
+    def dimension(self) -> int:
+        return self._get_model().get_sentence_embedding_dimension()
+
+    def _encode(self, texts: list[str]) -> list[list[float]]:
+        vectors = self._get_model().encode(
+            texts,
+            batch_size=len(texts),
+            normalize_embeddings=True,
+        )
+        return [[float(x) for x in vector] for vector in vectors]
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        # Load in the calling thread so a load failure surfaces here, not per chunk
+        self._get_model()
+
+        # Spread even a small batch over the workers, up to batch_size texts per chunk
+        size = max(1, min(self.batch_size, math.ceil(len(texts) / self.workers)))
+        chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+        if len(chunks) == 1:
+            return self._encode(chunks[0])
+
+        results = []
+        for chunk_vectors in self._get_executor().map(self._encode, chunks):
+            results.extend(chunk_vectors)
+        return results
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
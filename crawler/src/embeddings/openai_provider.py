@@ -0,0 +1,36 @@
+import os
+from .interface import EmbeddingProvider
+
+EMBEDDING_DIMENSION = 1536
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    def __init__(self, api_key: str | None = None, model_name: str = EMBEDDING_MODEL):
+        self.api_key = api_key
+        self.model_name = model_name
+        self._client = None
+
+    @property
+    def dimension(self) -> int:
+        return EMBEDDING_DIMENSION
+
+    def _get_client(self):
+        if self._client is None:
+            api_key = self.api_key or os.environ.get("OPENAI_API_KEY")
+            if not api_key:
+                raise ValueError("OPENAI_API_KEY not set")
+            from openai import OpenAI
+            self._client = OpenAI(api_key=api_key)
+        return self._client
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        client = self._get_client()
+
+        # Truncate text if too long (max ~8000 tokens for this model)
+        response = client.embeddings.create(
+            model=self.model_name,
+            input=[text[:30000] for text in texts]
+        )
+
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
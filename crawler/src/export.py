@@ -0,0 +1,214 @@
+import json
+import os
+from datetime import datetime
+from typing import Any, Callable
+from uuid import uuid4
+import numpy as np
+from src.db import Database
+from src.embeddings import EMBEDDING_MODEL
+
+WATERMARK_FILE = "_watermark.json"
+
+# A row group is written once the buffer reaches either bound
+DEFAULT_ROW_GROUP_SIZE = 10000
+DEFAULT_ROW_GROUP_BYTES = 64 * 1024 * 1024
+
+
+def partition_dir(out_dir: str, application_id: str, created_at: datetime) -> str:
+    """Hive-style directory for an application's month, e.g. application_id=.../month=2026-10."""
+    return os.path.join(out_dir, f"application_id={application_id}", f"month={created_at:%Y-%m}")
+
+
+def read_watermark(out_dir: str) -> int | None:
+    """Transaction id the next export resumes from, or None before the first export."""
+    try:
+        with open(os.path.join(out_dir, WATERMARK_FILE)) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    return data["change_xid"]
+
+
+def write_watermark(out_dir: str, change_xid: int) -> None:
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump({"change_xid": change_xid}, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ValueError("pyarrow is not installed (pip install pyarrow)") from e
+    return pyarrow, pyarrow.parquet
+
+
+class ParquetExporter:
+    """Streams issues into Parquet files partitioned by application and month.
+
+    Each run exports the issues inserted or updated since the previous one,
+    by the id of the transaction that last wrote them (database/14_issue_change_xid.sql).
+    It reads up to the oldest transaction still running, so rows committed
+    late are picked up by the next run rather than skipped. An updated issue
+    is exported again: readers keep the row with the highest change_seq per id.
+
+    Rows come through a server-side cursor in (application_id, created_at, id)
+    order, the order of idx_issues_app_created, so each (application, month)
+    file is written start to finish with one writer open at a time. Rows are
+    buffered up to row_group_size rows or row_group_bytes (embeddings held as
+    float32) before a row group is written. Every run adds new part files,
+    renamed into place only if the run completes, and then saves its watermark.
+
+    Embeddings of one model are exported as fixed_size_list<float32>; issues
+    embedded with another model get a null embedding.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        out_dir: str,
+        embedding_model: str = EMBEDDING_MODEL,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        row_group_bytes: int = DEFAULT_ROW_GROUP_BYTES,
+        on_progress: Callable[[str], None] | None = None,
+    ):
+        self.pa, self.pq = _require_pyarrow()
+        self.db = db
+        self.out_dir = out_dir
+        self.embedding_model = embedding_model
+        self.row_group_size = row_group_size
+        self.row_group_bytes = row_group_bytes
+        self.on_progress = on_progress or print
+
+    def _embedding_dim(self) -> int | None:
+        results = self.db.execute(
+            "SELECT embedding_dim FROM issues WHERE embedding_model = %s LIMIT 1",
+            (self.embedding_model,)
+        )
+        return results[0]["embedding_dim"] if results else None
+
+    def schema(self, dim: int | None):
+        pa = self.pa
+        fields = [
+            ("id", pa.string()),
+            ("application_id", pa.string()),
+            ("application_name", pa.string()),
+            ("vendor", pa.string()),
+            ("version_id", pa.string()),
+            ("cluster_id", pa.string()),
+            ("title", pa.string()),
+            ("summary", pa.string()),
+            ("source_type", pa.string()),
+            ("source_url", pa.string()),
+            ("severity", pa.string()),
+            ("issue_type", pa.string()),
+            ("upvotes", pa.int32()),
+            ("comment_count", pa.int32()),
+            ("source_date", pa.timestamp("us")),
+            ("created_at", pa.timestamp("us")),
+            ("embedding_model", pa.string()),
+            ("change_seq", pa.int64()),
+        ]
+        if dim:
+            fields.append(("embedding", pa.list_(pa.float32(), dim)))
+        return pa.schema(fields)
+
+    def export(self, full: bool = False) -> int:
+        """Export issues changed since the watermark (all issues with full=True). Returns row count."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        watermark = None if full else read_watermark(self.out_dir)
+        # Every transaction below this id has committed or aborted, so no row
+        # under it can appear later
+        upper = self.db.execute(
+            "SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint AS xid"
+        )[0]["xid"]
+        dim = self._embedding_dim()
+        schema = self.schema(dim)
+        run_id = f"{datetime.now():%Y%m%dT%H%M%S}-{uuid4().hex[:8]}"
+
+        embedding_column = ", CASE WHEN i.embedding_model = %s THEN i.embedding::real[] END AS embedding" if dim else ""
+        query = f"""
+            SELECT i.id, i.application_id, a.name AS application_name, a.vendor, i.version_id, i.cluster_id,
+                   i.title, i.summary, i.source_type, i.source_url, i.severity, i.issue_type,
+                   i.upvotes, i.comment_count, i.source_date, i.created_at, i.embedding_model,
+                   i.change_xid::text::bigint AS change_seq
+                   {embedding_column}
+            FROM issues i
+            JOIN applications a ON a.id = i.application_id
+            WHERE i.change_xid >= %s::text::xid8 AND i.change_xid < %s::text::xid8
+            ORDER BY i.application_id, i.created_at, i.id
+        """
+        params: list[Any] = [self.embedding_model] if dim else []
+        params.extend((watermark or 0, upper))
+
+        paths: list[str] = []
+        writer = None
+        current_key = None
+        rows: list[dict[str, Any]] = []
+        buffered_bytes = 0
+        count = 0
+
+        def flush() -> None:
+            nonlocal buffered_bytes
+            if rows:
+                columns = [self.pa.array([row[f.name] for row in rows], type=f.type) for f in schema]
+                writer.write_table(self.pa.Table.from_arrays(columns, schema=schema))
+                rows.clear()
+            buffered_bytes = 0
+
+        def open_writer(application_id: str, created_at: datetime):
+            directory = partition_dir(self.out_dir, application_id, created_at)
+            os.makedirs(directory, exist_ok=True)
+            # Written under a temporary name until the whole run succeeds
+            path = os.path.join(directory, f"part-{run_id}.parquet")
+            paths.append(path)
+            return self.pq.ParquetWriter(f"{path}.tmp", schema, compression="zstd")
+
+        try:
+            for row in self.db.stream(query, tuple(params)):
+                for name in ("id", "application_id", "version_id", "cluster_id"):
+                    if row[name] is not None:
+                        row[name] = str(row[name])
+                if dim and row["embedding"] is not None:
+                    row["embedding"] = np.asarray(row["embedding"], dtype=np.float32)
+
+                key = (row["application_id"], f"{row['created_at']:%Y-%m}")
+                if key != current_key:
+                    # Rows arrive grouped by application and month: the last file is complete
+                    if writer is not None:
+                        flush()
+                        writer.close()
+                    writer = open_writer(row["application_id"], row["created_at"])
+                    current_key = key
+
+                rows.append(row)
+                buffered_bytes += len(row["title"]) + len(row["summary"]) + len(row["source_url"]) + 256
+                if dim and row["embedding"] is not None:
+                    buffered_bytes += row["embedding"].nbytes
+                if len(rows) >= self.row_group_size or buffered_bytes >= self.row_group_bytes:
+                    flush()
+
+                count += 1
+                if count % 100000 == 0:
+                    self.on_progress(f"  Exported {count} issues...")
+
+            if writer is not None:
+                flush()
+                writer.close()
+                writer = None
+        except BaseException:
+            if writer is not None:
+                writer.close()
+            for path in paths:
+                if os.path.exists(f"{path}.tmp"):
+                    os.remove(f"{path}.tmp")
+            raise
+        finally:
+            self.db.commit()
+
+        for path in paths:
+            os.replace(f"{path}.tmp", path)
+        write_watermark(self.out_dir, upper)
+        return count
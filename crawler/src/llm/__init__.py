@@ -1,12 +1,23 @@
 from .interface import LLMProvider, IssueAnalysis
-from .anthropic_provider import AnthropicProvider
 
 
 def get_llm_provider(provider_name: str = "anthropic") -> LLMProvider:
+    # Imported here so commands that never classify don't load the SDK
+    from .anthropic_provider import AnthropicProvider
+
     if provider_name == "anthropic":
         return AnthropicProvider()
+    elif provider_name == "anthropic-cached":
+        return AnthropicProvider(prompt_caching=True)
     else:
         raise ValueError(f"Unknown LLM provider: {provider_name}")
 
 
-__all__ = ['LLMProvider', 'IssueAnalysis', 'get_llm_provider', 'AnthropicProvider']
+def __getattr__(name: str):
+    if name in ("AnthropicProvider", "CacheStats"):
+        from . import anthropic_provider
+        return getattr(anthropic_provider, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['LLMProvider', 'IssueAnalysis', 'get_llm_provider', 'AnthropicProvider', 'CacheStats']
@@ -1,6 +1,6 @@
 import os
 import json
-import anthropic
+from dataclasses import dataclass
 from .interface import LLMProvider, IssueAnalysis
 
 ANALYSIS_PROMPT = """Analyze this IT support forum post about {application_name} and extract structured information.
@@ -18,16 +18,200 @@ Respond with ONLY a JSON object (no markdown, no explanation) with these fields:
 
 JSON response:"""
 
+# Static instructions for the cached mode. Sent as a system block marked with
+# cache_control so repeated classifications reuse the cached prefix. The API
+# silently skips caching for prefixes below the model's minimum cacheable length
+# (MIN_CACHEABLE_TOKENS), so the rubric and few-shot examples live here rather
+# than in the per-post user message.
+CACHED_SYSTEM_PROMPT = """You extract structured information from IT support forum posts about enterprise software. The posts come from vendor communities, Reddit, Stack Exchange sites, GitHub issues and admin blogs. Your output feeds an issue tracker used by IT administrators who need to know, at a glance, what is broken in the software they manage, how bad it is, and whether there is a way around it.
+
+Respond with ONLY a single-line JSON object (no markdown, no explanation) using these short keys:
+- t: A concise title for this issue (max 100 chars)
+- s: A 2-3 sentence summary of the problem and any solutions mentioned
+- v: Severity, "critical" (crashes, data loss, security), "major" (significant functionality broken), or "minor" (cosmetic, workarounds exist)
+- k: Issue type, one of "crash", "performance", "install", "security", "compatibility", "ui", "other"
+- ver: The software version mentioned, or null if not specified
+- w: true if a workaround is mentioned, false otherwise
+
+Title rules (t):
+- Describe the problem, not the poster. Write "Outlook search returns no results after update", not "Help!!! my outlook is broken".
+- Name the application or component when the post makes it clear, and the trigger when there is one (an update, a file type, a setting, a device).
+- Do not include usernames, ticket numbers, email addresses, hostnames or other identifying details.
+- Use sentence case and no trailing punctuation. Keep it under 100 characters.
+
+Summary rules (s):
+- Two or three sentences. The first states what goes wrong and under which conditions. The second covers scope: who is affected, which versions or platforms, how often. The last mentions any fix, workaround or vendor response; if none is known, say that no fix has been confirmed.
+- Write in neutral third person ("Users report...", "Admins see..."). Do not copy long passages from the post and do not speculate beyond it.
+- If the post is not about a software problem at all (an advertisement, a feature request with no defect, a job posting, a general question, a thank-you reply), return a summary shorter than 20 characters such as "Not an issue." so it can be discarded.
+
+Severity rubric (v):
+- "critical": the application crashes or will not start for many users; data is lost, corrupted or silently not saved; a security vulnerability, credential exposure or privilege escalation; a widespread outage of a core function (nobody can join meetings, send mail, sign in) with no workaround.
+- "major": an important feature is broken or unreliable but the application still runs; problems that block a common workflow for a group of users; severe slowness that makes the application impractical; installs or updates that fail in a way that requires manual intervention on each machine.
+- "minor": cosmetic or layout glitches; problems with an easy, reliable workaround; issues affecting a rare configuration or a single user; confusing messages that do not stop the user from working.
+- When in doubt between two levels, pick the lower one unless the post describes data loss or a security impact. A workaround lowers severity only if it is practical for an ordinary user or can be deployed centrally by an admin.
+
+Issue type definitions (k):
+- "crash": the process exits, freezes permanently, hangs on launch, or shows a fatal error dialog.
+- "performance": slowness, high CPU, memory or disk use, battery drain, long sync or load times, timeouts that succeed on retry.
+- "install": installation, upgrade, uninstall, licensing activation, deployment through MSI, Intune, SCCM, Jamf or package managers.
+- "security": vulnerabilities, unexpected permission prompts, authentication or SSO bypasses, data exposure, malware detections caused by the product, certificate problems that weaken security.
+- "compatibility": breakage tied to a specific OS version, browser, driver, hardware, plugin, file format or another application; problems that start after an OS update rather than an application update.
+- "ui": display, rendering, layout, fonts, scaling, dark mode, accessibility and localization problems where the function itself still works.
+- "other": sign-in loops, sync conflicts, notifications, integrations and anything that fits none of the above. Prefer a specific type when one reasonably applies.
+
+Version (ver):
+- Report the version of the application the post is about, exactly as written ("24.1.2", "2024.005.20320", "build 17928", "v5.17.11"). If several are mentioned, report the one that shows the problem. Do not report OS versions or versions of other products here. Use null when no version is stated; never guess from dates.
+
+Workaround (w):
+- true if the post or a reply describes any step that avoids or mitigates the problem: rolling back, disabling a feature or add-in, clearing a cache, a registry or policy change, using the web version, a vendor hotfix. false if people only confirm the problem or the suggestions did not help.
+
+Examples. Each example shows the application, an excerpt of the post, and the expected single-line output.
+
+Application: Microsoft Teams
+Post: "Since the new Teams client update this morning (24215.1007.3082) half my users get a white screen and the app closes after 5 seconds. Clearing %appdata%\\Microsoft\\Teams didn't help. Reverting to classic Teams works for now."
+Output: {"t":"New Teams client closes after white screen on launch","s":"After update 24215.1007.3082 the new Teams client shows a white screen and exits within seconds for many users. Clearing the local cache does not help. Switching back to classic Teams is a working stopgap.","v":"critical","k":"crash","ver":"24215.1007.3082","w":true}
+
+Application: Adobe Acrobat
+Post: "Acrobat DC 2024.002.20759 takes about 40 seconds to open any PDF from a network share. Local files open instantly. Turning off Protected View makes it fast again but security won't let us do that."
+Output: {"t":"Acrobat opens PDFs from network shares slowly","s":"Acrobat DC 2024.002.20759 takes around 40 seconds to open PDFs stored on network shares, while local files open normally. Disabling Protected View removes the delay but is not acceptable in every environment.","v":"major","k":"performance","ver":"2024.002.20759","w":true}
+
+Application: Zoom
+Post: "Deploying the Zoom MSI 5.17.11 through Intune fails with error 1603 on about a third of our fleet. Devices that had the per-user install first seem to be the ones failing. No fix yet, opened a ticket with Zoom."
+Output: {"t":"Zoom MSI deployment fails with error 1603 via Intune","s":"Intune deployment of the Zoom 5.17.11 MSI fails with error 1603 on roughly a third of devices, apparently those with an existing per-user install. No fix has been confirmed and a vendor ticket is open.","v":"major","k":"install","ver":"5.17.11","w":false}
+
+Application: Slack
+Post: "Anyone else seeing the sidebar font look blurry on 150% scaling in Slack 4.41? Everything works fine, it just looks bad. Setting compatibility override for DPI fixes it."
+Output: {"t":"Slack sidebar text blurry at 150% display scaling","s":"In Slack 4.41 the sidebar font renders blurry on displays scaled to 150%, although the app works normally. Overriding high-DPI scaling in the executable's compatibility settings fixes the rendering.","v":"minor","k":"ui","ver":"4.41","w":true}
+
+Application: Microsoft Outlook
+Post: "After installing the macOS Sequoia update, new Outlook for Mac won't send anything with attachments over 5 MB, it just sits in the outbox. Same account works fine on Windows and in OWA."
+Output: {"t":"Outlook for Mac stuck sending large attachments on macOS Sequoia","s":"Since the macOS Sequoia update, new Outlook for Mac leaves messages with attachments over 5 MB in the outbox. The same accounts send normally from Windows and Outlook on the web, which can be used meanwhile.","v":"major","k":"compatibility","ver":null,"w":true}
+
+Application: Google Chrome
+Post: "Chrome 126 password manager is autofilling saved credentials on a look-alike domain (examp1e.com) without any prompt. Reported to Google, no response yet."
+Output: {"t":"Chrome password manager autofills credentials on look-alike domain","s":"Users report that Chrome 126 autofills saved passwords on a look-alike domain without prompting, which could expose credentials to phishing sites. It has been reported to Google and no fix is confirmed.","v":"critical","k":"security","ver":"126","w":false}
+
+Application: Microsoft Teams
+Post: "We are hiring a Teams administrator in Chicago, 5+ years M365 experience. DM me."
+Output: {"t":"Job posting","s":"Not an issue.","v":"minor","k":"other","ver":null,"w":false}
+
+Application: Zoom
+Post: "Users keep getting signed out of Zoom every morning and have to go through SSO again. Started last week. It is annoying but they can log back in fine."
+Output: {"t":"Zoom signs users out daily and requires SSO again","s":"Since last week users are signed out of Zoom every morning and must complete SSO again. Signing back in works, and no permanent fix has been confirmed.","v":"minor","k":"other","ver":null,"w":false}
+
+Application: Adobe Acrobat
+Post: "Edited a form in Acrobat Pro 2023.008.20533, saved, reopened and all my field values are gone. Happened to three colleagues too. Using Save As to a new file keeps the data."
+Output: {"t":"Acrobat Pro loses form field values after saving","s":"In Acrobat Pro 2023.008.20533, form field values disappear after saving and reopening a PDF, affecting several users. Saving to a new file with Save As preserves the data.","v":"critical","k":"other","ver":"2023.008.20533","w":true}
+
+Application: Slack
+Post: "Slack desktop is using 2.5 GB of RAM and 30% CPU after it's been open a day, on Windows 11. Restarting it brings it back down. Version 4.39.95."
+Output: {"t":"Slack desktop memory and CPU use grow over a day","s":"On Windows 11, Slack 4.39.95 climbs to about 2.5 GB of memory and 30% CPU after running for a day. Restarting the app restores normal usage until it grows again.","v":"major","k":"performance","ver":"4.39.95","w":true}
+
+Application: Microsoft Excel
+Post: "Excel for Microsoft 365 Version 2408 (Build 17928.20114) freezes for about a minute whenever I paste from a web page, then recovers. Paste Special as text is instant. Only started after the August update."
+Output: {"t":"Excel freezes when pasting content copied from web pages","s":"Since Version 2408 (Build 17928.20114), Excel hangs for about a minute when pasting content copied from a web page before recovering. Using Paste Special as text avoids the delay.","v":"major","k":"performance","ver":"Version 2408 (Build 17928.20114)","w":true}
+
+Application: Google Chrome
+Post: "Chrome won't install on our Windows Server 2012 R2 jump boxes anymore, the installer says the OS is no longer supported. Any way around this?"
+Output: {"t":"Chrome installer refuses to run on Windows Server 2012 R2","s":"The current Chrome installer rejects Windows Server 2012 R2 as an unsupported operating system. No supported workaround is mentioned beyond moving to a newer Windows Server release.","v":"minor","k":"compatibility","ver":null,"w":false}
+
+Follow the rubric and the examples above for every post. Output exactly one JSON object on one line, starting with the key "t"."""
+
+# Minimum prompt prefix the API will cache, per model family
+MIN_CACHEABLE_TOKENS = {
+    "claude-3-haiku": 2048,
+    "claude-3-5-haiku": 2048,
+}
+DEFAULT_MIN_CACHEABLE_TOKENS = 1024
+
+
+def min_cacheable_tokens(model: str) -> int:
+    for prefix, tokens in MIN_CACHEABLE_TOKENS.items():
+        if model.startswith(prefix):
+            return tokens
+    return DEFAULT_MIN_CACHEABLE_TOKENS
+
+
+CACHED_USER_PROMPT = """Application: {application_name}
+
+Post content:
+{content}"""
+
+# Short response keys used by the cached mode, mapped to IssueAnalysis fields
+COMPACT_KEYS = {
+    "t": "title",
+    "s": "summary",
+    "v": "severity",
+    "k": "issue_type",
+    "ver": "version_mentioned",
+    "w": "has_workaround",
+}
+
+PROMPT_CACHING_BETA = "prompt-caching-2024-07-31"
+
+DEFAULT_MAX_TOKENS = 500
+COMPACT_MAX_TOKENS = 300
+
+
+@dataclass
+class CacheStats:
+    requests: int = 0
+    cache_hits: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+
+    def record(self, usage) -> None:
+        """Accumulate token usage from a Messages API response."""
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_creation = getattr(usage, "cache_creation_input_tokens", None) or 0
+
+        self.requests += 1
+        if cache_read > 0:
+            self.cache_hits += 1
+        self.input_tokens += usage.input_tokens
+        self.output_tokens += usage.output_tokens
+        self.cache_read_input_tokens += cache_read
+        self.cache_creation_input_tokens += cache_creation
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of requests that read the instructions from the prompt cache."""
+        return self.cache_hits / self.requests if self.requests else 0.0
+
 
 class AnthropicProvider(LLMProvider):
-    def __init__(self, api_key: str | None = None, model: str = "claude-3-haiku-20240307"):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        model: str = "claude-3-haiku-20240307",
+        prompt_caching: bool = False,
+        max_tokens: int | None = None,
+        base_url: str | None = None,
+    ):
         self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY not set")
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.base_url = base_url
+        self._client = None
         self.model = model
+        self.prompt_caching = prompt_caching
+        self.max_tokens = max_tokens or (COMPACT_MAX_TOKENS if prompt_caching else DEFAULT_MAX_TOKENS)
+        self.cache_stats = CacheStats()
+
+    @property
+    def client(self):
+        # Built on first request; importing the SDK and its HTTP stack is slow
+        if self._client is None:
+            import anthropic
+            self._client = anthropic.Anthropic(api_key=self.api_key, base_url=self.base_url)
+        return self._client
 
     def analyze_issue(self, raw_content: str, application_name: str) -> IssueAnalysis:
+        if self.prompt_caching:
+            return self._analyze_cached(raw_content, application_name)
+
         prompt = ANALYSIS_PROMPT.format(
             application_name=application_name,
             content=raw_content[:4000]  # Truncate to avoid token limits
@@ -35,14 +219,44 @@ class AnthropicProvider(LLMProvider):
 
         response = self.client.messages.create(
             model=self.model,
-            max_tokens=500,
+            max_tokens=self.max_tokens,
             messages=[{"role": "user", "content": prompt}]
         )
+        self.cache_stats.record(response.usage)
 
         response_text = response.content[0].text.strip()
+        return self._build_analysis(json.loads(response_text))
+
+    def _analyze_cached(self, raw_content: str, application_name: str) -> IssueAnalysis:
+        """Classify using the cacheable system block and the compact response schema."""
+        prompt = CACHED_USER_PROMPT.format(
+            application_name=application_name,
+            content=raw_content[:4000]
+        )
+
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            system=[{
+                "type": "text",
+                "text": CACHED_SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"},
+            }],
+            messages=[
+                {"role": "user", "content": prompt},
+                # Prefill the opening brace so the model goes straight to the JSON
+                {"role": "assistant", "content": "{"},
+            ],
+            extra_headers={"anthropic-beta": PROMPT_CACHING_BETA},
+        )
+        self.cache_stats.record(response.usage)
+
+        response_text = "{" + response.content[0].text.strip()
         data = json.loads(response_text)
+        return self._build_analysis({COMPACT_KEYS.get(k, k): v for k, v in data.items()})
 
-        severity = data.get("severity", "minor").lower()
+    def _build_analysis(self, data: dict) -> IssueAnalysis:
+        severity = (data.get("severity") or "minor").lower()
         if severity not in ("critical", "major", "minor"):
             severity = "minor"
 
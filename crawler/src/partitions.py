@@ -0,0 +1,168 @@
+import os
+import re
+from datetime import date
+from typing import Any
+from psycopg import sql
+from src.db import Database
+
+PARTITION_NAME = re.compile(r"^issues_p(\d{4})(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after (or before, if negative) `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_month(name: str) -> date | None:
+    """Month covered by a monthly partition name, e.g. issues_p202602 -> 2026-02-01."""
+    match = PARTITION_NAME.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+class PartitionManager:
+    """Creates and retires the monthly partitions of issues (database/07_partition_issues.sql)."""
+
+    def __init__(self, db: Database, app_buckets: int | None = None):
+        self.db = db
+        if app_buckets is None:
+            app_buckets = int(os.environ.get("ISSUE_PARTITION_APP_BUCKETS", "0"))
+        self.app_buckets = app_buckets
+
+    def ensure(self, months_ahead: int = 3, today: date | None = None) -> list[str]:
+        """Create partitions from the current month through months_ahead. Returns their names."""
+        current = (today or date.today()).replace(day=1)
+        names = []
+        for offset in range(months_ahead + 1):
+            results = self.db.execute(
+                "SELECT create_issue_partition(%s, %s) AS name",
+                (add_months(current, offset), self.app_buckets)
+            )
+            names.append(results[0]["name"])
+        self.db.commit()
+        return names
+
+    def list_partitions(self) -> list[dict[str, Any]]:
+        """Monthly partitions of issues with their approximate row counts, oldest first."""
+        results = self.db.execute("""
+            SELECT c.relname AS name, c.reltuples::bigint AS approx_rows
+            FROM pg_inherits inh
+            JOIN pg_class c ON c.oid = inh.inhrelid
+            WHERE inh.inhparent = 'issues'::regclass
+            ORDER BY c.relname
+        """)
+        partitions = []
+        for row in results:
+            month = partition_month(row["name"])
+            if month:
+                partitions.append({**row, "month": month})
+        return partitions
+
+    def expired(self, keep_months: int, today: date | None = None) -> list[dict[str, Any]]:
+        """Partitions entirely older than the retention window."""
+        cutoff = add_months((today or date.today()).replace(day=1), -keep_months)
+        return [p for p in self.list_partitions() if p["month"] < cutoff]
+
+    def drop(self, name: str) -> None:
+        """Detach and drop one monthly partition.
+
+        Dropping a partition skips row triggers, so the rollups are adjusted
+        here first, in the same transaction. Afterwards the incident clusters
+        its issues belonged to are recounted and re-centred from their
+        remaining members (or deleted if none remain), and page contents no
+        other issue references are deleted from cold storage. The partition's
+        issue_urls rows are kept so the crawler does not ingest the expired
+        URLs again; see prune_urls.
+        """
+        month = partition_month(name)
+        if month is None:
+            raise ValueError(f"Not a monthly issues partition: {name}")
+        table = sql.Identifier(name)
+
+        # What the dropped issues referenced, to clean up once they are gone
+        self.db.execute(sql.SQL("""
+            CREATE TEMP TABLE dropped_refs ON COMMIT DROP AS
+            SELECT DISTINCT cluster_id, content_hash FROM {table}
+            WHERE cluster_id IS NOT NULL OR content_hash IS NOT NULL
+        """).format(table=table))
+        self.db.execute(sql.SQL("""
+            UPDATE issue_counts c
+            SET issue_count = c.issue_count - p.n
+            FROM (
+                SELECT application_id, severity, COALESCE(issue_type, '') AS issue_type, COUNT(*) AS n
+                FROM {table}
+                WHERE application_id IS NOT NULL
+                GROUP BY 1, 2, 3
+            ) p
+            WHERE c.application_id = p.application_id
+              AND c.severity = p.severity
+              AND c.issue_type = p.issue_type
+        """).format(table=table))
+        self.db.execute(
+            "DELETE FROM issue_daily_counts WHERE day >= %s AND day < %s",
+            (month, add_months(month, 1))
+        )
+        self.db.execute(sql.SQL("ALTER TABLE issues DETACH PARTITION {}").format(table))
+        self.db.execute(sql.SQL("DROP TABLE {}").format(table))
+
+        self.db.execute("""
+            WITH remaining AS (
+                SELECT i.cluster_id, COUNT(*) AS n,
+                       l2_normalize(SUM(l2_normalize(i.embedding))) AS centroid
+                FROM issues i
+                WHERE i.cluster_id IN (SELECT cluster_id FROM dropped_refs)
+                GROUP BY i.cluster_id
+            )
+            UPDATE incident_clusters c
+            SET issue_count = r.n, centroid = r.centroid, updated_at = NOW()
+            FROM remaining r
+            WHERE c.id = r.cluster_id
+        """)
+        self.db.execute("""
+            DELETE FROM incident_clusters c
+            WHERE c.id IN (SELECT cluster_id FROM dropped_refs)
+              AND NOT EXISTS (SELECT 1 FROM issues i WHERE i.cluster_id = c.id)
+        """)
+        self.db.execute("""
+            DELETE FROM issue_contents c
+            WHERE c.content_hash IN (SELECT content_hash FROM dropped_refs)
+              AND NOT EXISTS (SELECT 1 FROM issues i WHERE i.content_hash = c.content_hash)
+        """)
+        self.db.commit()
+
+    def prune_urls(self, keep_months: int, today: date | None = None) -> int:
+        """Forget source URLs first stored more than keep_months ago. Returns the count.
+
+        Pruned URLs are crawled again if they still turn up in search results.
+        """
+        cutoff = add_months((today or date.today()).replace(day=1), -keep_months)
+        results = self.db.execute(
+            "WITH pruned AS (DELETE FROM issue_urls WHERE created_at < %s RETURNING 1) "
+            "SELECT COUNT(*) AS n FROM pruned",
+            (cutoff,)
+        )
+        self.db.commit()
+        return results[0]["n"]
+
+    def apply_retention(
+        self,
+        keep_months: int,
+        today: date | None = None,
+        keep_url_months: int | None = None,
+    ) -> list[str]:
+        """Drop every partition older than keep_months. Returns the dropped names.
+
+        Source URLs are kept for dedup unless keep_url_months is given, which
+        must be at least keep_months.
+        """
+        if keep_url_months is not None and keep_url_months < keep_months:
+            raise ValueError("keep_url_months must be at least keep_months")
+        dropped = []
+        for partition in self.expired(keep_months, today):
+            self.drop(partition["name"])
+            dropped.append(partition["name"])
+        if keep_url_months is not None:
+            self.prune_urls(keep_url_months, today)
+        return dropped
@@ -0,0 +1,75 @@
+from typing import Callable
+from src.db import Database
+from src.repositories import IssueRepository
+from src.embeddings import EmbeddingProvider, embedding_text
+
+
+class Reembedder:
+    """Backfills or replaces issue embeddings in keyset-paginated pages.
+
+    Each page is read through a server-side cursor, embedded in batches, written
+    back with bulk updates and committed on its own, so memory stays bounded by
+    the batch size and row locks are held for one page at a time. Rows that
+    already carry the target model's embedding are skipped, so an interrupted
+    run can simply be restarted (or resumed from the last logged id).
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        provider: EmbeddingProvider,
+        page_size: int = 1000,
+        batch_size: int = 100,
+        on_progress: Callable[[str], None] | None = None,
+    ):
+        self.db = db
+        self.issue_repo = IssueRepository(db)
+        self.provider = provider
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.on_progress = on_progress or print
+
+    def log(self, message: str) -> None:
+        self.on_progress(message)
+
+    def _flush(self, batch: list[dict]) -> None:
+        vectors = self.provider.embed_batch([embedding_text(r["title"], r["summary"]) for r in batch])
+        self.issue_repo.update_embeddings(
+            [(r["id"], v) for r, v in zip(batch, vectors)],
+            self.provider.model_name,
+        )
+
+    def run(self, after_id: str | None = None, missing_only: bool = False) -> int:
+        """Embed every matching issue after after_id. Returns count of updated issues."""
+        total = 0
+
+        while True:
+            page_count = 0
+            batch = []
+            for row in self.issue_repo.iter_embedding_targets(
+                self.provider.model_name,
+                after_id=after_id,
+                limit=self.page_size,
+                missing_only=missing_only,
+            ):
+                batch.append(row)
+                page_count += 1
+                after_id = str(row["id"])
+                if len(batch) >= self.batch_size:
+                    self._flush(batch)
+                    batch = []
+
+            if batch:
+                self._flush(batch)
+            self.db.commit()
+
+            if page_count == 0:
+                break
+
+            total += page_count
+            self.log(f"  Embedded {total} issues (last id: {after_id})")
+
+            if page_count < self.page_size:
+                break
+
+        return total
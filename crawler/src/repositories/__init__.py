@@ -1,4 +1,8 @@
 from .applications import ApplicationRepository
 from .issues import IssueRepository
+from .rollups import RollupRepository
+from .feeds import FeedSourceRepository
+from .schedules import CrawlScheduleRepository
 
-__all__ = ['ApplicationRepository', 'IssueRepository']
+__all__ = ['ApplicationRepository', 'IssueRepository', 'RollupRepository', 'FeedSourceRepository',
+           'CrawlScheduleRepository']
@@ -20,6 +20,14 @@ class ApplicationRepository:
         )
         return results[0] if results else None
 
+    def get_by_name(self, name: str) -> dict[str, Any] | None:
+        """Case-insensitive lookup, served by the unique lower(name) index."""
+        results = self.db.execute(
+            "SELECT id, name, vendor, keywords, created_at FROM applications WHERE lower(name) = lower(%s)",
+            (name,)
+        )
+        return results[0] if results else None
+
     def create(self, name: str, vendor: str | None, keywords: list[str]) -> dict[str, Any]:
         results = self.db.execute(
             """
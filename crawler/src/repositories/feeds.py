@@ -0,0 +1,48 @@
+from typing import Any
+from src.db import Database
+
+
+class FeedSourceRepository:
+    def __init__(self, db: Database):
+        self.db = db
+
+    def list_by_application(self, application_id: str) -> list[dict[str, Any]]:
+        return self.db.execute(
+            """
+            SELECT id, application_id, kind, url, etag, last_modified, last_seen, last_polled_at
+            FROM feed_sources
+            WHERE application_id = %s
+            ORDER BY created_at
+            """,
+            (application_id,)
+        )
+
+    def create(self, application_id: str, kind: str, url: str) -> dict[str, Any]:
+        results = self.db.execute(
+            """
+            INSERT INTO feed_sources (application_id, kind, url)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (application_id, url) DO UPDATE SET kind = EXCLUDED.kind
+            RETURNING id, application_id, kind, url
+            """,
+            (application_id, kind, url)
+        )
+        self.db.commit()
+        return results[0]
+
+    def update_cursor(
+        self,
+        feed_id: str,
+        etag: str | None,
+        last_modified: str | None,
+        last_seen: str | None
+    ) -> None:
+        self.db.execute(
+            """
+            UPDATE feed_sources
+            SET etag = %s, last_modified = %s, last_seen = %s, last_polled_at = NOW()
+            WHERE id = %s
+            """,
+            (etag, last_modified, last_seen, feed_id)
+        )
+        self.db.commit()
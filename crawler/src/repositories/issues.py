@@ -1,11 +1,23 @@
-from typing import Any
+from typing import Any, Iterator
 from datetime import datetime
-from src.db import Database
+from src.db import Database, MIN_UUID
+from src.content_store import ContentStore
+from .rollups import RollupRepository
+
+# Columns for list views: everything except raw_content and the embedding
+LIST_COLUMNS = """
+    id, application_id, version_id, title, summary,
+    source_type, source_url, severity, issue_type,
+    upvotes, comment_count, source_date, created_at
+"""
+
+DETAIL_COLUMNS = LIST_COLUMNS + ", embedding_model, embedding_dim"
 
 
 class IssueRepository:
     def __init__(self, db: Database):
         self.db = db
+        self.content_store = ContentStore(db)
 
     def create(
         self,
@@ -21,70 +33,185 @@ class IssueRepository:
         upvotes: int = 0,
         comment_count: int = 0,
         source_date: datetime | None = None,
-        embedding: list[float] | None = None
+        embedding: list[float] | None = None,
+        embedding_model: str | None = None,
+        created_at: datetime | None = None,
+        commit: bool = True
     ) -> dict[str, Any]:
+        if embedding is not None and not embedding_model:
+            raise ValueError("embedding_model is required when storing an embedding")
+        embedding_dim = len(embedding) if embedding is not None else None
+
+        # Page text goes to the compressed content store, not the issues heap
+        content_hash = self.content_store.put(raw_content) if raw_content is not None else None
+
         results = self.db.execute(
-            """
+            f"""
             INSERT INTO issues (
-                application_id, version_id, title, summary, raw_content,
+                application_id, version_id, title, summary, content_hash,
                 source_type, source_url, severity, issue_type,
-                upvotes, comment_count, source_date, embedding
+                upvotes, comment_count, source_date,
+                embedding, embedding_model, embedding_dim, created_at
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING *
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s::vector, %s, %s, COALESCE(%s, NOW()))
+            RETURNING {DETAIL_COLUMNS}
             """,
             (
-                application_id, version_id, title, summary, raw_content,
+                application_id, version_id, title, summary, content_hash,
                 source_type, source_url, severity, issue_type,
-                upvotes, comment_count, source_date, embedding
+                upvotes, comment_count, source_date,
+                embedding, embedding_model if embedding is not None else None, embedding_dim, created_at
             )
         )
-        self.db.commit()
+        if commit:
+            self.db.commit()
         return results[0]
 
     def list_by_application(
         self,
         application_id: str,
         severity: str | None = None,
-        limit: int = 100
+        limit: int = 100,
+        before: tuple[datetime, str] | None = None
     ) -> list[dict[str, Any]]:
-        query = """
-            SELECT * FROM issues
+        """Newest issues first, without raw_content or embeddings.
+
+        Pass the (created_at, id) of the last row as `before` to fetch the next page.
+        """
+        query = f"""
+            SELECT {LIST_COLUMNS} FROM issues
             WHERE application_id = %s
         """
-        params = [application_id]
+        params: list[Any] = [application_id]
 
         if severity:
             query += " AND severity = %s"
             params.append(severity)
 
-        query += " ORDER BY created_at DESC LIMIT %s"
+        if before:
+            query += " AND (created_at, id) < (%s, %s)"
+            params.extend(before)
+
+        query += " ORDER BY created_at DESC, id DESC LIMIT %s"
         params.append(limit)
 
         return self.db.execute(query, tuple(params))
 
-    def get_by_id(self, issue_id: str) -> dict[str, Any] | None:
+    def get_by_id(
+        self,
+        issue_id: str,
+        include_raw_content: bool = False,
+        include_embedding: bool = False
+    ) -> dict[str, Any] | None:
+        columns = DETAIL_COLUMNS
+        if include_raw_content:
+            columns += ", raw_content, content_hash"
+        if include_embedding:
+            columns += ", embedding::real[] AS embedding"
+
         results = self.db.execute(
-            "SELECT * FROM issues WHERE id = %s",
+            f"SELECT {columns} FROM issues WHERE id = %s",
             (issue_id,)
         )
-        return results[0] if results else None
+        if not results:
+            return None
+
+        issue = results[0]
+        if include_raw_content:
+            issue['raw_content'] = self._resolve_raw_content(issue.pop('raw_content'), issue.pop('content_hash'))
+        return issue
+
+    def get_raw_content(self, issue_id: str) -> str | None:
+        results = self.db.execute(
+            "SELECT raw_content, content_hash FROM issues WHERE id = %s",
+            (issue_id,)
+        )
+        if not results:
+            return None
+        return self._resolve_raw_content(results[0]['raw_content'], results[0]['content_hash'])
+
+    def _resolve_raw_content(self, raw_content: str | None, content_hash: bytes | None) -> str | None:
+        # Rows not yet moved by `migrate-content` still carry raw_content inline
+        if raw_content is not None or content_hash is None:
+            return raw_content
+        return self.content_store.get(bytes(content_hash))
+
+    def get_embedding(self, issue_id: str) -> list[float] | None:
+        results = self.db.execute(
+            "SELECT embedding::real[] AS embedding FROM issues WHERE id = %s",
+            (issue_id,)
+        )
+        return results[0]['embedding'] if results else None
 
     def exists_by_url(self, source_url: str) -> bool:
+        # issue_urls spans all partitions of issues (see database/07_partition_issues.sql)
         results = self.db.execute(
-            "SELECT 1 FROM issues WHERE source_url = %s LIMIT 1",
+            "SELECT 1 FROM issue_urls WHERE source_url = %s",
             (source_url,)
         )
         return len(results) > 0
 
-    def count_by_severity(self, application_id: str) -> dict[str, int]:
+    def existing_urls(self, source_urls: list[str]) -> set[str]:
+        """The subset of source_urls already stored."""
+        if not source_urls:
+            return set()
         results = self.db.execute(
-            """
-            SELECT severity, COUNT(*) as count
-            FROM issues
-            WHERE application_id = %s
-            GROUP BY severity
+            "SELECT source_url FROM issue_urls WHERE source_url = ANY(%s)",
+            (source_urls,)
+        )
+        return {r["source_url"] for r in results}
+
+    def count_by_severity(self, application_id: str) -> dict[str, int]:
+        """Issue counts per severity, read from the issue_counts rollup."""
+        return RollupRepository(self.db).count_by_severity(application_id)
+
+    def iter_embedding_targets(
+        self,
+        embedding_model: str,
+        after_id: str | None = None,
+        limit: int = 1000,
+        missing_only: bool = False
+    ) -> Iterator[dict[str, Any]]:
+        """Stream the next keyset page of issues that need a (re-)embedding, ordered by id."""
+        query = """
+            SELECT id, title, summary FROM issues
+            WHERE id > %s
+        """
+        params: list[Any] = [after_id or MIN_UUID]
+
+        if missing_only:
+            query += " AND embedding IS NULL"
+        else:
+            query += " AND (embedding IS NULL OR embedding_model IS DISTINCT FROM %s)"
+            params.append(embedding_model)
+
+        query += " ORDER BY id LIMIT %s"
+        params.append(limit)
+
+        return self.db.stream(query, tuple(params))
+
+    def update_embeddings(
+        self,
+        embeddings: list[tuple[str, list[float]]],
+        embedding_model: str
+    ) -> None:
+        """Write (issue_id, embedding) pairs in a single UPDATE ... FROM (VALUES ...)."""
+        if not embeddings:
+            return
+
+        values = ", ".join(["(%s::uuid, %s::vector)"] * len(embeddings))
+        params: list[Any] = [embedding_model]
+        for issue_id, embedding in embeddings:
+            params.extend((issue_id, embedding))
+
+        self.db.execute(
+            f"""
+            UPDATE issues AS i
+            SET embedding = v.embedding,
+                embedding_model = %s,
+                embedding_dim = vector_dims(v.embedding)
+            FROM (VALUES {values}) AS v(id, embedding)
+            WHERE i.id = v.id
             """,
-            (application_id,)
+            tuple(params)
         )
-        return {r['severity']: r['count'] for r in results}
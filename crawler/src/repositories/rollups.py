@@ -0,0 +1,84 @@
+from typing import Any
+from datetime import date
+from src.db import Database
+
+
+class RollupRepository:
+    """Reads the trigger-maintained issue count rollups (database/04_issue_rollups.sql)."""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def count_by_severity(self, application_id: str) -> dict[str, int]:
+        results = self.db.execute(
+            """
+            SELECT severity, SUM(issue_count)::int as count
+            FROM issue_counts
+            WHERE application_id = %s
+            GROUP BY severity
+            """,
+            (application_id,)
+        )
+        return {r['severity']: r['count'] for r in results if r['count']}
+
+    def count_by_type(self, application_id: str) -> dict[str, int]:
+        results = self.db.execute(
+            """
+            SELECT issue_type, SUM(issue_count)::int as count
+            FROM issue_counts
+            WHERE application_id = %s
+            GROUP BY issue_type
+            """,
+            (application_id,)
+        )
+        return {(r['issue_type'] or None): r['count'] for r in results if r['count']}
+
+    def counts_by_application(self) -> list[dict[str, Any]]:
+        return self.db.execute("""
+            SELECT
+                a.id, a.name,
+                COALESCE(SUM(c.issue_count) FILTER (WHERE c.severity = 'critical'), 0)::int as critical_count,
+                COALESCE(SUM(c.issue_count) FILTER (WHERE c.severity = 'major'), 0)::int as major_count,
+                COALESCE(SUM(c.issue_count) FILTER (WHERE c.severity = 'minor'), 0)::int as minor_count,
+                COALESCE(SUM(c.issue_count), 0)::int as total_issues
+            FROM applications a
+            LEFT JOIN issue_counts c ON c.application_id = a.id
+            GROUP BY a.id
+            ORDER BY a.name
+        """)
+
+    def daily_counts(self, application_id: str, since: date) -> list[dict[str, Any]]:
+        return self.db.execute(
+            """
+            SELECT day, severity, issue_type, issue_count
+            FROM issue_daily_counts
+            WHERE application_id = %s AND day >= %s AND issue_count > 0
+            ORDER BY day, severity, issue_type
+            """,
+            (application_id, since)
+        )
+
+    def rebuild(self) -> None:
+        """Recompute all rollups from the issues table.
+
+        The lock blocks the trigger's writes until the rebuild commits, so
+        issues inserted concurrently are counted exactly once.
+        """
+        self.db.execute("LOCK TABLE issue_counts, issue_daily_counts IN SHARE ROW EXCLUSIVE MODE")
+        self.db.execute("DELETE FROM issue_counts")
+        self.db.execute("DELETE FROM issue_daily_counts")
+        self.db.execute("""
+            INSERT INTO issue_counts (application_id, severity, issue_type, issue_count)
+            SELECT application_id, severity, COALESCE(issue_type, ''), COUNT(*)
+            FROM issues
+            WHERE application_id IS NOT NULL
+            GROUP BY 1, 2, 3
+        """)
+        self.db.execute("""
+            INSERT INTO issue_daily_counts (application_id, day, severity, issue_type, issue_count)
+            SELECT application_id, COALESCE(created_at, now())::date, severity, COALESCE(issue_type, ''), COUNT(*)
+            FROM issues
+            WHERE application_id IS NOT NULL
+            GROUP BY 1, 2, 3, 4
+        """)
+        self.db.commit()
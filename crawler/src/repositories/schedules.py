@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import Any
+from src.db import Database
+from src.scheduler import AppSchedule
+
+
+class CrawlScheduleRepository:
+    """Persists the daemon's per-application schedule (database/13_crawl_schedule.sql).
+
+    The scheduler works in epoch seconds; rows store timestamps.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def load(self) -> dict[str, dict[str, Any]]:
+        """Saved state per application id, in the scheduler's units."""
+        rows = self.db.execute("""
+            SELECT application_id, next_run, interval_secs, yield_ewma, crawls,
+                   last_run, last_new, last_error
+            FROM crawl_schedule
+        """)
+        return {
+            str(row["application_id"]): {
+                "next_run": row["next_run"].timestamp(),
+                "interval": row["interval_secs"],
+                "yield_ewma": row["yield_ewma"],
+                "crawls": row["crawls"],
+                "last_run": row["last_run"].timestamp() if row["last_run"] else None,
+                "last_new": row["last_new"],
+                "last_error": row["last_error"],
+            }
+            for row in rows
+        }
+
+    def save(self, schedule: AppSchedule) -> None:
+        self.db.execute(
+            """
+            INSERT INTO crawl_schedule (application_id, next_run, interval_secs, yield_ewma, crawls,
+                                        last_run, last_new, last_error)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (application_id) DO UPDATE SET
+                next_run = EXCLUDED.next_run,
+                interval_secs = EXCLUDED.interval_secs,
+                yield_ewma = EXCLUDED.yield_ewma,
+                crawls = EXCLUDED.crawls,
+                last_run = EXCLUDED.last_run,
+                last_new = EXCLUDED.last_new,
+                last_error = EXCLUDED.last_error,
+                updated_at = NOW()
+            """,
+            (
+                schedule.app_id,
+                datetime.fromtimestamp(schedule.next_run),
+                schedule.interval,
+                schedule.yield_ewma,
+                schedule.crawls,
+                datetime.fromtimestamp(schedule.last_run) if schedule.last_run is not None else None,
+                schedule.last_new,
+                schedule.last_error,
+            )
+        )
+        self.db.commit()
@@ -0,0 +1,117 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+DEFAULT_MIN_INTERVAL = 15 * 60
+DEFAULT_MAX_INTERVAL = 24 * 60 * 60
+
+# Weight of the latest crawl in an application's yield average
+YIELD_ALPHA = 0.5
+
+
+@dataclass
+class AppSchedule:
+    app_id: str
+    name: str
+    next_run: float
+    interval: float
+    yield_ewma: float = 1.0  # new issues per crawl
+    crawls: int = 0
+    last_run: float | None = None
+    last_new: int | None = None
+    last_error: str | None = None
+
+
+class CrawlScheduler:
+    """Per-application crawl cadence that adapts to how productive each app is.
+
+    The interval is max_interval / (1 + average new issues per crawl), clamped
+    to [min_interval, max_interval]: an app yielding nothing is crawled once a
+    day, one yielding ten issues a crawl every couple of hours.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        clock: Callable[[], float] = time.time,
+    ):
+        if min_interval > max_interval:
+            raise ValueError("min_interval must not exceed max_interval")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.clock = clock
+        self.schedules: dict[str, AppSchedule] = {}
+
+    def interval_for(self, yield_ewma: float) -> float:
+        return max(self.min_interval, min(self.max_interval, self.max_interval / (1 + yield_ewma)))
+
+    def sync(self, apps: list[dict[str, Any]]) -> None:
+        """Track new applications (due immediately) and forget deleted ones."""
+        now = self.clock()
+        current = {str(app["id"]): app for app in apps}
+        for app_id in list(self.schedules):
+            if app_id not in current:
+                del self.schedules[app_id]
+        for app_id, app in current.items():
+            if app_id in self.schedules:
+                self.schedules[app_id].name = app["name"]
+            else:
+                self.schedules[app_id] = AppSchedule(
+                    app_id=app_id, name=app["name"], next_run=now, interval=self.interval_for(1.0)
+                )
+
+    def restore(self, saved: dict[str, dict[str, Any]]) -> None:
+        """Resume tracked applications from saved state (e.g. after a restart).
+
+        Intervals are re-clamped, in case the bounds changed since they were saved.
+        """
+        for app_id, state in saved.items():
+            schedule = self.schedules.get(app_id)
+            if schedule is None:
+                continue
+            schedule.yield_ewma = state["yield_ewma"]
+            schedule.interval = self.interval_for(schedule.yield_ewma)
+            schedule.next_run = min(state["next_run"], self.clock() + schedule.interval)
+            schedule.crawls = state["crawls"]
+            schedule.last_run = state["last_run"]
+            schedule.last_new = state["last_new"]
+            schedule.last_error = state["last_error"]
+
+    def next_due(self) -> AppSchedule | None:
+        """The most overdue application, or None if nothing is due yet."""
+        if not self.schedules:
+            return None
+        schedule = min(self.schedules.values(), key=lambda s: s.next_run)
+        return schedule if schedule.next_run <= self.clock() else None
+
+    def seconds_until_next(self) -> float | None:
+        if not self.schedules:
+            return None
+        return max(0.0, min(s.next_run for s in self.schedules.values()) - self.clock())
+
+    def record(self, schedule: AppSchedule, new_issues: int, error: str | None = None) -> None:
+        """Update an application's yield average and schedule its next crawl."""
+        now = self.clock()
+        schedule.yield_ewma = (1 - YIELD_ALPHA) * schedule.yield_ewma + YIELD_ALPHA * new_issues
+        schedule.interval = self.interval_for(schedule.yield_ewma)
+        schedule.next_run = now + schedule.interval
+        schedule.crawls += 1
+        schedule.last_run = now
+        schedule.last_new = new_issues
+        schedule.last_error = error
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "app_id": s.app_id,
+                "name": s.name,
+                "next_run_in": round(max(0.0, s.next_run - self.clock())),
+                "interval": round(s.interval),
+                "yield": round(s.yield_ewma, 2),
+                "crawls": s.crawls,
+                "last_new": s.last_new,
+                "last_error": s.last_error,
+            }
+            for s in sorted(self.schedules.values(), key=lambda s: s.next_run)
+        ]
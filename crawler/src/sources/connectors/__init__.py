@@ -0,0 +1,21 @@
+import httpx
+from .interface import SourceConnector, FeedCursor, PollResult
+from .rss import RSSConnector
+from .reddit import RedditConnector
+
+CONNECTORS = {
+    RSSConnector.kind: RSSConnector,
+    RedditConnector.kind: RedditConnector,
+}
+
+
+def get_connector(kind: str, client: httpx.Client | None = None) -> SourceConnector:
+    if kind not in CONNECTORS:
+        raise ValueError(f"Unknown feed kind: {kind}")
+    return CONNECTORS[kind](client=client)
+
+
+__all__ = [
+    'SourceConnector', 'FeedCursor', 'PollResult', 'RSSConnector', 'RedditConnector',
+    'CONNECTORS', 'get_connector',
+]
@@ -0,0 +1,70 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+import httpx
+from bs4 import BeautifulSoup
+from ..models import FetchedPage
+from ..web_fetcher import DEFAULT_HEADERS
+
+
+@dataclass(slots=True)
+class FeedCursor:
+    etag: str | None = None
+    last_modified: str | None = None
+    last_seen: str | None = None  # newest item timestamp already emitted (ISO 8601)
+
+
+@dataclass(slots=True)
+class PollResult:
+    cursor: FeedCursor
+    pages: list[FetchedPage] = field(default_factory=list)
+    not_modified: bool = False
+
+
+class SourceConnector(ABC):
+    """Polls a feed and turns its new items into FetchedPage objects.
+
+    Items already carry their text, so there is no search query and no page
+    fetch. poll() sends the cursor's validators as a conditional GET and only
+    emits items newer than cursor.last_seen.
+    """
+    kind: str
+
+    def __init__(self, client: httpx.Client | None = None, timeout: float = 15.0):
+        self.client = client
+        self.timeout = timeout
+
+    def html_to_text(self, html: str) -> str:
+        """Flatten an item's HTML body; feed snippets are short, so inline tags join with spaces."""
+        if not html:
+            return ""
+        return BeautifulSoup(html, "html.parser").get_text(" ", strip=True)
+
+    @abstractmethod
+    def parse(self, body: bytes, cursor: FeedCursor) -> tuple[list[FetchedPage], str | None]:
+        """Pages for items newer than cursor.last_seen, plus the newest timestamp seen."""
+        pass
+
+    def poll(self, url: str, cursor: FeedCursor | None = None) -> PollResult:
+        cursor = cursor or FeedCursor()
+        headers = dict(DEFAULT_HEADERS)
+        if cursor.etag:
+            headers["If-None-Match"] = cursor.etag
+        if cursor.last_modified:
+            headers["If-Modified-Since"] = cursor.last_modified
+
+        response = (self.client or httpx).get(
+            url, headers=headers, timeout=self.timeout, follow_redirects=True
+        )
+        if response.status_code == 304:
+            return PollResult(cursor=cursor, not_modified=True)
+        response.raise_for_status()
+
+        pages, newest = self.parse(response.content, cursor)
+        return PollResult(
+            cursor=FeedCursor(
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                last_seen=max(filter(None, [cursor.last_seen, newest]), default=None),
+            ),
+            pages=pages,
+        )
@@ -0,0 +1,36 @@
+import json
+from datetime import datetime, timezone
+from ..models import FetchedPage
+from .interface import SourceConnector, FeedCursor
+
+REDDIT_URL = "https://www.reddit.com"
+
+
+class RedditConnector(SourceConnector):
+    """Reddit JSON listings, e.g. https://www.reddit.com/r/sysadmin/search.json?q=teams&sort=new&restrict_sr=1"""
+    kind = "reddit"
+
+    def parse(self, body: bytes, cursor: FeedCursor) -> tuple[list[FetchedPage], str | None]:
+        pages = []
+        newest = None
+        for child in json.loads(body).get("data", {}).get("children", []):
+            post = child.get("data", {})
+            permalink = post.get("permalink")
+            if not permalink or post.get("stickied"):
+                continue
+
+            timestamp = datetime.fromtimestamp(post.get("created_utc", 0), tz=timezone.utc).isoformat()
+            newest = max(newest or timestamp, timestamp)
+            if cursor.last_seen and timestamp <= cursor.last_seen:
+                continue
+
+            title = post.get("title", "").strip()
+            text = post.get("selftext", "").strip()
+            pages.append(FetchedPage(
+                url=f"{REDDIT_URL}{permalink}",
+                title=title,
+                content=f"{title}\n{text}" if text else title,
+                source="reddit.com",
+                published=timestamp,
+            ))
+        return pages, newest
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class WebSearchResult:
     url: str
     title: str
@@ -9,9 +9,10 @@ class WebSearchResult:
     source: str
 
 
-@dataclass
+@dataclass(slots=True)
 class FetchedPage:
     url: str
     title: str
     content: str
     source: str
+    published: str | None = None  # feed item timestamp (UTC ISO 8601), if the source has one
@@ -13,8 +13,9 @@ DEFAULT_HEADERS = {
 
 
 class WebFetcher:
-    def __init__(self, timeout: float = 15.0):
+    def __init__(self, timeout: float = 15.0, client: httpx.Client | None = None):
         self.timeout = timeout
+        self.client = client
 
     def extract_text(self, html: str) -> str:
         """Extract readable text content from HTML, stripping boilerplate."""
@@ -38,7 +39,7 @@ class WebFetcher:
     def fetch(self, url: str) -> FetchedPage | None:
         """Fetch a URL and extract its text content. Returns None on failure."""
         try:
-            response = httpx.get(
+            response = (self.client or httpx).get(
                 url,
                 headers=DEFAULT_HEADERS,
                 timeout=self.timeout,
@@ -1,5 +1,6 @@
 import os
 import time
+from typing import Iterator
 from urllib.parse import urlparse
 import httpx
 from dotenv import load_dotenv
@@ -11,13 +12,23 @@ SEARCH_SUFFIXES = ["issue", "bug", "problem", "crash", "not working"]
 
 BRAVE_API_URL = "https://api.search.brave.com/res/v1/web/search"
 
+# Minimum seconds between Brave API requests
+QUERY_INTERVAL = 1.0
+
 
 class WebSearch:
-    def __init__(self, api_key: str | None = None, max_results_per_query: int = 10):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        max_results_per_query: int = 10,
+        client: httpx.Client | None = None,
+    ):
         self.api_key = api_key or os.environ.get("BRAVE_API_KEY")
         if not self.api_key:
             raise ValueError("BRAVE_API_KEY not set")
         self.max_results_per_query = max_results_per_query
+        # A shared client keeps connections (and TLS sessions) warm across queries
+        self.client = client
 
     def build_queries(self, keywords: list[str]) -> list[str]:
         """Build search queries from keywords and issue-related suffixes."""
@@ -30,7 +41,7 @@ class WebSearch:
     def _search_single_query(self, query: str) -> list[dict]:
         """Run a single Brave Search API query. Returns raw result dicts."""
         try:
-            response = httpx.get(
+            response = (self.client or httpx).get(
                 BRAVE_API_URL,
                 headers={
                     "Accept": "application/json",
@@ -50,28 +61,35 @@ class WebSearch:
             print(f"Search error for '{query}': {e}")
             return []
 
-    def search(self, keywords: list[str]) -> list[WebSearchResult]:
-        """Search for issues related to the given keywords. Deduplicates by URL."""
-        queries = self.build_queries(keywords)
+    def iter_search(self, keywords: list[str]) -> Iterator[WebSearchResult]:
+        """Yield deduplicated results as each query completes.
+
+        Queries run only as the caller consumes results, so fetching a page
+        overlaps with the rate-limit wait before the next query.
+        """
         seen_urls = set()
-        results = []
+        last_request = None
 
-        for i, query in enumerate(queries):
-            if i > 0:
-                time.sleep(1)
-            raw_results = self._search_single_query(query)
-            for item in raw_results:
+        for query in self.build_queries(keywords):
+            if last_request is not None:
+                wait = QUERY_INTERVAL - (time.monotonic() - last_request)
+                if wait > 0:
+                    time.sleep(wait)
+            last_request = time.monotonic()
+
+            for item in self._search_single_query(query):
                 url = item.get("url", "")
                 if not url or url in seen_urls:
                     continue
                 seen_urls.add(url)
 
-                domain = urlparse(url).netloc
-                results.append(WebSearchResult(
+                yield WebSearchResult(
                     url=url,
                     title=item.get("title", ""),
                     snippet=item.get("description", ""),
-                    source=domain,
-                ))
+                    source=urlparse(url).netloc,
+                )
 
-        return results
+    def search(self, keywords: list[str]) -> list[WebSearchResult]:
+        """Search for issues related to the given keywords. Deduplicates by URL."""
+        return list(self.iter_search(keywords))
@@ -0,0 +1,405 @@
+import json
+import os
+import shutil
+import struct
+import threading
+import time
+import zlib
+from datetime import date, datetime
+from typing import Any, Callable, Iterator
+import psycopg
+from src.db import Database
+from src.repositories import IssueRepository
+from src.clustering import IncidentClusterer
+from src.partitions import PartitionManager
+from src.trends import TrendDetector
+
+# Record framing: payload length, CRC32 of payload, length of the JSON header.
+# The payload is the JSON header followed by the embedding as packed float32s.
+RECORD_HEADER = struct.Struct("<III")
+
+FSYNC_POLICIES = ("always", "interval", "never")
+DEFAULT_FSYNC_INTERVAL = 1.0
+
+# Largest payload written or accepted when reading; bounds the work spent on
+# a corrupt length field while resyncing
+MAX_RECORD_BYTES = 32 * 1024 * 1024
+
+# Bytes scanned per read while looking for the next record after a corrupt one
+RESYNC_CHUNK = 1024 * 1024
+
+# Errors that mean the record itself is bad, not the connection; such records
+# are moved aside instead of being retried forever
+REJECTED_ERRORS = (psycopg.IntegrityError, psycopg.DataError, KeyError, ValueError)
+
+# Loaded bytes after which the loader compacts the spool it shares a process with
+DEFAULT_COMPACT_BYTES = 16 * 1024 * 1024
+
+
+def offset_path(path: str) -> str:
+    """Where the loader keeps how far into the spool it has loaded."""
+    return f"{path}.offset"
+
+
+def apps_path(path: str) -> str:
+    """Where the crawler keeps the last application list it read, for outages."""
+    return f"{path}.apps"
+
+
+def rejected_path(path: str) -> str:
+    """Where the loader moves records the database refuses, in spool format."""
+    return f"{path}.rejected"
+
+
+def read_offset(path: str) -> int:
+    try:
+        with open(offset_path(path)) as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def encode_record(fields: dict[str, Any], embedding: list[float] | None) -> bytes:
+    header = json.dumps(fields, separators=(",", ":"), default=str).encode("utf-8")
+    vector = struct.pack(f"<{len(embedding)}f", *embedding) if embedding else b""
+    payload = header + vector
+    if len(payload) > MAX_RECORD_BYTES:
+        raise ValueError(f"Spool record too large: {len(payload)} bytes")
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload), len(header)) + payload
+
+
+def _valid_frame(f, start: int, header: bytes) -> bool:
+    """Whether a complete record with a matching CRC starts at offset start."""
+    length, crc, header_length = RECORD_HEADER.unpack(header)
+    if not 0 < header_length <= length <= MAX_RECORD_BYTES:
+        return False
+    f.seek(start + RECORD_HEADER.size)
+    payload = f.read(length)
+    return len(payload) == length and zlib.crc32(payload) == crc
+
+
+def next_frame(f, start: int) -> int | None:
+    """Offset of the first valid record at or after start, or None if there is none.
+
+    Scans RESYNC_CHUNK bytes at a time. Every payload starts with its JSON
+    header, so only offsets followed by a "{" are checked against their CRC.
+    """
+    chunk_start = start
+    while True:
+        f.seek(chunk_start)
+        # Overlap the next chunk by a header, so frames across the boundary are seen
+        data = f.read(RESYNC_CHUNK + RECORD_HEADER.size)
+        if len(data) <= RECORD_HEADER.size:
+            return None
+        brace = data.find(b"{", RECORD_HEADER.size)
+        while 0 <= brace - RECORD_HEADER.size < RESYNC_CHUNK:
+            i = brace - RECORD_HEADER.size
+            if _valid_frame(f, chunk_start + i, data[i:brace]):
+                return chunk_start + i
+            brace = data.find(b"{", brace + 1)
+        chunk_start += RESYNC_CHUNK
+
+
+def read_records(path: str, offset: int = 0) -> Iterator[tuple[int, dict[str, Any], list[float] | None]]:
+    """Yield (end_offset, fields, embedding) for each complete record after offset.
+
+    A corrupt record is skipped by resyncing to the next valid record header;
+    reading stops at a torn tail, e.g. a write interrupted by a crash.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            length, crc, header_length = RECORD_HEADER.unpack(header)
+            plausible = 0 < header_length <= length <= MAX_RECORD_BYTES
+            payload = f.read(length) if plausible else b""
+            if not plausible or len(payload) != length or zlib.crc32(payload) != crc:
+                resync = next_frame(f, offset + 1)
+                if resync is None:
+                    return
+                offset = resync
+                f.seek(offset)
+                continue
+            offset += RECORD_HEADER.size + length
+
+            fields = json.loads(payload[:header_length])
+            vector = payload[header_length:]
+            embedding = list(struct.unpack(f"<{len(vector) // 4}f", vector)) if vector else None
+            yield offset, fields, embedding
+
+
+class IssueSpool:
+    """Append-only local log of classified issues, written before the database.
+
+    fsync policy: "always" syncs every record, "interval" at most every
+    fsync_interval seconds, "never" leaves it to the OS. Configure the default
+    with SPOOL_FSYNC.
+    """
+
+    def __init__(self, path: str, fsync: str | None = None, fsync_interval: float = DEFAULT_FSYNC_INTERVAL):
+        fsync = fsync or os.environ.get("SPOOL_FSYNC", "interval")
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown spool fsync policy: {fsync}")
+        self.path = path
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._repair()
+        self._file = open(path, "ab")
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+        self._urls: set[str] = set()
+
+    def _repair(self) -> None:
+        """Cut off a torn tail left by a crash, so new records stay readable.
+
+        Only bytes after the last readable record go; records after a corrupt
+        one in the middle are kept and read by resyncing.
+        """
+        if not os.path.exists(self.path):
+            return
+        end = read_offset(self.path)
+        for end, _, _ in read_records(self.path, end):
+            pass
+        if end < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+
+    def append(self, fields: dict[str, Any], embedding: list[float] | None = None) -> None:
+        record = encode_record(fields, embedding)
+        with self._lock:
+            self._file.write(record)
+            self._file.flush()
+            now = time.monotonic()
+            if self.fsync == "always" or (self.fsync == "interval" and now - self._last_sync >= self.fsync_interval):
+                os.fsync(self._file.fileno())
+                self._last_sync = now
+            if fields.get("source_url"):
+                self._urls.add(fields["source_url"])
+
+    def save_apps(self, apps: list[dict[str, Any]]) -> None:
+        """Keep the application rows next to the spool, so a crawl started
+        while the database is down still knows what to crawl."""
+        tmp_path = f"{apps_path(self.path)}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(apps, f, default=str)
+        os.replace(tmp_path, apps_path(self.path))
+
+    def load_apps(self) -> list[dict[str, Any]]:
+        try:
+            with open(apps_path(self.path)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return []
+
+    def contains(self, source_url: str) -> bool:
+        """Whether the URL is in the spool, loaded or not (until the next compaction)."""
+        return source_url in self._urls
+
+    def compact(self, loaded: int, save_offset: Callable[[int], None]) -> None:
+        """Drop the records before the loaded offset, which are in the database.
+
+        Records not loaded yet are copied into a new file that replaces the
+        spool. The offset is reset to 0 before the swap, so a crash in between
+        only replays loaded records, which the loader skips. Forgets the URLs
+        of loaded records: the database answers for those now.
+        """
+        with self._lock:
+            self._file.flush()
+            tmp_path = f"{self.path}.compact"
+            with open(self.path, "rb") as src, open(tmp_path, "wb") as dst:
+                src.seek(loaded)
+                shutil.copyfileobj(src, dst)
+                dst.flush()
+                os.fsync(dst.fileno())
+            save_offset(0)
+            os.replace(tmp_path, self.path)
+            self._file.close()
+            self._file = open(self.path, "ab")
+            self._urls = {
+                fields["source_url"] for _, fields, _ in read_records(self.path) if fields.get("source_url")
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self.fsync != "never":
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._file.close()
+
+
+class SpoolLoader:
+    """Loads spooled issues into Postgres, idempotently, from a saved offset.
+
+    Records whose source_url is already stored are skipped, so replaying a
+    batch after a crash (between commit and offset save) is harmless. The
+    offset lives next to the spool in <path>.offset. A record the database
+    refuses (its application deleted, a bad severity, a wrong embedding
+    dimension) is moved to <path>.rejected so it cannot block the records
+    after it. The month partitions are ensured once a day before loading, so a
+    crawl started while the database was down leaves that to the loader. Given the IssueSpool
+    being written in the same process, the loader compacts it once more than
+    compact_bytes have been loaded.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        path: str,
+        batch_size: int = 100,
+        on_progress: Callable[[str], None] | None = None,
+        spool: IssueSpool | None = None,
+        compact_bytes: int = DEFAULT_COMPACT_BYTES,
+    ):
+        self.db = db
+        self.path = path
+        self.batch_size = batch_size
+        self.on_progress = on_progress or print
+        self.spool = spool
+        self.compact_bytes = compact_bytes
+        self.issue_repo = IssueRepository(db)
+        self.clusterer = IncidentClusterer(db)
+        self.trends = TrendDetector(db)
+        self._partitions_checked: date | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _save_offset(self, offset: int) -> None:
+        tmp_path = f"{offset_path(self.path)}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, offset_path(self.path))
+
+    def load(self) -> int:
+        """Load everything spooled since the saved offset. Returns count of issues inserted."""
+        loaded = 0
+        batch: list[tuple[dict[str, Any], list[float] | None]] = []
+        end_offset = read_offset(self.path)
+
+        for offset, fields, embedding in read_records(self.path, end_offset):
+            batch.append((fields, embedding))
+            end_offset = offset
+            if len(batch) >= self.batch_size:
+                loaded += self._load_batch(batch)
+                self._save_offset(end_offset)
+                batch = []
+        if batch:
+            loaded += self._load_batch(batch)
+            self._save_offset(end_offset)
+
+        if loaded:
+            self.trends.flush()
+        if self.spool is not None and end_offset >= self.compact_bytes:
+            self.spool.compact(end_offset, self._save_offset)
+        return loaded
+
+    def _insert(self, fields: dict[str, Any], embedding: list[float] | None, commit: bool) -> dict[str, Any]:
+        return self.issue_repo.create(
+            application_id=fields["application_id"],
+            title=fields["title"],
+            summary=fields["summary"],
+            raw_content=fields.get("raw_content"),
+            source_type=fields["source_type"],
+            source_url=fields["source_url"],
+            source_date=datetime.fromisoformat(fields["source_date"]) if fields.get("source_date") else None,
+            severity=fields["severity"],
+            issue_type=fields.get("issue_type"),
+            embedding=embedding,
+            embedding_model=fields.get("embedding_model"),
+            created_at=datetime.fromisoformat(fields["spooled_at"]) if fields.get("spooled_at") else None,
+            commit=commit,
+        )
+
+    def _reject(self, fields: dict[str, Any], embedding: list[float] | None, error: Exception) -> None:
+        path = rejected_path(self.path)
+        with open(path, "ab") as f:
+            f.write(encode_record({**fields, "load_error": str(error)}, embedding))
+        self.on_progress(f"  Spool: moved {fields.get('source_url')} to {path}: {error}")
+
+    def _load_batch(self, batch: list[tuple[dict[str, Any], list[float] | None]]) -> int:
+        existing = self.issue_repo.existing_urls([fields["source_url"] for fields, _ in batch])
+        pending = []
+        for fields, embedding in batch:
+            if fields["source_url"] not in existing:
+                existing.add(fields["source_url"])
+                pending.append((fields, embedding))
+        if not pending:
+            return 0
+
+        if self._partitions_checked != date.today():
+            PartitionManager(self.db).ensure()
+            self._partitions_checked = date.today()
+
+        inserted = []
+        try:
+            # One transaction for the batch
+            for fields, embedding in pending:
+                inserted.append((self._insert(fields, embedding, commit=False), embedding))
+            self.db.commit()
+        except REJECTED_ERRORS:
+            # Another writer stored one of these URLs meanwhile, or a record is
+            # bad: retry one by one. Connection errors still fail the batch.
+            self.db.reset()
+            inserted = []
+            for fields, embedding in pending:
+                try:
+                    inserted.append((self._insert(fields, embedding, commit=True), embedding))
+                except psycopg.errors.UniqueViolation:
+                    self.db.reset()
+                except REJECTED_ERRORS as e:
+                    self.db.reset()
+                    self._reject(fields, embedding, e)
+
+        for issue, embedding in inserted:
+            try:
+                if embedding is not None:
+                    self.clusterer.assign(issue, embedding)
+                self.trends.record(issue)
+            except Exception as e:
+                # The issue is committed; roll back only the failed cluster/trend writes
+                self.db.reset()
+                self.on_progress(f"  Post-load error for {issue.get('source_url')}: {e}")
+        return len(inserted)
+
+    def _run(self, interval: float) -> None:
+        while True:
+            stopping = self._stop.is_set()
+            try:
+                count = self.load()
+                if count:
+                    self.on_progress(f"  Spool: loaded {count} issues")
+            except Exception as e:
+                self.on_progress(f"  Spool load error (will retry): {e}")
+                try:
+                    self.db.reset()
+                except Exception:
+                    pass
+            if stopping:
+                return
+            self._stop.wait(interval)
+
+    def start(self, interval: float = 2.0) -> None:
+        """Load in a background thread every `interval` seconds until stop()."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="spool-loader", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread after one final load attempt."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def truncate(self) -> None:
+        """Empty a fully loaded spool. Only safe while no crawler is writing to it."""
+        if read_offset(self.path) != os.path.getsize(self.path):
+            raise ValueError("Spool has records that are not loaded yet")
+        with open(self.path, "wb"):
+            pass
+        self._save_offset(0)
@@ -0,0 +1,267 @@
+import math
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+from src.db import Database
+
+BUCKET = timedelta(hours=1)
+WINDOW = 168  # one week of hourly buckets
+
+# EWMA smoothing factor and the z-score a bucket must reach to count as a spike
+ALPHA = 0.1
+Z_THRESHOLD = 3.0
+MIN_SPIKE_COUNT = 3
+
+
+def bucket_start(timestamp: datetime) -> datetime:
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+@dataclass
+class Spike:
+    application_id: str
+    severity: str
+    issue_type: str
+    bucket_start: datetime
+    observed: int
+    expected: float
+    zscore: float
+
+
+def reported_at(issue: dict[str, Any]) -> datetime:
+    """When an issue was reported: its source's timestamp if it has one, else when it was stored.
+
+    Stored times follow the crawl cadence, not the reports; a source date in
+    the future (clock skew) is capped at the stored time.
+    """
+    if issue.get("source_date"):
+        return min(issue["source_date"], issue["created_at"])
+    return issue["created_at"]
+
+
+@dataclass
+class TrendSeries:
+    """Per-bucket arrival counts in a fixed-size ring, with an EWMA baseline.
+
+    The baseline (mean and variance) only absorbs a bucket once it closes, so a
+    burst is compared against the history before it. Empty buckets are left
+    out of the baseline: issues without a source date arrive when a crawl
+    runs, so with a daily crawl most hours are empty because nothing looked,
+    and counting them would make every crawl look like a spike. The first
+    non-empty bucket seeds the baseline.
+    """
+    bucket_start: datetime
+    counts: array = field(default_factory=lambda: array("i", [0] * WINDOW))
+    head: int = 0
+    ewma: float = 0.0
+    ewm_var: float = 0.0
+
+    @property
+    def current(self) -> int:
+        return self.counts[self.head]
+
+    def _close_bucket(self) -> None:
+        count = self.counts[self.head]
+        if count == 0:
+            return
+        if self.ewma == 0.0 and self.ewm_var == 0.0:
+            self.ewma = float(count)
+            return
+        diff = count - self.ewma
+        increment = ALPHA * diff
+        self.ewma += increment
+        self.ewm_var = (1 - ALPHA) * (self.ewm_var + diff * increment)
+
+    def advance_to(self, start: datetime) -> None:
+        steps = int((start - self.bucket_start) / BUCKET)
+        if steps <= 0:
+            return
+        # Past a full window every bucket is empty; only the ring needs clearing
+        for _ in range(min(steps, WINDOW)):
+            self._close_bucket()
+            self.head = (self.head + 1) % WINDOW
+            self.counts[self.head] = 0
+        self.bucket_start = start
+
+    def observe(self, timestamp: datetime, count: int = 1) -> bool:
+        """Count arrivals in their bucket. Returns whether that is the current bucket."""
+        start = bucket_start(timestamp)
+        if start < self.bucket_start:
+            # Reported in a closed bucket (e.g. a feed item polled late): kept
+            # in its hour while inside the window, but the baseline is not revised
+            steps = int((self.bucket_start - start) / BUCKET)
+            if steps < WINDOW:
+                self.counts[(self.head - steps) % WINDOW] += count
+            return False
+        self.advance_to(start)
+        self.counts[self.head] += count
+        return True
+
+    @property
+    def has_baseline(self) -> bool:
+        return self.ewma > 0.0 or self.ewm_var > 0.0
+
+    def zscore(self) -> float:
+        return (self.current - self.ewma) / math.sqrt(self.ewm_var + 1.0)
+
+    def recent(self, buckets: int) -> list[int]:
+        """Counts of the newest `buckets` buckets, oldest first."""
+        buckets = min(buckets, WINDOW)
+        return [self.counts[(self.head - i) % WINDOW] for i in range(buckets - 1, -1, -1)]
+
+
+class TrendDetector:
+    """Streaming spike detection over issue arrivals, fed from the crawler's insert path.
+
+    Keeps one TrendSeries per (application, severity, issue type). State is
+    loaded from trend_state on first use and merged back by flush(), so
+    several detectors (the crawler's and the spool loader's) can share a
+    series; spikes are written to trend_alerts as soon as they are seen.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+        self._series: dict[tuple[str, str, str], TrendSeries] = {}
+        # Arrivals per bucket since the last flush, replayed onto the stored state
+        self._pending: dict[tuple[str, str, str], dict[datetime, int]] = {}
+
+    def _fetch(self, key: tuple[str, str, str], lock: bool = False) -> TrendSeries | None:
+        rows = self.db.execute(
+            """
+            SELECT bucket_start, counts, head, ewma, ewm_var FROM trend_state
+            WHERE application_id = %s AND severity = %s AND issue_type = %s
+            """ + (" FOR UPDATE" if lock else ""),
+            key
+        )
+        if not rows:
+            return None
+        row = rows[0]
+        return TrendSeries(
+            bucket_start=row["bucket_start"],
+            counts=array("i", row["counts"]),
+            head=row["head"],
+            ewma=row["ewma"],
+            ewm_var=row["ewm_var"],
+        )
+
+    def _load(self, key: tuple[str, str, str], now: datetime) -> TrendSeries:
+        if key not in self._series:
+            self._series[key] = self._fetch(key) or TrendSeries(bucket_start=bucket_start(now))
+        return self._series[key]
+
+    def record(self, issue: dict[str, Any]) -> Spike | None:
+        """Count a stored issue by when it was reported. Returns a Spike if its bucket is anomalous."""
+        key = (str(issue["application_id"]), issue["severity"], issue.get("issue_type") or "")
+        timestamp = reported_at(issue)
+        series = self._load(key, timestamp)
+        current = series.observe(timestamp)
+        pending = self._pending.setdefault(key, {})
+        pending[bucket_start(timestamp)] = pending.get(bucket_start(timestamp), 0) + 1
+
+        # A new series has nothing to compare against; past buckets are not re-alerted
+        if not current or not series.has_baseline:
+            return None
+        zscore = series.zscore()
+        if series.current < MIN_SPIKE_COUNT or zscore < Z_THRESHOLD:
+            return None
+
+        spike = Spike(*key, series.bucket_start, series.current, series.ewma, zscore)
+        self.db.execute(
+            """
+            INSERT INTO trend_alerts (application_id, severity, issue_type, bucket_start, observed, expected, zscore)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (application_id, severity, issue_type, bucket_start)
+            DO UPDATE SET observed = EXCLUDED.observed, expected = EXCLUDED.expected, zscore = EXCLUDED.zscore
+            """,
+            (*key, spike.bucket_start, spike.observed, spike.expected, spike.zscore)
+        )
+        self.db.commit()
+        return spike
+
+    def flush(self) -> None:
+        """Merge the arrivals recorded since the last flush into trend_state.
+
+        Each stored row is locked and this detector's arrivals are replayed
+        onto it, so concurrent detectors add to each other's counts instead of
+        overwriting them. The merged state also replaces the in-memory series.
+        """
+        if not self._pending:
+            return
+        # Fixed lock order, so two detectors flushing at once cannot deadlock
+        keys = sorted(self._pending)
+        for key in keys:
+            first = min(self._pending[key])
+            self.db.execute(
+                """
+                INSERT INTO trend_state (application_id, severity, issue_type, bucket_start, counts, head)
+                VALUES (%s, %s, %s, %s, %s, 0)
+                ON CONFLICT (application_id, severity, issue_type) DO NOTHING
+                """,
+                (*key, first, [0] * WINDOW)
+            )
+
+        params = []
+        for key in keys:
+            series = self._fetch(key, lock=True)
+            for start, count in sorted(self._pending[key].items()):
+                series.observe(start, count)
+            self._series[key] = series
+            params.append((series.bucket_start, series.counts.tolist(),
+                           series.head, series.ewma, series.ewm_var, *key))
+        self.db.execute_many(
+            """
+            UPDATE trend_state SET
+                bucket_start = %s,
+                counts = %s,
+                head = %s,
+                ewma = %s,
+                ewm_var = %s,
+                updated_at = NOW()
+            WHERE application_id = %s AND severity = %s AND issue_type = %s
+            """,
+            params
+        )
+        self._pending.clear()
+
+    def recent_spikes(self, since: datetime, application_id: str | None = None) -> list[dict[str, Any]]:
+        query = """
+            SELECT t.*, a.name AS application_name
+            FROM trend_alerts t
+            JOIN applications a ON a.id = t.application_id
+            WHERE t.bucket_start >= %s
+        """
+        params: list[Any] = [since]
+        if application_id:
+            query += " AND t.application_id = %s"
+            params.append(application_id)
+        query += " ORDER BY t.bucket_start DESC, t.zscore DESC"
+        return self.db.execute(query, tuple(params))
+
+    def series_summary(self, hours: int, application_id: str | None = None) -> list[dict[str, Any]]:
+        """Arrivals in the last `hours` per series, from the persisted ring buffers."""
+        query = """
+            SELECT s.*, a.name AS application_name
+            FROM trend_state s
+            JOIN applications a ON a.id = s.application_id
+        """
+        params: tuple = ()
+        if application_id:
+            query += " WHERE s.application_id = %s"
+            params = (application_id,)
+
+        now = bucket_start(datetime.now())
+        summary = []
+        for row in self.db.execute(query, params):
+            series = TrendSeries(row["bucket_start"], array("i", row["counts"]), row["head"],
+                                 row["ewma"], row["ewm_var"])
+            series.advance_to(now)
+            summary.append({
+                "application_name": row["application_name"],
+                "severity": row["severity"],
+                "issue_type": row["issue_type"],
+                "recent": sum(series.recent(hours)),
+                "baseline": series.ewma,
+            })
+        summary.sort(key=lambda s: s["recent"], reverse=True)
+        return summary
@@ -0,0 +1,227 @@
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Any
+from uuid import uuid4
+from psycopg import sql
+from src.db import Database
+from src.embeddings import EMBEDDING_MODEL
+from src.embeddings.local_provider import DEFAULT_LOCAL_MODEL
+
+# Index names created by database/03_embedding_models.sql
+INDEX_NAMES = {
+    EMBEDDING_MODEL: "idx_issues_embedding",
+    DEFAULT_LOCAL_MODEL: "idx_issues_embedding_minilm",
+}
+
+DEFAULT_M = 16
+DEFAULT_EF_CONSTRUCTION = 64
+
+
+@dataclass
+class RecallResult:
+    ef_search: int
+    recall: float
+    p50_ms: float
+    p95_ms: float
+
+
+def recall_at_k(approximate_ids: list, exact_ids: list) -> float:
+    """Fraction of the exact top-k neighbours that the index returned."""
+    if not exact_ids:
+        return 1.0
+    return len(set(approximate_ids) & set(exact_ids)) / len(exact_ids)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of values (pct in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def index_name(embedding_model: str, application_id: str | None = None) -> str:
+    """Name of the HNSW index for a model, optionally scoped to one application."""
+    base = INDEX_NAMES.get(embedding_model)
+    if base is None:
+        slug = re.sub(r"[^a-z0-9]+", "_", embedding_model.split("/")[-1].lower()).strip("_")
+        base = f"idx_issues_embedding_{slug}"[:40]
+    if application_id:
+        base = f"{base}_app_{str(application_id).replace('-', '')[:12]}"
+    return base
+
+
+class VectorIndexManager:
+    def __init__(self, db: Database):
+        self.db = db
+
+    def embedding_dim(self, embedding_model: str) -> int:
+        results = self.db.execute(
+            "SELECT embedding_dim FROM issues WHERE embedding_model = %s LIMIT 1",
+            (embedding_model,)
+        )
+        if not results:
+            raise ValueError(f"No embeddings stored for model: {embedding_model}")
+        return results[0]["embedding_dim"]
+
+    def list_indexes(self) -> list[dict[str, Any]]:
+        return self.db.execute("""
+            SELECT
+                i.indexname AS name,
+                pg_size_pretty((
+                    SELECT SUM(pg_relation_size(t.relid)) FROM pg_partition_tree(c.oid) t
+                )) AS size,
+                c.reloptions AS options,
+                i.indexdef AS definition
+            FROM pg_indexes i
+            JOIN pg_class c ON c.relname = i.indexname
+            WHERE i.tablename = 'issues' AND i.indexdef ILIKE '%%USING hnsw%%'
+            ORDER BY i.indexname
+        """)
+
+    def _partition_tree(self) -> list[dict[str, Any]]:
+        """Every table in the issues partition tree, parents before children."""
+        return self.db.execute("""
+            SELECT c.relname AS name, p.relname AS parent, t.isleaf
+            FROM pg_partition_tree('issues') t
+            JOIN pg_class c ON c.oid = t.relid
+            LEFT JOIN pg_class p ON p.oid = t.parentrelid
+            ORDER BY t.level, c.relname
+        """)
+
+    def rebuild(
+        self,
+        embedding_model: str,
+        m: int = DEFAULT_M,
+        ef_construction: int = DEFAULT_EF_CONSTRUCTION,
+        application_id: str | None = None,
+        maintenance_work_mem: str | None = None,
+    ) -> str:
+        """Build the model's HNSW index with the given parameters and swap it in.
+
+        issues is partitioned, so the new index is declared on the parent tables
+        only, built concurrently on each leaf partition and attached. Searches
+        keep using the old index until the swap. Returns the index name.
+        """
+        name = index_name(embedding_model, application_id)
+        tmp_name = f"{name}_new"
+        build_id = uuid4().hex[:8]
+        dim = self.embedding_dim(embedding_model)
+
+        predicate = sql.SQL("embedding_model = {}").format(sql.Literal(embedding_model))
+        if application_id:
+            predicate = sql.SQL("{} AND application_id = {}").format(
+                predicate, sql.Literal(str(application_id))
+            )
+
+        def create(index: str, table: str, only: bool) -> sql.Composed:
+            return sql.SQL("""
+                CREATE INDEX {concurrently} {index} ON {only} {table}
+                USING hnsw ((embedding::vector({dim})) vector_cosine_ops)
+                WITH (m = {m}, ef_construction = {ef_construction})
+                WHERE {predicate}
+            """).format(
+                concurrently=sql.SQL("" if only else "CONCURRENTLY"),
+                index=sql.Identifier(index),
+                only=sql.SQL("ONLY" if only else ""),
+                table=sql.Identifier(table),
+                dim=sql.Literal(int(dim)),
+                m=sql.Literal(int(m)),
+                ef_construction=sql.Literal(int(ef_construction)),
+                predicate=predicate,
+            )
+
+        with self.db.autocommit():
+            if maintenance_work_mem:
+                self.db.execute("SELECT set_config('maintenance_work_mem', %s, false)", (maintenance_work_mem,))
+            self.db.execute(sql.SQL("DROP INDEX IF EXISTS {}").format(sql.Identifier(tmp_name)))
+
+            index_for = {}
+            for table in self._partition_tree():
+                if table["parent"] is None:
+                    index = tmp_name
+                else:
+                    index = f"{table['name'][:40]}_emb_{build_id}"
+                index_for[table["name"]] = index
+
+                self.db.execute(create(index, table["name"], only=not table["isleaf"]))
+                if table["parent"] is not None:
+                    self.db.execute(sql.SQL("ALTER INDEX {} ATTACH PARTITION {}").format(
+                        sql.Identifier(index_for[table["parent"]]), sql.Identifier(index)
+                    ))
+
+            self.db.execute(sql.SQL("DROP INDEX IF EXISTS {}").format(sql.Identifier(name)))
+            self.db.execute(sql.SQL("ALTER INDEX {} RENAME TO {}").format(
+                sql.Identifier(tmp_name), sql.Identifier(name)
+            ))
+
+        return name
+
+    def set_ef_search(self, ef_search: int) -> None:
+        """Set hnsw.ef_search for the current transaction; higher values trade latency for recall."""
+        self.db.execute("SELECT set_config('hnsw.ef_search', %s, true)", (str(int(ef_search)),))
+
+    def _neighbours(self, embedding_model: str, dim: int, query_id: str, vector: str,
+                    k: int, application_id: str | None) -> list:
+        query = """
+            SELECT id FROM issues
+            WHERE embedding_model = %s AND id <> %s
+        """
+        params: list[Any] = [embedding_model, query_id]
+        if application_id:
+            query += " AND application_id = %s"
+            params.append(application_id)
+        query += f" ORDER BY embedding::vector({dim}) <=> %s::vector({dim}) LIMIT %s"
+        params.extend([vector, k])
+        return [r["id"] for r in self.db.execute(query, tuple(params))]
+
+    def benchmark_recall(
+        self,
+        embedding_model: str,
+        ef_search_values: list[int],
+        sample_size: int = 100,
+        k: int = 10,
+        application_id: str | None = None,
+    ) -> list[RecallResult]:
+        """Measure recall@k and latency of the index against exact search on a sample of issues."""
+        dim = int(self.embedding_dim(embedding_model))
+
+        query = "SELECT id, embedding::text AS vector FROM issues WHERE embedding_model = %s"
+        params: list[Any] = [embedding_model]
+        if application_id:
+            query += " AND application_id = %s"
+            params.append(application_id)
+        query += " ORDER BY random() LIMIT %s"
+        params.append(sample_size)
+        sample = self.db.execute(query, tuple(params))
+
+        # Ground truth: sequential scan with exact distances
+        exact = {}
+        for row in sample:
+            self.db.execute("SET LOCAL enable_indexscan = off")
+            exact[row["id"]] = self._neighbours(embedding_model, dim, row["id"], row["vector"], k, application_id)
+            self.db.commit()
+
+        results = []
+        for ef_search in ef_search_values:
+            recalls = []
+            latencies = []
+            for row in sample:
+                self.set_ef_search(ef_search)
+                start = time.perf_counter()
+                found = self._neighbours(embedding_model, dim, row["id"], row["vector"], k, application_id)
+                latencies.append((time.perf_counter() - start) * 1000)
+                self.db.commit()
+                recalls.append(recall_at_k(found, exact[row["id"]]))
+
+            results.append(RecallResult(
+                ef_search=ef_search,
+                recall=sum(recalls) / len(recalls) if recalls else 0.0,
+                p50_ms=percentile(latencies, 50),
+                p95_ms=percentile(latencies, 95),
+            ))
+
+        return results
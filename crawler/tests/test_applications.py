@@ -1,5 +1,6 @@
 # crawler/tests/test_applications.py
 import pytest
+from unittest.mock import MagicMock
 from src.db import Database
 from src.repositories.applications import ApplicationRepository
 
@@ -24,3 +25,18 @@ def test_get_application_by_id(db):
         assert app is not None
         assert 'name' in app
         assert 'keywords' in app
+
+def test_get_application_by_name_is_case_insensitive():
+    mock_db = MagicMock()
+    mock_db.execute.return_value = [{"id": "app-123", "name": "Microsoft Teams"}]
+    repo = ApplicationRepository(mock_db)
+
+    app = repo.get_by_name("microsoft TEAMS")
+
+    assert app["id"] == "app-123"
+    query, params = mock_db.execute.call_args.args
+    assert "lower(name) = lower(%s)" in query
+    assert params == ("microsoft TEAMS",)
+
+    mock_db.execute.return_value = []
+    assert repo.get_by_name("Unknown") is None
@@ -0,0 +1,186 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+import numpy as np
+import pytest
+from src.clustering import ClusterIndex, IncidentClusterer, normalize
+
+
+def _issue(issue_id):
+    return {
+        "id": issue_id,
+        "application_id": "app-123",
+        "embedding_model": "fake-model",
+        "title": f"Issue {issue_id}",
+        "created_at": datetime(2026, 10, 19, 12, 0),
+    }
+
+
+def test_cluster_index_best_match_and_merge():
+    index = ClusterIndex(3)
+    assert index.best_match(normalize([1, 0, 0])) == (-1, -1.0)
+
+    index.add("c1", normalize([1, 0, 0]))
+    index.add("c2", normalize([0, 1, 0]))
+    row, similarity = index.best_match(normalize([0.9, 0.1, 0]))
+    assert row == 0
+    assert similarity > 0.99
+
+    centroid = index.merge(0, normalize([0, 0, 1]))
+    assert index.sizes[0] == 2
+    assert np.isclose(np.linalg.norm(centroid), 1.0)
+    assert index.centroids.dtype == np.float32
+
+
+def test_assign_joins_similar_and_starts_new_clusters():
+    mock_db = MagicMock()
+    created = iter(["cluster-a", "cluster-b"])
+    stored = {}
+
+    def execute(query, params=()):
+        if "FROM incident_clusters WHERE id" in query:
+            return [stored[params[0]]] if params[0] in stored else []
+        if "FROM incident_clusters" in query:
+            return list(stored.values())
+        if "INSERT INTO incident_clusters" in query:
+            cluster_id = next(created)
+            stored[cluster_id] = {"id": cluster_id, "centroid": params[2], "issue_count": 1}
+            return [{"id": cluster_id}]
+        if "UPDATE incident_clusters" in query:
+            stored[params[2]].update(centroid=params[0], issue_count=params[1])
+        return []
+
+    mock_db.execute.side_effect = execute
+    clusterer = IncidentClusterer(mock_db, threshold=0.9)
+
+    first = clusterer.assign(_issue("i1"), [1.0, 0.0, 0.0])
+    second = clusterer.assign(_issue("i2"), [0.98, 0.05, 0.0])
+    third = clusterer.assign(_issue("i3"), [0.0, 1.0, 0.0])
+
+    assert first == second == "cluster-a"
+    assert third == "cluster-b"
+
+    index = clusterer._indexes[("app-123", "fake-model")]
+    assert list(index.sizes) == [2, 1]
+    # Centroids are cached per application and model, and reloaded only
+    # before a new cluster is created
+    loads = [c for c in mock_db.execute.call_args_list if "WHERE application_id" in c.args[0]]
+    assert len(loads) == 3
+
+
+def test_assign_reloads_before_creating_a_cluster():
+    mock_db = MagicMock()
+    stored = []
+
+    def execute(query, params=()):
+        if "FROM incident_clusters WHERE id" in query:
+            return [c for c in stored if c["id"] == params[0]]
+        if "FROM incident_clusters" in query:
+            return stored
+        if "INSERT INTO incident_clusters" in query:
+            raise AssertionError("duplicate cluster created")
+        return []
+
+    mock_db.execute.side_effect = execute
+    clusterer = IncidentClusterer(mock_db, threshold=0.9)
+    clusterer._index("app-123", "fake-model", 3)
+
+    # The spool loader creates a matching cluster after the cache was filled
+    stored.append({"id": "cluster-x", "centroid": [1.0, 0.0, 0.0], "issue_count": 4})
+
+    assert clusterer.assign(_issue("i1"), [0.99, 0.02, 0.0]) == "cluster-x"
+    statements = [c.args[0] for c in mock_db.execute.call_args_list]
+    assert any("pg_advisory_xact_lock" in s for s in statements)
+    assert clusterer._indexes[("app-123", "fake-model")].sizes[0] == 5
+
+
+
+def test_assign_merges_into_the_stored_centroid_and_count():
+    """Another writer's merges since the cache was filled are not overwritten."""
+    mock_db = MagicMock()
+    stored = {"id": "cluster-x", "centroid": [1.0, 0.0, 0.0], "issue_count": 1}
+
+    def execute(query, params=()):
+        if "FROM incident_clusters" in query:
+            return [stored]
+        if "UPDATE incident_clusters" in query:
+            stored.update(centroid=params[0], issue_count=params[1])
+        return []
+
+    mock_db.execute.side_effect = execute
+    clusterer = IncidentClusterer(mock_db, threshold=0.9)
+    clusterer._index("app-123", "fake-model", 3)
+    stored["issue_count"] = 7
+
+    assert clusterer.assign(_issue("i1"), [0.99, 0.02, 0.0]) == "cluster-x"
+    assert stored["issue_count"] == 8
+
+
+def test_assign_reloads_clusters_deleted_by_a_recluster():
+    mock_db = MagicMock()
+    stored = [{"id": "old", "centroid": [1.0, 0.0, 0.0], "issue_count": 3}]
+
+    def execute(query, params=()):
+        if "FROM incident_clusters WHERE id" in query:
+            return [c for c in stored if c["id"] == params[0]]
+        if "FROM incident_clusters" in query:
+            return stored
+        return []
+
+    mock_db.execute.side_effect = execute
+    clusterer = IncidentClusterer(mock_db, threshold=0.9)
+    clusterer._index("app-123", "fake-model", 3)
+    # `main.py cluster` in another process replaces the clusters
+    stored[:] = [{"id": "new", "centroid": [1.0, 0.0, 0.0], "issue_count": 3}]
+
+    assert clusterer.assign(_issue("i1"), [0.99, 0.02, 0.0]) == "new"
+    assert clusterer._indexes[("app-123", "fake-model")].ids == ["new"]
+
+
+def test_assign_drops_cached_centroids_on_error():
+    mock_db = MagicMock()
+
+    def execute(query, params=()):
+        if "FROM incident_clusters" in query:
+            return [{"id": "c1", "centroid": [1.0, 0.0, 0.0], "issue_count": 1}]
+        if "UPDATE issues" in query:
+            raise RuntimeError("violates foreign key constraint")
+        return []
+
+    mock_db.execute.side_effect = execute
+    clusterer = IncidentClusterer(mock_db, threshold=0.9)
+
+    with pytest.raises(RuntimeError):
+        clusterer.assign(_issue("i1"), [1.0, 0.0, 0.0])
+    assert clusterer._indexes == {}
+
+def test_cluster_index_grows_past_initial_capacity():
+    from src.clustering import INITIAL_CAPACITY
+
+    index = ClusterIndex(2)
+    for i in range(INITIAL_CAPACITY + 3):
+        index.add(f"c{i}", normalize([1.0, float(i)]), size=i + 1)
+
+    assert len(index) == INITIAL_CAPACITY + 3
+    assert index.centroids.shape == (INITIAL_CAPACITY + 3, 2)
+    assert list(index.sizes[-2:]) == [INITIAL_CAPACITY + 2, INITIAL_CAPACITY + 3]
+    assert np.allclose(index.centroids[0], normalize([1.0, 0.0]))
+
+
+def test_recluster_streams_issues_and_writes_in_bulk():
+    mock_db = MagicMock()
+    mock_db.stream.return_value = iter([
+        {"id": "i1", "created_at": datetime(2026, 10, 1), "title": "Crash A", "embedding": [1.0, 0.0]},
+        {"id": "i2", "created_at": datetime(2026, 10, 2), "title": "Crash A again", "embedding": [0.99, 0.01]},
+        {"id": "i3", "created_at": datetime(2026, 10, 3), "title": "Slow B", "embedding": [0.0, 1.0]},
+    ])
+    clusterer = IncidentClusterer(mock_db, threshold=0.9)
+
+    count = clusterer.recluster("app-123", "fake-model", on_progress=lambda m: None)
+
+    assert count == 2
+    statements = [c.args[0] for c in mock_db.execute.call_args_list]
+    assert "pg_advisory_xact_lock" in statements[0]
+    assert "DELETE FROM incident_clusters" in statements[1]
+    assert sum("INSERT INTO incident_clusters" in s for s in statements) == 1
+    assert sum("UPDATE issues AS i SET cluster_id" in s for s in statements) == 1
+    mock_db.commit.assert_called_once()
@@ -0,0 +1,94 @@
+from pathlib import Path
+import pytest
+from src.sources.connectors import FeedCursor, RSSConnector, RedditConnector, get_connector
+from src.sources.connectors.rss import parse_timestamp
+from src.sources.models import FetchedPage
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _fixture(name: str) -> bytes:
+    return (FIXTURES / name).read_bytes()
+
+
+def test_rss_parse_emits_pages_with_text():
+    pages, newest = RSSConnector().parse(_fixture("rss_feed.xml"), FeedCursor())
+
+    assert [p.url for p in pages] == [
+        "https://community.example.com/teams/t/screen-share-crash/101",
+        "https://community.example.com/teams/t/audio-drops/100",
+    ]
+    assert isinstance(pages[0], FetchedPage)
+    assert pages[0].source == "community.example.com"
+    assert "crashes as soon as I share my screen" in pages[0].content
+    assert "<b>" not in pages[0].content
+    assert "Audio cuts out" in pages[1].content
+    assert newest == "2026-10-19T14:30:00+00:00"
+
+
+def test_atom_parse_normalizes_timestamps_and_links():
+    pages, newest = RSSConnector().parse(_fixture("atom_feed.xml"), FeedCursor())
+
+    assert pages[0].url == "https://status.example.com/zoom/arm64-install"
+    assert pages[1].url == "https://status.example.com/zoom/background-flicker"
+    assert "error 1603" in pages[0].content
+    assert newest == "2026-10-18T12:00:00+00:00"
+    assert parse_timestamp("2026-10-17T08:15:00+02:00") == "2026-10-17T06:15:00+00:00"
+
+
+def test_rss_parse_skips_items_at_or_before_cursor():
+    cursor = FeedCursor(last_seen="2026-10-19T09:00:00+00:00")
+    pages, _ = RSSConnector().parse(_fixture("rss_feed.xml"), cursor)
+    assert [p.title for p in pages] == ["Teams crashes when sharing screen"]
+
+
+def test_reddit_parse_skips_stickied_and_seen_posts():
+    connector = RedditConnector()
+    pages, newest = connector.parse(_fixture("reddit_listing.json"), FeedCursor())
+
+    assert [p.url for p in pages] == [
+        "https://www.reddit.com/r/sysadmin/comments/abc102/acrobat_dc_freezes/",
+        "https://www.reddit.com/r/sysadmin/comments/abc101/acrobat_reader_login_loop/",
+    ]
+    assert pages[0].source == "reddit.com"
+    assert "Rolling back fixes it" in pages[0].content
+    assert pages[1].content == "Acrobat reader login loop"
+
+    assert newest == "2026-10-19T14:00:00+00:00"
+    assert max(p.published for p in pages) == newest
+
+    pages, _ = connector.parse(_fixture("reddit_listing.json"), FeedCursor(last_seen="2026-10-19T12:00:00+00:00"))
+    assert [p.title for p in pages] == ["Acrobat DC freezes opening large PDFs"]
+
+
+def test_poll_sends_validators_and_advances_cursor(httpx_mock):
+    url = "https://www.reddit.com/r/sysadmin/new.json"
+    httpx_mock.add_response(
+        url=url, content=_fixture("reddit_listing.json"),
+        headers={"ETag": '"v2"', "Last-Modified": "Mon, 19 Oct 2026 15:00:00 GMT"},
+    )
+
+    result = get_connector("reddit").poll(url, FeedCursor(etag='"v1"'))
+
+    assert httpx_mock.get_request().headers["If-None-Match"] == '"v1"'
+    assert len(result.pages) == 2
+    assert result.cursor.etag == '"v2"'
+    assert result.cursor.last_modified == "Mon, 19 Oct 2026 15:00:00 GMT"
+    assert result.cursor.last_seen == "2026-10-19T14:00:00+00:00"
+
+
+def test_poll_not_modified_keeps_cursor(httpx_mock):
+    url = "https://community.example.com/teams/feed.rss"
+    httpx_mock.add_response(url=url, status_code=304)
+    cursor = FeedCursor(etag='"v1"', last_seen="2026-10-19T14:30:00+00:00")
+
+    result = get_connector("rss").poll(url, cursor)
+
+    assert result.not_modified
+    assert result.pages == []
+    assert result.cursor is cursor
+
+
+def test_get_connector_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        get_connector("mastodon")
@@ -0,0 +1,79 @@
+from unittest.mock import MagicMock
+import pytest
+from src.content_store import ContentStore, compress, decompress, content_hash
+
+FORUM_POST = (
+    "Teams crashes on startup after the latest update.\n"
+    "Tried clearing the cache in %appdata%\\Microsoft\\Teams, no luck.\n"
+) * 20
+
+
+@pytest.mark.parametrize("codec", ["zstd", "zlib"])
+def test_compress_round_trip(codec):
+    data = compress(FORUM_POST, codec)
+    assert len(data) < len(FORUM_POST)
+    assert decompress(data, codec) == FORUM_POST
+
+
+def test_zstd_dictionary_round_trip():
+    import zstandard
+
+    samples = [f"Post {i}: Outlook freezes when searching mailbox {i}".encode() * 8 for i in range(200)]
+    dictionary = zstandard.train_dictionary(4096, samples).as_bytes()
+
+    data = compress("Outlook freezes when searching mailbox 7", "zstd", dictionary)
+    assert decompress(data, "zstd", dictionary) == "Outlook freezes when searching mailbox 7"
+
+
+def test_put_is_deduplicated_by_hash():
+    mock_db = MagicMock()
+    mock_db.execute.return_value = []
+    store = ContentStore(mock_db, codec="zlib")
+
+    digest = store.put(FORUM_POST)
+
+    assert digest == content_hash(FORUM_POST)
+    query, params = mock_db.execute.call_args.args
+    assert "ON CONFLICT (content_hash) DO NOTHING" in query
+    assert params[0] == digest
+    assert params[1] == "zlib"
+    assert decompress(params[4], "zlib") == FORUM_POST
+
+
+def test_put_skips_compression_for_stored_content(monkeypatch):
+    mock_db = MagicMock()
+    mock_db.execute.return_value = [{"?column?": 1}]
+    store = ContentStore(mock_db, codec="zstd")
+    monkeypatch.setattr("src.content_store.compress", MagicMock(side_effect=AssertionError))
+
+    assert store.put(FORUM_POST) == content_hash(FORUM_POST)
+    assert mock_db.execute.call_count == 1
+
+
+def test_default_codec_is_readable_by_the_api(monkeypatch):
+    monkeypatch.delenv("CONTENT_CODEC", raising=False)
+    assert ContentStore(MagicMock()).codec == "zlib"
+
+
+def test_issue_create_writes_content_out_of_line():
+    from src.repositories import IssueRepository
+
+    mock_db = MagicMock()
+    mock_db.execute.return_value = [{"id": "issue-1"}]
+    repo = IssueRepository(mock_db)
+    repo.content_store = ContentStore(mock_db, codec="zlib")
+
+    repo.create(
+        application_id="app-123", title="Crash", summary="Crashes", raw_content=FORUM_POST,
+        source_type="example.com", source_url="https://example.com/1", severity="major",
+    )
+
+    insert_query, insert_params = mock_db.execute.call_args.args
+    assert "content_hash" in insert_query
+    assert FORUM_POST not in insert_params
+    assert content_hash(FORUM_POST) in insert_params
+
+
+def test_unknown_codec_rejected():
+    with pytest.raises(ValueError):
+        ContentStore(MagicMock(), codec="lz4")
@@ -25,7 +25,7 @@ def test_crawler_uses_web_search_and_fetcher():
         snippet="Acrobat crashes on open",
         source="example.com",
     )
-    crawler.search.search = MagicMock(return_value=[mock_search_result])
+    crawler.search.iter_search = MagicMock(return_value=iter([mock_search_result]))
 
     # Mock dedup check — URL not seen before
     crawler.issue_repo.exists_by_url = MagicMock(return_value=False)
@@ -50,7 +50,7 @@ def test_crawler_uses_web_search_and_fetcher():
     crawler.llm.analyze_issue = MagicMock(return_value=mock_analysis)
 
     # Mock embedding
-    with patch("src.crawler.get_embedding", return_value=[0.1] * 1536):
+    with patch("src.crawler.get_embeddings", side_effect=lambda texts, provider=None: [[0.1] * 1536 for _ in texts]):
         count = crawler.crawl_application("app-123")
 
     assert count == 1
@@ -60,6 +60,7 @@ def test_crawler_uses_web_search_and_fetcher():
     assert call_kwargs[1]["source_type"] == "example.com"
     assert call_kwargs[1]["source_url"] == "https://example.com/bug-report"
     assert call_kwargs[1]["title"] == "Acrobat DC crashes on large PDFs"
+    assert call_kwargs[1]["embedding_model"] == "text-embedding-3-small"
 
 
 def test_crawler_skips_already_seen_urls():
@@ -80,7 +81,7 @@ def test_crawler_skips_already_seen_urls():
         snippet="Already tracked",
         source="example.com",
     )
-    crawler.search.search = MagicMock(return_value=[mock_search_result])
+    crawler.search.iter_search = MagicMock(return_value=iter([mock_search_result]))
 
     # URL already exists in DB
     crawler.issue_repo.exists_by_url = MagicMock(return_value=True)
@@ -88,7 +89,7 @@ def test_crawler_skips_already_seen_urls():
     # Mock fetcher so we can assert it was not called
     crawler.fetcher.fetch = MagicMock()
 
-    with patch("src.crawler.get_embedding", return_value=[0.1] * 1536):
+    with patch("src.crawler.get_embeddings", side_effect=lambda texts, provider=None: [[0.1] * 1536 for _ in texts]):
         count = crawler.crawl_application("app-123")
 
     assert count == 0
@@ -113,7 +114,7 @@ def test_crawler_skips_failed_fetches():
         snippet="Cannot load",
         source="example.com",
     )
-    crawler.search.search = MagicMock(return_value=[mock_search_result])
+    crawler.search.iter_search = MagicMock(return_value=iter([mock_search_result]))
     crawler.issue_repo.exists_by_url = MagicMock(return_value=False)
 
     # Fetch returns None (failure)
@@ -122,8 +123,305 @@ def test_crawler_skips_failed_fetches():
     # Mock LLM so we can assert it was not called
     crawler.llm.analyze_issue = MagicMock()
 
-    with patch("src.crawler.get_embedding", return_value=[0.1] * 1536):
+    with patch("src.crawler.get_embeddings", side_effect=lambda texts, provider=None: [[0.1] * 1536 for _ in texts]):
         count = crawler.crawl_application("app-123")
 
     assert count == 0
     crawler.llm.analyze_issue.assert_not_called()
+
+
+def test_crawler_assigns_stored_issue_to_cluster():
+    """Test that each stored issue is handed to the incident clusterer."""
+    mock_db = MagicMock()
+    crawler = Crawler(mock_db)
+
+    test_app = {"id": "app-123", "name": "Microsoft Teams", "keywords": ["teams"]}
+    crawler.app_repo.get_by_id = MagicMock(return_value=test_app)
+    crawler.search.iter_search = MagicMock(return_value=iter([WebSearchResult(
+        url="https://example.com/teams-crash", title="Teams crash", snippet="", source="example.com",
+    )]))
+    crawler.issue_repo.exists_by_url = MagicMock(return_value=False)
+    stored_issue = {"id": "issue-1", "application_id": "app-123"}
+    crawler.issue_repo.create = MagicMock(return_value=stored_issue)
+    crawler.fetcher.fetch = MagicMock(return_value=FetchedPage(
+        url="https://example.com/teams-crash", title="Teams crash",
+        content="Teams crashes on launch.", source="example.com",
+    ))
+    crawler.llm.analyze_issue = MagicMock(return_value=IssueAnalysis(
+        title="Teams crashes on launch",
+        summary="Microsoft Teams crashes immediately on launch after the latest update.",
+        severity="critical",
+    ))
+    crawler.clusterer.assign = MagicMock(return_value="cluster-1")
+
+    with patch("src.crawler.get_embeddings", side_effect=lambda texts, provider=None: [[0.1] * 1536 for _ in texts]):
+        count = crawler.crawl_application("app-123")
+
+    assert count == 1
+    crawler.clusterer.assign.assert_called_once_with(stored_issue, [0.1] * 1536)
+
+
+def test_crawler_processes_feed_items_without_search_or_fetch(httpx_mock):
+    """Feed items go straight to classification, and the feed cursor advances."""
+    from pathlib import Path
+
+    feed_url = "https://www.reddit.com/r/sysadmin/new.json"
+    httpx_mock.add_response(
+        url=feed_url,
+        content=(Path(__file__).parent / "fixtures" / "reddit_listing.json").read_bytes(),
+        headers={"ETag": '"v2"'},
+    )
+
+    crawler = Crawler(MagicMock())
+    crawler.app_repo.get_by_id = MagicMock(return_value={
+        "id": "app-123", "name": "Adobe Acrobat", "keywords": ["adobe acrobat"],
+    })
+    crawler.feed_repo.list_by_application = MagicMock(return_value=[{
+        "id": "feed-1", "kind": "reddit", "url": feed_url,
+        "etag": None, "last_modified": None, "last_seen": "2026-10-19T12:00:00+00:00",
+    }])
+    crawler.feed_repo.update_cursor = MagicMock()
+    crawler.search.iter_search = MagicMock()
+    crawler.fetcher.fetch = MagicMock()
+    crawler.issue_repo.exists_by_url = MagicMock(return_value=False)
+    crawler.issue_repo.create = MagicMock(return_value={})
+    crawler.llm.analyze_issue = MagicMock(return_value=IssueAnalysis(
+        title="Acrobat DC freezes on large PDFs",
+        summary="Acrobat DC hangs on PDFs over 200MB after the October update.",
+        severity="major",
+        issue_type="performance",
+    ))
+
+    with patch("src.crawler.get_embeddings", side_effect=lambda texts, provider=None: [[0.1] * 1536 for _ in texts]):
+        count = crawler.crawl_application("app-123", search=False)
+
+    assert count == 1
+    crawler.search.iter_search.assert_not_called()
+    crawler.fetcher.fetch.assert_not_called()
+    assert crawler.issue_repo.create.call_args[1]["source_url"].endswith("/abc102/acrobat_dc_freezes/")
+    crawler.feed_repo.update_cursor.assert_called_once_with(
+        "feed-1", '"v2"', None, "2026-10-19T14:00:00+00:00"
+    )
+
+
+def test_feed_cursor_is_kept_when_an_item_fails(httpx_mock):
+    """An item that could not be stored must be polled again, so the cursor stays put."""
+    from pathlib import Path
+
+    feed_url = "https://www.reddit.com/r/sysadmin/new.json"
+    httpx_mock.add_response(
+        url=feed_url,
+        content=(Path(__file__).parent / "fixtures" / "reddit_listing.json").read_bytes(),
+        headers={"ETag": '"v2"'},
+    )
+
+    crawler = Crawler(MagicMock())
+    crawler.feed_repo.list_by_application = MagicMock(return_value=[{
+        "id": "feed-1", "kind": "reddit", "url": feed_url,
+        "etag": None, "last_modified": None, "last_seen": "2026-10-19T12:00:00+00:00",
+    }])
+    crawler.feed_repo.update_cursor = MagicMock()
+    crawler.issue_repo.exists_by_url = MagicMock(return_value=False)
+    crawler.issue_repo.create = MagicMock(side_effect=RuntimeError("insert failed"))
+    crawler.llm.analyze_issue = MagicMock(return_value=IssueAnalysis(
+        title="Acrobat DC freezes on large PDFs",
+        summary="Acrobat DC hangs on PDFs over 200MB after the October update.",
+        severity="major",
+        issue_type="performance",
+    ))
+
+    with patch("src.crawler.get_embeddings", side_effect=lambda texts, provider=None: [[0.1] * 1536 for _ in texts]):
+        count = crawler.crawl_feeds({"id": "app-123", "name": "Adobe Acrobat"})
+
+    assert count == 0
+    crawler.feed_repo.update_cursor.assert_not_called()
+
+def test_crawler_spools_issues_instead_of_writing_to_db(tmp_path):
+    """With a spool, classified issues are appended locally and the database is not written."""
+    from src.spool import IssueSpool, read_records
+
+    spool = IssueSpool(str(tmp_path / "crawl.spool"), fsync="never")
+    crawler = Crawler(MagicMock(), spool=spool)
+    crawler.app_repo.get_by_id = MagicMock(return_value={
+        "id": "app-123", "name": "Microsoft Teams", "keywords": ["teams"],
+    })
+    crawler.feed_repo.list_by_application = MagicMock(return_value=[])
+    result = WebSearchResult(url="https://example.com/teams-crash", title="Teams crash", snippet="", source="example.com")
+    crawler.search.iter_search = MagicMock(return_value=iter([result, result]))
+    # The database is down
+    crawler.issue_repo.exists_by_url = MagicMock(side_effect=RuntimeError("connection refused"))
+    crawler.issue_repo.create = MagicMock()
+    crawler.fetcher.fetch = MagicMock(return_value=FetchedPage(
+        url="https://example.com/teams-crash", title="Teams crash",
+        content="Teams crashes on launch.", source="example.com",
+    ))
+    crawler.llm.analyze_issue = MagicMock(return_value=IssueAnalysis(
+        title="Teams crashes on launch",
+        summary="Microsoft Teams crashes on launch after the latest update.",
+        severity="critical",
+        issue_type="crash",
+    ))
+
+    with patch("src.crawler.get_embeddings", side_effect=lambda texts, provider=None: [[0.25] * 8 for _ in texts]):
+        count = crawler.crawl_application("app-123")
+    spool.close()
+
+    assert count == 1
+    crawler.issue_repo.create.assert_not_called()
+    records = list(read_records(spool.path))
+    assert len(records) == 1
+    _, fields, embedding = records[0]
+    assert fields["source_url"] == "https://example.com/teams-crash"
+    assert fields["severity"] == "critical"
+    assert embedding == [0.25] * 8
+
+
+def test_crawler_embeds_pages_in_batches():
+    """Classified pages are embedded together rather than one request per page."""
+    crawler = Crawler(MagicMock(), embed_batch_size=2)
+    crawler.app_repo.get_by_id = MagicMock(return_value={"id": "app-1", "name": "Slack", "keywords": []})
+    crawler.feed_repo.list_by_application = MagicMock(return_value=[])
+    results = [
+        WebSearchResult(url=f"https://example.com/{i}", title="t", snippet="s", source="example.com")
+        for i in range(3)
+    ]
+    crawler.search.iter_search = MagicMock(return_value=iter(results))
+    crawler.issue_repo.exists_by_url = MagicMock(return_value=False)
+    crawler.issue_repo.create = MagicMock(return_value={})
+    crawler.fetcher.fetch = MagicMock(side_effect=lambda url: FetchedPage(
+        url=url, title="t", content="Slack desktop fails to start", source="example.com"))
+    crawler.llm.analyze_issue = MagicMock(return_value=IssueAnalysis(
+        title="Slack fails to start",
+        summary="Slack desktop fails to start after the latest update on Windows.",
+        severity="major",
+        issue_type="crash",
+    ))
+    crawler.clusterer.assign = MagicMock()
+    crawler.trends.record = MagicMock(return_value=None)
+    crawler.trends.flush = MagicMock()
+
+    with patch("src.crawler.get_embeddings",
+               side_effect=lambda texts, provider=None: [[0.1] * 1536 for _ in texts]) as embed:
+        count = crawler.crawl_application("app-1")
+
+    assert count == 3
+    assert [len(call.args[0]) for call in embed.call_args_list] == [2, 1]
+
+
+
+def _batch_crawler(result_count: int, **kwargs) -> Crawler:
+    crawler = Crawler(MagicMock(), **kwargs)
+    crawler.app_repo.get_by_id = MagicMock(return_value={"id": "app-1", "name": "Slack", "keywords": []})
+    crawler.feed_repo.list_by_application = MagicMock(return_value=[])
+    crawler.search.iter_search = MagicMock(return_value=iter([
+        WebSearchResult(url=f"https://example.com/{i}", title="t", snippet="s", source="example.com")
+        for i in range(result_count)
+    ]))
+    crawler.issue_repo.exists_by_url = MagicMock(return_value=False)
+    crawler.issue_repo.create = MagicMock(return_value={})
+    crawler.fetcher.fetch = MagicMock(side_effect=lambda url: FetchedPage(
+        url=url, title="t", content="Slack desktop fails to start", source="example.com"))
+    crawler.llm.analyze_issue = MagicMock(return_value=IssueAnalysis(
+        title="Slack fails to start",
+        summary="Slack desktop fails to start after the latest update on Windows.",
+        severity="major",
+        issue_type="crash",
+    ))
+    crawler.clusterer.assign = MagicMock()
+    crawler.trends.record = MagicMock(return_value=None)
+    crawler.trends.flush = MagicMock()
+    return crawler
+
+
+def test_crawler_stores_unembedded_issues_when_embedding_fails():
+    """Classified pages are kept for `reembed --missing-only` rather than dropped."""
+    crawler = _batch_crawler(2, embed_batch_size=2)
+
+    with patch("src.crawler.get_embeddings", side_effect=RuntimeError("rate limited")) as embed:
+        count = crawler.crawl_application("app-1")
+
+    assert count == 2
+    assert embed.call_count == 2
+    for call in crawler.issue_repo.create.call_args_list:
+        assert call.kwargs["embedding"] is None
+        assert call.kwargs["embedding_model"] is None
+    crawler.clusterer.assign.assert_not_called()
+
+
+def test_crawler_flushes_pending_after_max_wait():
+    """A slow crawl stores each classified page once it has waited embed_max_wait."""
+    crawler = _batch_crawler(3, embed_batch_size=16, embed_max_wait=0)
+
+    with patch("src.crawler.get_embeddings",
+               side_effect=lambda texts, provider=None: [[0.1] * 8 for _ in texts]) as embed:
+        count = crawler.crawl_application("app-1")
+
+    assert count == 3
+    assert [len(call.args[0]) for call in embed.call_args_list] == [1, 1, 1]
+
+def test_spooling_crawler_survives_database_outage():
+    """With a spool, a failed reconnect neither drops the crawl nor the cached application."""
+    spool = MagicMock()
+    spool.contains.return_value = False
+    db = MagicMock()
+    db.reset.side_effect = RuntimeError("connection refused")
+    crawler = Crawler(db, spool=spool)
+    crawler._apps["app-1"] = {"id": "app-1", "name": "Slack", "keywords": []}
+    crawler.app_repo.get_by_id = MagicMock(side_effect=RuntimeError("connection refused"))
+    crawler.feed_repo.list_by_application = MagicMock(side_effect=RuntimeError("connection refused"))
+    crawler.issue_repo.exists_by_url = MagicMock(side_effect=RuntimeError("connection refused"))
+    crawler.search.iter_search = MagicMock(return_value=iter([
+        WebSearchResult(url="https://example.com/1", title="t", snippet="s", source="example.com"),
+    ]))
+    crawler.fetcher.fetch = MagicMock(return_value=FetchedPage(
+        url="https://example.com/1", title="t", content="Slack fails to start", source="example.com"))
+    crawler.llm.analyze_issue = MagicMock(return_value=IssueAnalysis(
+        title="Slack fails to start",
+        summary="Slack desktop fails to start after the latest update on Windows.",
+        severity="major",
+        issue_type="crash",
+    ))
+
+    with patch("src.crawler.get_embeddings", side_effect=lambda texts, provider=None: [[0.1] * 8 for _ in texts]):
+        count = crawler.crawl_application("app-1")
+
+    assert count == 1
+    spool.append.assert_called_once()
+
+
+def test_fresh_crawl_spools_while_database_is_down(tmp_path):
+    """A new process crawls the applications kept next to the spool when no query succeeds."""
+    import psycopg
+    from src.spool import IssueSpool, read_records
+
+    path = tmp_path / "issues.spool"
+    spool = IssueSpool(str(path), fsync="never")
+    spool.save_apps([{"id": "app-1", "name": "Slack", "keywords": ["slack"]}])
+    spool.close()
+
+    down = psycopg.OperationalError("connection refused")
+    db = MagicMock()
+    db.execute.side_effect = down
+    db.stream.side_effect = down
+    db.reset.side_effect = down
+    spool = IssueSpool(str(path), fsync="never")
+    crawler = Crawler(db, spool=spool, on_progress=lambda m: None)
+    crawler.search.iter_search = MagicMock(return_value=iter([
+        WebSearchResult(url="https://example.com/1", title="t", snippet="s", source="example.com"),
+    ]))
+    crawler.fetcher.fetch = MagicMock(return_value=FetchedPage(
+        url="https://example.com/1", title="t", content="Slack fails to start", source="example.com"))
+    crawler.llm.analyze_issue = MagicMock(return_value=IssueAnalysis(
+        title="Slack fails to start",
+        summary="Slack desktop fails to start after the latest update on Windows.",
+        severity="major",
+        issue_type="crash",
+    ))
+
+    with patch("src.crawler.get_embeddings", side_effect=lambda texts, provider=None: [[0.1] * 8 for _ in texts]):
+        assert crawler.find_app("Slack")["id"] == "app-1"
+        count = crawler.crawl_all()
+    spool.close()
+
+    assert count == 1
+    assert [fields["source_url"] for _, fields, _ in read_records(str(path))] == ["https://example.com/1"]
@@ -0,0 +1,150 @@
+import json
+import urllib.request
+from unittest.mock import MagicMock
+import psycopg
+import pytest
+from src.daemon import CrawlDaemon
+from src.scheduler import CrawlScheduler
+
+
+def _daemon(crawl_application, status_port=None):
+    db = MagicMock()
+    db.execute.return_value = [{"id": "app-1", "name": "Teams"}, {"id": "app-2", "name": "Zoom"}]
+    crawler = MagicMock()
+    crawler.crawl_application.side_effect = crawl_application
+    crawler.list_apps.return_value = db.execute.return_value
+    crawler.llm.cache_stats = None
+    crawler.spool = None
+    daemon = CrawlDaemon(db, crawler, CrawlScheduler(), status_port=status_port, on_progress=lambda m: None)
+    daemon.schedule_repo = MagicMock()
+    daemon.schedule_repo.load.return_value = {}
+    return daemon
+
+
+def test_run_crawls_due_apps_then_drains_on_stop():
+    crawled = []
+
+    def crawl(app_id):
+        crawled.append(app_id)
+        if len(crawled) == 2:
+            daemon.request_stop()
+        return 3
+
+    daemon = _daemon(crawl)
+    daemon.run()
+
+    assert sorted(crawled) == ["app-1", "app-2"]
+    assert daemon.total_new == 6
+    assert daemon.crawler.should_stop() is True
+    assert all(s.crawls == 1 for s in daemon.scheduler.schedules.values())
+
+
+def test_crawl_error_resets_db_and_is_reported():
+    def crawl(app_id):
+        raise RuntimeError("connection lost")
+
+    daemon = _daemon(crawl)
+    assert daemon.run_once() is True
+
+    daemon.db.reset.assert_called_once()
+    errors = [a["last_error"] for a in daemon.status()["applications"]]
+    assert "connection lost" in errors
+
+
+def test_status_endpoint_serves_json():
+    daemon = _daemon(lambda app_id: 0, status_port=0)
+    daemon.run_once()
+    server = daemon._start_status_server()
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/status") as response:
+            status = json.load(response)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert status["state"] == "idle"
+    assert len(status["applications"]) == 2
+
+
+def test_schedule_is_saved_and_restored():
+    daemon = _daemon(lambda app_id: 2)
+    daemon.schedule_repo.load.return_value = {
+        "app-2": {"next_run": daemon.scheduler.clock() + 3600, "interval": 3600, "yield_ewma": 5.0,
+                  "crawls": 9, "last_run": None, "last_new": 4, "last_error": None},
+    }
+
+    daemon.run_once()
+
+    # Only app-1 is due: app-2 resumes its saved schedule
+    assert daemon.crawler.crawl_application.call_args.args == ("app-1",)
+    assert daemon.scheduler.schedules["app-2"].crawls == 9
+    daemon.schedule_repo.save.assert_called_once_with(daemon.scheduler.schedules["app-1"])
+
+
+def test_unreachable_database_leaves_app_due():
+    def crawl(app_id):
+        raise psycopg.OperationalError("server closed the connection")
+
+    daemon = _daemon(crawl)
+    daemon.db.reset.side_effect = psycopg.OperationalError("connection refused")
+
+    with pytest.raises(psycopg.OperationalError):
+        daemon.run_once()
+
+    assert daemon.current is None
+    assert all(s.crawls == 0 for s in daemon.scheduler.schedules.values())
+    assert daemon.scheduler.next_due() is not None
+
+
+def test_run_backs_off_while_database_is_down(monkeypatch):
+    monkeypatch.setattr("src.daemon.MIN_BACKOFF", 0.01)
+    crawled = []
+
+    def crawl(app_id):
+        crawled.append(app_id)
+        daemon.request_stop()
+        return 0
+
+    daemon = _daemon(crawl)
+    apps = daemon.crawler.list_apps.return_value
+    daemon.crawler.list_apps.side_effect = [psycopg.OperationalError("connection refused"), apps]
+    daemon.db.reset.side_effect = psycopg.OperationalError("connection refused")
+
+    daemon.run()
+
+    assert len(crawled) == 1
+    assert daemon.crawler.list_apps.call_count == 2
+
+
+def test_spooling_daemon_crawls_through_an_outage_and_saves_later():
+    daemon = _daemon(lambda app_id: 1)
+    daemon.crawler.spool = MagicMock()
+    down = psycopg.OperationalError("connection refused")
+    daemon.db.execute.side_effect = down
+    daemon.db.reset.side_effect = down
+    daemon.schedule_repo.load.side_effect = down
+    daemon.schedule_repo.save.side_effect = down
+
+    assert daemon.run_once() is True
+    assert daemon.run_once() is True
+    assert daemon.total_new == 2
+    assert set(daemon._unsaved) == {"app-1", "app-2"}
+
+    # The database is back: the deferred writes go through on the next crawl
+    saved = {"app-1": {"next_run": 0.0, "interval": 60.0, "yield_ewma": 0.0, "crawls": 50,
+                       "last_run": None, "last_new": 0, "last_error": None}}
+    daemon.db.execute.side_effect = None
+    daemon.schedule_repo.load.side_effect = None
+    daemon.schedule_repo.load.return_value = saved
+    daemon.schedule_repo.save.side_effect = None
+    daemon._last_refresh = None
+    daemon.run_once()
+
+    assert daemon._unsaved == {}
+    saved_ids = [c.args[0].app_id for c in daemon.schedule_repo.save.call_args_list[-2:]]
+    assert sorted(saved_ids) == ["app-1", "app-2"]
+    assert daemon._partitions_checked is not None
+    # The older saved state does not overwrite a crawl made during the outage
+    assert daemon.scheduler.schedules["app-1"].crawls >= 1
+    assert daemon.scheduler.schedules["app-1"].crawls < 50
@@ -17,3 +17,80 @@ def test_get_embedding_returns_correct_dimension():
 
     assert len(embedding) == EMBEDDING_DIMENSION
     assert all(isinstance(x, float) for x in embedding)
+
+
+class FakeSentenceModel:
+    def __init__(self):
+        self.calls = []
+
+    def get_sentence_embedding_dimension(self):
+        return 3
+
+    def encode(self, texts, batch_size, normalize_embeddings):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 0.0, 1.0] for t in texts]
+
+
+def test_local_provider_batches_in_order():
+    from src.embeddings import LocalEmbeddingProvider
+
+    model = FakeSentenceModel()
+    provider = LocalEmbeddingProvider(model_name="fake-model", batch_size=2, workers=2, model=model)
+    texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+
+    vectors = provider.embed_batch(texts)
+
+    assert [v[0] for v in vectors] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert len(model.calls) == 3
+    assert provider.dimension == 3
+    assert provider.embed("xy") == [2.0, 0.0, 1.0]
+
+
+def test_get_embedding_provider_selects_backend():
+    from src.embeddings import get_embedding_provider, OpenAIEmbeddingProvider, LocalEmbeddingProvider
+
+    openai_provider = get_embedding_provider("openai")
+    assert isinstance(openai_provider, OpenAIEmbeddingProvider)
+    assert openai_provider.model_name == "text-embedding-3-small"
+    assert openai_provider.dimension == EMBEDDING_DIMENSION
+
+    assert isinstance(get_embedding_provider("local"), LocalEmbeddingProvider)
+
+    with pytest.raises(ValueError):
+        get_embedding_provider("nope")
+
+
+def test_local_provider_close_shuts_down_workers():
+    from src.embeddings import LocalEmbeddingProvider
+
+    with LocalEmbeddingProvider(model_name="fake-model", batch_size=1, workers=2, model=FakeSentenceModel()) as provider:
+        assert len(provider.embed_batch(["a", "bb", "ccc"])) == 3
+
+    assert provider._executor is None
+
+
+def test_local_provider_loads_model_once_across_workers(monkeypatch):
+    import sys
+    import time
+    import types
+    from src.embeddings import LocalEmbeddingProvider
+
+    loads = []
+
+    class SlowLoadingModel(FakeSentenceModel):
+        def __init__(self, name, device=None):
+            time.sleep(0.05)
+            loads.append(name)
+            super().__init__()
+
+    monkeypatch.setitem(
+        sys.modules, "sentence_transformers",
+        types.SimpleNamespace(SentenceTransformer=SlowLoadingModel),
+    )
+    provider = LocalEmbeddingProvider(model_name="fake-model", batch_size=4, workers=4)
+
+    vectors = provider.embed_batch(["x" * n for n in range(1, 17)])
+    provider.close()
+
+    assert len(vectors) == 16
+    assert loads == ["fake-model"]
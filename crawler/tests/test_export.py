@@ -0,0 +1,98 @@
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+import pytest
+from src.export import partition_dir, read_watermark, write_watermark
+
+
+def test_partition_dir_is_hive_style():
+    path = partition_dir("/exports", "app-123", datetime(2026, 10, 19, 12, 0))
+    assert path == "/exports/application_id=app-123/month=2026-10"
+
+
+def test_watermark_round_trip(tmp_path):
+    assert read_watermark(str(tmp_path)) is None
+    write_watermark(str(tmp_path), 7421)
+    assert read_watermark(str(tmp_path)) == 7421
+
+
+def _row(issue_id, app_id, created_at, embedding):
+    return {
+        "id": issue_id, "application_id": app_id, "application_name": "Teams", "vendor": "Microsoft",
+        "version_id": None, "cluster_id": None, "title": "Crash", "summary": "Teams crashes.",
+        "source_type": "example.com", "source_url": f"https://example.com/{issue_id}",
+        "severity": "major", "issue_type": "crash", "upvotes": 0, "comment_count": 0,
+        "source_date": None, "created_at": created_at, "embedding_model": "fake-model",
+        "change_seq": 7000, "embedding": embedding,
+    }
+
+
+def test_export_partitions_by_app_and_month_and_resumes(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from src.export import ParquetExporter
+
+    rows = [
+        _row("i1", "app-a", datetime(2026, 9, 30, 23, 0), [0.1, 0.2, 0.3]),
+        _row("i2", "app-b", datetime(2026, 10, 1, 1, 0), None),
+        _row("i3", "app-a", datetime(2026, 10, 2, 8, 0), [0.4, 0.5, 0.6]),
+    ]
+    db = MagicMock()
+    snapshot_xmin = [7100]
+    db.execute.side_effect = lambda query, params=(): (
+        [{"xid": snapshot_xmin[0]}] if "pg_snapshot_xmin" in query else [{"embedding_dim": 3}]
+    )
+    db.stream.return_value = iter(rows)
+
+    exporter = ParquetExporter(db, str(tmp_path), embedding_model="fake-model", row_group_size=1)
+    assert exporter.export() == 3
+
+    files = sorted(p.relative_to(tmp_path).parent.as_posix() for p in tmp_path.rglob("*.parquet"))
+    assert files == [
+        "application_id=app-a/month=2026-09",
+        "application_id=app-a/month=2026-10",
+        "application_id=app-b/month=2026-10",
+    ]
+    assert not list(tmp_path.rglob("*.tmp"))
+
+    table = pq.read_table(next((tmp_path / "application_id=app-a" / "month=2026-10").glob("*.parquet")))
+    embedding_type = table.schema.field("embedding").type
+    assert embedding_type.list_size == 3
+    assert str(embedding_type.value_type) == "float"
+    assert table.column("id").to_pylist() == ["i3"]
+    assert table.column("embedding").to_pylist()[0] == pytest.approx([0.4, 0.5, 0.6])
+
+    assert table.column("change_seq").to_pylist() == [7000]
+    assert "change_xid >= " in db.stream.call_args.args[0]
+    assert db.stream.call_args.args[1][-2:] == (0, 7100)
+
+    # The next run starts where this one's snapshot ended, even with no rows
+    assert read_watermark(str(tmp_path)) == 7100
+    snapshot_xmin[0] = 7250
+    db.stream.return_value = iter([])
+    assert exporter.export() == 0
+    assert db.stream.call_args.args[1][-2:] == (7100, 7250)
+    assert read_watermark(str(tmp_path)) == 7250
+
+
+def test_export_writes_one_file_at_a_time_and_bounds_row_groups_by_bytes(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from src.export import ParquetExporter
+
+    rows = [_row(f"i{n}", "app-a", datetime(2026, 10, 1 + n), [0.1] * 3) for n in range(5)]
+    rows.append(_row("i9", "app-b", datetime(2026, 9, 1), None))
+    db = MagicMock()
+    db.execute.side_effect = lambda query, params=(): (
+        [{"xid": 7100}] if "pg_snapshot_xmin" in query else [{"embedding_dim": 3}]
+    )
+    db.stream.return_value = iter(rows)
+
+    # About two rows' worth of bytes per row group
+    exporter = ParquetExporter(db, str(tmp_path), embedding_model="fake-model", row_group_bytes=600,
+                               on_progress=lambda m: None)
+    with patch.object(exporter.pq, "ParquetWriter", wraps=exporter.pq.ParquetWriter) as writer_class:
+        assert exporter.export() == 6
+
+    assert "ORDER BY i.application_id, i.created_at, i.id" in db.stream.call_args.args[0]
+    assert writer_class.call_count == 2
+    parquet = pq.ParquetFile(next((tmp_path / "application_id=app-a" / "month=2026-10").glob("*.parquet")))
+    assert parquet.metadata.num_rows == 5
+    assert parquet.metadata.num_row_groups == 3
@@ -67,3 +67,39 @@ def test_issue_exists_by_url(db, app_id):
     # Cleanup
     db.execute("DELETE FROM issues WHERE id = %s", (issue['id'],))
     db.commit()
+
+
+def test_list_by_application_uses_lean_keyset_query():
+    from datetime import datetime
+    from unittest.mock import MagicMock
+
+    mock_db = MagicMock()
+    mock_db.execute.return_value = []
+    repo = IssueRepository(mock_db)
+    created_at = datetime(2026, 2, 15, 8, 52, 52, 276986)
+
+    repo.list_by_application("app-123", severity="critical", limit=25, before=(created_at, "issue-9"))
+
+    query, params = mock_db.execute.call_args.args
+    assert "SELECT *" not in query
+    assert "raw_content" not in query and "embedding" not in query
+    assert "(created_at, id) < (%s, %s)" in query
+    assert "ORDER BY created_at DESC, id DESC" in query
+    assert params == ("app-123", "critical", created_at, "issue-9", 25)
+
+
+def test_get_by_id_loads_heavy_columns_on_request():
+    from unittest.mock import MagicMock
+
+    mock_db = MagicMock()
+    mock_db.execute.return_value = [{"id": "issue-1", "raw_content": "Full text", "content_hash": None}]
+    repo = IssueRepository(mock_db)
+
+    repo.get_by_id("issue-1")
+    assert "raw_content" not in mock_db.execute.call_args.args[0]
+
+    issue = repo.get_by_id("issue-1", include_raw_content=True, include_embedding=True)
+    assert issue["raw_content"] == "Full text"
+    query = mock_db.execute.call_args.args[0]
+    assert "raw_content" in query
+    assert "embedding::real[]" in query
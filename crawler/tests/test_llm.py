@@ -1,5 +1,6 @@
 import pytest
 import os
+import json
 from src.llm import get_llm_provider
 from src.llm.interface import LLMProvider, IssueAnalysis
 
@@ -24,3 +25,81 @@ def test_get_llm_provider_returns_anthropic():
         pytest.skip("ANTHROPIC_API_KEY not set")
     provider = get_llm_provider("anthropic")
     assert provider is not None
+
+
+STAND_IN_URL = "http://localhost:8788"
+
+
+def _stand_in_response(text, cache_read=0, cache_creation=0):
+    return {
+        "id": "msg_test",
+        "type": "message",
+        "role": "assistant",
+        "model": "claude-3-haiku-20240307",
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": 120,
+            "output_tokens": 60,
+            "cache_read_input_tokens": cache_read,
+            "cache_creation_input_tokens": cache_creation,
+        },
+    }
+
+
+def test_cached_provider_sends_cacheable_system_block(httpx_mock):
+    from src.llm import AnthropicProvider
+
+    httpx_mock.add_response(
+        url=f"{STAND_IN_URL}/v1/messages",
+        json=_stand_in_response(
+            '"t":"Teams crashes on launch","s":"Teams crashes on launch after the latest update.",'
+            '"v":"Critical","k":"crash","ver":"24.1","w":true}',
+            cache_creation=400,
+        ),
+    )
+
+    provider = AnthropicProvider(api_key="test-key", prompt_caching=True, base_url=STAND_IN_URL)
+    analysis = provider.analyze_issue("Teams crashes every time I open it.", "Microsoft Teams")
+
+    assert analysis.title == "Teams crashes on launch"
+    assert analysis.severity == "critical"
+    assert analysis.issue_type == "crash"
+    assert analysis.version_mentioned == "24.1"
+    assert analysis.has_workaround is True
+
+    request = httpx_mock.get_request()
+    body = json.loads(request.content)
+    assert body["system"][0]["cache_control"] == {"type": "ephemeral"}
+    assert body["max_tokens"] < 500
+    assert body["messages"][-1] == {"role": "assistant", "content": "{"}
+    assert "Microsoft Teams" in body["messages"][0]["content"]
+    assert "prompt-caching" in request.headers["anthropic-beta"]
+
+
+def test_cached_provider_records_hit_rate(httpx_mock):
+    from src.llm import AnthropicProvider
+
+    compact = '"t":"Slow sync","s":"Sync is slow.","v":"minor","k":"performance","ver":null,"w":false}'
+    httpx_mock.add_response(json=_stand_in_response(compact, cache_creation=400))
+    httpx_mock.add_response(json=_stand_in_response(compact, cache_read=400))
+
+    provider = AnthropicProvider(api_key="test-key", prompt_caching=True, base_url=STAND_IN_URL)
+    provider.analyze_issue("Slack sync is slow", "Slack")
+    provider.analyze_issue("Slack sync is slow again", "Slack")
+
+    assert provider.cache_stats.requests == 2
+    assert provider.cache_stats.cache_hits == 1
+    assert provider.cache_stats.hit_rate == 0.5
+    assert provider.cache_stats.cache_read_input_tokens == 400
+
+
+def test_cached_system_prompt_is_long_enough_to_be_cached():
+    from src.llm import AnthropicProvider
+    from src.llm.anthropic_provider import CACHED_SYSTEM_PROMPT, min_cacheable_tokens
+
+    provider = AnthropicProvider(api_key="test-key", prompt_caching=True)
+    # English prose averages about 4 characters per token; 5 is a conservative lower bound
+    assert len(CACHED_SYSTEM_PROMPT) / 5 >= min_cacheable_tokens(provider.model)
+    assert min_cacheable_tokens("claude-3-haiku-20240307") == 2048
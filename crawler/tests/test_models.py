@@ -24,3 +24,9 @@ def test_fetched_page_structure():
     assert page.url == "https://reddit.com/r/sysadmin/abc123"
     assert page.content == "Full text content of the page goes here..."
     assert page.source == "reddit.com"
+
+
+def test_models_are_slotted():
+    page = FetchedPage(url="u", title="t", content="c", source="s")
+    assert not hasattr(page, "__dict__")
+    assert not hasattr(WebSearchResult(url="u", title="t", snippet="s", source="s"), "__dict__")
@@ -0,0 +1,78 @@
+from datetime import date
+from unittest.mock import MagicMock
+import pytest
+from src.partitions import PartitionManager, add_months, partition_month
+
+
+def test_add_months():
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert add_months(date(2026, 3, 1), -14) == date(2025, 1, 1)
+
+
+def test_partition_month():
+    assert partition_month("issues_p202602") == date(2026, 2, 1)
+    assert partition_month("issues_p202602_h3") is None
+    assert partition_month("issues_default") is None
+
+
+def test_ensure_creates_current_and_future_months():
+    mock_db = MagicMock()
+    mock_db.execute.side_effect = lambda query, params: [{"name": f"issues_p{params[0]:%Y%m}"}]
+
+    names = PartitionManager(mock_db, app_buckets=4).ensure(months_ahead=2, today=date(2026, 11, 19))
+
+    assert names == ["issues_p202611", "issues_p202612", "issues_p202701"]
+    assert mock_db.execute.call_args_list[0].args[1] == (date(2026, 11, 1), 4)
+    mock_db.commit.assert_called_once()
+
+
+def test_retention_drops_only_expired_partitions():
+    mock_db = MagicMock()
+    manager = PartitionManager(mock_db, app_buckets=0)
+    manager.list_partitions = MagicMock(return_value=[
+        {"name": "issues_p202601", "approx_rows": 10, "month": date(2026, 1, 1)},
+        {"name": "issues_p202604", "approx_rows": 10, "month": date(2026, 4, 1)},
+        {"name": "issues_p202610", "approx_rows": 10, "month": date(2026, 10, 1)},
+    ])
+
+    dropped = manager.apply_retention(keep_months=6, today=date(2026, 10, 19))
+
+    assert dropped == ["issues_p202601"]
+    statements = [
+        call.args[0].as_string(None) if hasattr(call.args[0], "as_string") else call.args[0]
+        for call in mock_db.execute.call_args_list
+    ]
+    assert any("UPDATE issue_counts" in s for s in statements)
+    assert "dropped_refs" in statements[0]
+    assert 'ALTER TABLE issues DETACH PARTITION "issues_p202601"' in statements
+    drop = statements.index('DROP TABLE "issues_p202601"')
+    # Clusters and cold storage are cleaned up after the rows are gone, in the same transaction
+    cleanup = statements[drop + 1:]
+    assert "UPDATE incident_clusters" in cleanup[0] and "issue_count = r.n" in cleanup[0]
+    assert "DELETE FROM incident_clusters" in cleanup[1]
+    assert "DELETE FROM issue_contents" in cleanup[2] and "NOT EXISTS" in cleanup[2]
+    mock_db.commit.assert_called_once()
+    # Expired URLs stay in issue_urls so they are not crawled again
+    assert not any("issue_urls" in s for s in statements)
+
+
+def test_retention_prunes_urls_on_a_longer_horizon():
+    mock_db = MagicMock()
+    mock_db.execute.return_value = [{"n": 3}]
+    manager = PartitionManager(mock_db, app_buckets=0)
+    manager.list_partitions = MagicMock(return_value=[])
+
+    manager.apply_retention(keep_months=6, today=date(2026, 10, 19), keep_url_months=24)
+
+    query, params = mock_db.execute.call_args.args
+    assert "DELETE FROM issue_urls" in query
+    assert params == (date(2024, 10, 1),)
+
+    with pytest.raises(ValueError):
+        manager.apply_retention(keep_months=6, keep_url_months=3)
+
+
+def test_drop_rejects_non_monthly_partitions():
+    with pytest.raises(ValueError):
+        PartitionManager(MagicMock(), app_buckets=0).drop("issues_default")
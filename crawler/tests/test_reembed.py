@@ -0,0 +1,62 @@
+from unittest.mock import MagicMock
+from src.reembed import Reembedder
+from src.embeddings import EmbeddingProvider
+
+
+class FakeProvider(EmbeddingProvider):
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.batches = []
+
+    @property
+    def dimension(self) -> int:
+        return 2
+
+    def embed_batch(self, texts):
+        self.batches.append(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def _rows(start, count):
+    return [
+        {"id": f"id-{i:03d}", "title": f"Title {i}", "summary": "Summary"}
+        for i in range(start, start + count)
+    ]
+
+
+def test_reembed_pages_and_batches():
+    mock_db = MagicMock()
+    provider = FakeProvider()
+    reembedder = Reembedder(mock_db, provider, page_size=5, batch_size=2, on_progress=lambda m: None)
+
+    pages = [_rows(0, 5), _rows(5, 3)]
+    reembedder.issue_repo.iter_embedding_targets = MagicMock(side_effect=lambda *a, **kw: iter(pages.pop(0)))
+    reembedder.issue_repo.update_embeddings = MagicMock()
+
+    count = reembedder.run()
+
+    assert count == 8
+    # 5 rows -> batches of 2, 2, 1; 3 rows -> 2, 1
+    assert [len(b) for b in provider.batches] == [2, 2, 1, 2, 1]
+    assert reembedder.issue_repo.update_embeddings.call_count == 5
+    assert mock_db.commit.call_count == 2
+
+    # Second page resumes after the last id of the first
+    second_call = reembedder.issue_repo.iter_embedding_targets.call_args_list[1]
+    assert second_call.kwargs["after_id"] == "id-004"
+
+    ids, model = reembedder.issue_repo.update_embeddings.call_args_list[0].args
+    assert model == "fake-model"
+    assert ids[0] == ("id-000", [float(len("Title 0 Summary")), 1.0])
+
+
+def test_reembed_resumes_after_given_id():
+    mock_db = MagicMock()
+    reembedder = Reembedder(mock_db, FakeProvider(), on_progress=lambda m: None)
+    reembedder.issue_repo.iter_embedding_targets = MagicMock(return_value=iter([]))
+
+    assert reembedder.run(after_id="id-100", missing_only=True) == 0
+    call = reembedder.issue_repo.iter_embedding_targets.call_args
+    assert call.kwargs["after_id"] == "id-100"
+    assert call.kwargs["missing_only"] is True
@@ -0,0 +1,29 @@
+from unittest.mock import MagicMock
+from src.repositories import IssueRepository, RollupRepository
+
+
+def test_count_by_severity_reads_rollup():
+    mock_db = MagicMock()
+    mock_db.execute.return_value = [
+        {"severity": "critical", "count": 3},
+        {"severity": "minor", "count": 0},
+    ]
+
+    counts = IssueRepository(mock_db).count_by_severity("app-123")
+
+    assert counts == {"critical": 3}
+    query = mock_db.execute.call_args.args[0]
+    assert "FROM issue_counts" in query
+    assert "FROM issues" not in query
+
+
+def test_rebuild_locks_then_recomputes():
+    mock_db = MagicMock()
+
+    RollupRepository(mock_db).rebuild()
+
+    statements = [call.args[0] for call in mock_db.execute.call_args_list]
+    assert statements[0].startswith("LOCK TABLE issue_counts, issue_daily_counts")
+    assert any("INSERT INTO issue_counts" in s for s in statements)
+    assert any("INSERT INTO issue_daily_counts" in s for s in statements)
+    mock_db.commit.assert_called_once()
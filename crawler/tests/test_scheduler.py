@@ -0,0 +1,72 @@
+from src.scheduler import CrawlScheduler
+
+HOUR = 3600
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(clock):
+    scheduler = CrawlScheduler(min_interval=HOUR // 4, max_interval=24 * HOUR, clock=clock)
+    scheduler.sync([{"id": "busy", "name": "Busy"}, {"id": "quiet", "name": "Quiet"}])
+    return scheduler
+
+
+def test_new_apps_are_due_immediately():
+    clock = FakeClock()
+    scheduler = _scheduler(clock)
+    assert scheduler.next_due() is not None
+    assert scheduler.seconds_until_next() == 0
+
+
+def test_productive_apps_are_crawled_more_often():
+    clock = FakeClock()
+    scheduler = _scheduler(clock)
+    for _ in range(4):
+        scheduler.record(scheduler.schedules["busy"], 10)
+        scheduler.record(scheduler.schedules["quiet"], 0)
+
+    busy, quiet = scheduler.schedules["busy"], scheduler.schedules["quiet"]
+    assert busy.interval < 3 * HOUR
+    assert quiet.interval > 20 * HOUR
+    assert scheduler.next_due() is None
+
+    clock.now += busy.interval
+    assert scheduler.next_due() is busy
+
+
+def test_interval_is_clamped():
+    scheduler = CrawlScheduler(min_interval=HOUR, max_interval=2 * HOUR, clock=FakeClock())
+    assert scheduler.interval_for(0) == 2 * HOUR
+    assert scheduler.interval_for(1000) == HOUR
+
+
+def test_sync_drops_deleted_apps():
+    clock = FakeClock()
+    scheduler = _scheduler(clock)
+    scheduler.sync([{"id": "busy", "name": "Busy (renamed)"}])
+    assert list(scheduler.schedules) == ["busy"]
+    assert scheduler.snapshot()[0]["name"] == "Busy (renamed)"
+
+
+def test_restore_resumes_saved_schedules():
+    clock = FakeClock()
+    scheduler = _scheduler(clock)
+    scheduler.restore({
+        "busy": {"next_run": clock.now + 600, "interval": 900, "yield_ewma": 20.0,
+                 "crawls": 12, "last_run": clock.now - 300, "last_new": 18, "last_error": None},
+        "deleted": {"next_run": clock.now, "interval": 900, "yield_ewma": 0.0,
+                    "crawls": 1, "last_run": None, "last_new": 0, "last_error": None},
+    })
+
+    busy = scheduler.schedules["busy"]
+    assert busy.next_run == clock.now + 600
+    assert busy.crawls == 12
+    assert busy.interval == scheduler.interval_for(20.0)
+    assert "deleted" not in scheduler.schedules
+    assert scheduler.next_due().app_id == "quiet"
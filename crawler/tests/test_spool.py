@@ -0,0 +1,208 @@
+import struct
+from unittest.mock import MagicMock, patch
+import psycopg
+import pytest
+from src.spool import IssueSpool, SpoolLoader, encode_record, read_records, read_offset, rejected_path
+
+
+def _fields(n):
+    return {
+        "application_id": "app-123",
+        "title": f"Issue {n}",
+        "summary": "Teams crashes when sharing the screen after the update.",
+        "raw_content": "page text",
+        "source_type": "example.com",
+        "source_url": f"https://example.com/{n}",
+        "severity": "major",
+        "issue_type": "crash",
+        "embedding_model": "fake-model",
+        "spooled_at": "2026-10-19T12:00:00",
+    }
+
+
+def test_records_round_trip_with_float32_embeddings(tmp_path):
+    path = tmp_path / "issues.spool"
+    spool = IssueSpool(str(path), fsync="never")
+    spool.append(_fields(1), [0.5, -1.25, 3.0])
+    spool.append(_fields(2), None)
+    spool.close()
+
+    records = list(read_records(str(path)))
+    assert [r[1]["title"] for r in records] == ["Issue 1", "Issue 2"]
+    assert records[0][2] == [0.5, -1.25, 3.0]
+    assert records[1][2] is None
+    assert records[-1][0] == path.stat().st_size
+    # 3 float32s, not JSON
+    assert len(encode_record(_fields(1), [0.5, -1.25, 3.0])) - len(encode_record(_fields(1), None)) == 12
+
+
+def test_torn_tail_is_ignored_and_repaired(tmp_path):
+    path = tmp_path / "issues.spool"
+    spool = IssueSpool(str(path), fsync="never")
+    spool.append(_fields(1), [1.0])
+    spool.close()
+    good_size = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(encode_record(_fields(2), [2.0])[:-5])
+
+    assert len(list(read_records(str(path)))) == 1
+
+    spool = IssueSpool(str(path), fsync="never")
+    assert path.stat().st_size == good_size
+    spool.append(_fields(3), [3.0])
+    spool.close()
+    assert [r[1]["title"] for r in read_records(str(path))] == ["Issue 1", "Issue 3"]
+
+
+def test_fsync_policy(tmp_path):
+    with patch("src.spool.os.fsync") as fsync:
+        spool = IssueSpool(str(tmp_path / "a.spool"), fsync="always")
+        spool.append(_fields(1))
+        spool.append(_fields(2))
+        assert fsync.call_count == 2
+
+        fsync.reset_mock()
+        spool = IssueSpool(str(tmp_path / "b.spool"), fsync="interval", fsync_interval=3600)
+        spool.append(_fields(1))
+        spool.append(_fields(2))
+        assert fsync.call_count == 0
+
+    with pytest.raises(ValueError):
+        IssueSpool(str(tmp_path / "c.spool"), fsync="sometimes")
+
+
+def test_loader_is_idempotent_and_saves_offset(tmp_path):
+    path = tmp_path / "issues.spool"
+    spool = IssueSpool(str(path), fsync="never")
+    for n in range(3):
+        spool.append(_fields(n), [float(n)])
+    spool.close()
+
+    loader = SpoolLoader(MagicMock(), str(path), batch_size=2, on_progress=lambda m: None)
+    stored = {"https://example.com/0"}
+    loader.issue_repo.existing_urls = MagicMock(side_effect=lambda urls: {u for u in urls if u in stored})
+    loader.issue_repo.create = MagicMock(side_effect=lambda **kw: stored.add(kw["source_url"]) or kw)
+    loader.clusterer.assign = MagicMock()
+    loader.trends = MagicMock()
+
+    assert loader.load() == 2
+    assert read_offset(str(path)) == path.stat().st_size
+    created = loader.issue_repo.create.call_args_list
+    assert [c.kwargs["source_url"] for c in created] == ["https://example.com/1", "https://example.com/2"]
+    assert all(c.kwargs["commit"] is False for c in created)
+    assert created[0].kwargs["embedding"] == [1.0]
+    assert loader.clusterer.assign.call_count == 2
+
+    # Nothing new past the offset; replaying from the start inserts nothing either
+    assert loader.load() == 0
+    (tmp_path / "issues.spool.offset").unlink()
+    assert loader.load() == 0
+
+    loader.truncate()
+    assert path.stat().st_size == 0
+    assert read_offset(str(path)) == 0
+
+
+def test_corrupt_record_is_skipped_by_resyncing(tmp_path):
+    path = tmp_path / "issues.spool"
+    spool = IssueSpool(str(path), fsync="never")
+    for n in range(3):
+        spool.append(_fields(n), [float(n)])
+    spool.close()
+
+    first_end = next(read_records(str(path)))[0]
+    data = bytearray(path.read_bytes())
+    data[first_end + 20] ^= 0xFF  # flip a byte inside the second record's payload
+    path.write_bytes(bytes(data))
+    size = path.stat().st_size
+
+    assert [r[1]["title"] for r in read_records(str(path))] == ["Issue 0", "Issue 2"]
+    # Reopening keeps the records after the corrupt one
+    IssueSpool(str(path), fsync="never").close()
+    assert path.stat().st_size == size
+
+
+
+def test_resync_scans_in_bounded_chunks(tmp_path):
+    """A corrupt length field is not trusted past MAX_RECORD_BYTES, and records
+    spanning chunk boundaries are still found."""
+    path = tmp_path / "issues.spool"
+    spool = IssueSpool(str(path), fsync="never")
+    for n in range(3):
+        spool.append(_fields(n), [float(n)])
+    spool.close()
+
+    data = bytearray(path.read_bytes())
+    struct.pack_into("<I", data, 0, 0xFFFFFFF0)  # first record claims ~4 GB
+    path.write_bytes(bytes(data))
+
+    with patch("src.spool.RESYNC_CHUNK", 7):
+        assert [r[1]["title"] for r in read_records(str(path))] == ["Issue 1", "Issue 2"]
+
+
+def test_loader_moves_refused_records_aside(tmp_path):
+    """A record failing a foreign key does not block the batch or the offset."""
+    path = tmp_path / "issues.spool"
+    spool = IssueSpool(str(path), fsync="never")
+    for n in range(3):
+        spool.append(_fields(n), [float(n)])
+    spool.close()
+
+    def create(**kw):
+        if kw["source_url"] == "https://example.com/1":
+            raise psycopg.errors.ForeignKeyViolation("application deleted")
+        return kw
+
+    loader = SpoolLoader(MagicMock(), str(path), batch_size=3, on_progress=lambda m: None)
+    loader.issue_repo.existing_urls = MagicMock(return_value=set())
+    loader.issue_repo.create = MagicMock(side_effect=create)
+    loader.clusterer.assign = MagicMock()
+    loader.trends = MagicMock()
+
+    assert loader.load() == 2
+    assert read_offset(str(path)) == path.stat().st_size
+    rejected = list(read_records(rejected_path(str(path))))
+    assert [r[1]["source_url"] for r in rejected] == ["https://example.com/1"]
+    assert "application deleted" in rejected[0][1]["load_error"]
+    assert rejected[0][2] == [1.0]
+
+def test_loader_compacts_the_spool_it_shares(tmp_path):
+    path = tmp_path / "issues.spool"
+    spool = IssueSpool(str(path), fsync="never")
+    for n in range(2):
+        spool.append(_fields(n), [float(n)])
+
+    loader = SpoolLoader(MagicMock(), str(path), on_progress=lambda m: None, spool=spool, compact_bytes=1)
+    loader.issue_repo.existing_urls = MagicMock(return_value=set())
+    loader.issue_repo.create = MagicMock(side_effect=lambda **kw: kw)
+    loader.clusterer.assign = MagicMock()
+    loader.trends = MagicMock()
+
+    assert loader.load() == 2
+    assert path.stat().st_size == 0
+    assert read_offset(str(path)) == 0
+    assert not spool.contains("https://example.com/0")
+
+    # Records appended after the compaction are still loaded
+    spool.append(_fields(2), [2.0])
+    assert loader.load() == 1
+    assert loader.issue_repo.create.call_args.kwargs["source_url"] == "https://example.com/2"
+    spool.close()
+
+
+def test_compact_keeps_records_not_loaded_yet(tmp_path):
+    path = tmp_path / "issues.spool"
+    spool = IssueSpool(str(path), fsync="never")
+    for n in range(3):
+        spool.append(_fields(n), [float(n)])
+    loaded = next(read_records(str(path)))[0]
+
+    offsets = []
+    spool.compact(loaded, offsets.append)
+    spool.append(_fields(3), [3.0])
+    spool.close()
+
+    assert offsets == [0]
+    assert [r[1]["title"] for r in read_records(str(path))] == ["Issue 1", "Issue 2", "Issue 3"]
+    assert not spool.contains("https://example.com/0")
+    assert spool.contains("https://example.com/2")
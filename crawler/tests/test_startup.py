@@ -0,0 +1,35 @@
+import subprocess
+import sys
+from pathlib import Path
+
+CRAWLER_DIR = Path(__file__).resolve().parent.parent
+
+# Modules only the crawl/cluster commands need; loading them costs most of a second
+HEAVY_MODULES = ["anthropic", "openai", "httpx", "bs4", "numpy", "src.crawler"]
+
+
+def _loaded_after(code: str) -> list[str]:
+    script = (
+        f"import sys\n{code}\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=CRAWLER_DIR, capture_output=True, text=True, check=True,
+        env={"PATH": "", "ANTHROPIC_API_KEY": "test-key"},
+    )
+    return [m for m in result.stdout.strip().split(",") if m]
+
+
+def test_cli_import_skips_heavy_modules():
+    assert _loaded_after("import main") == []
+
+
+def test_providers_defer_sdk_import_until_first_use():
+    loaded = _loaded_after(
+        "from src.llm import get_llm_provider\n"
+        "from src.embeddings import OpenAIEmbeddingProvider\n"
+        "get_llm_provider('anthropic')\n"
+        "OpenAIEmbeddingProvider(api_key='test-key')"
+    )
+    assert loaded == []
@@ -0,0 +1,160 @@
+from array import array
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+from src.trends import TrendSeries, TrendDetector, WINDOW, bucket_start
+
+
+def _issue(created_at, severity="critical"):
+    return {
+        "id": "issue-1",
+        "application_id": "app-123",
+        "severity": severity,
+        "issue_type": "crash",
+        "created_at": created_at,
+    }
+
+
+def test_series_ring_buffer_wraps():
+    start = datetime(2026, 10, 19, 0, 0)
+    series = TrendSeries(bucket_start=start)
+    for hour in range(WINDOW + 5):
+        series.observe(start + timedelta(hours=hour, minutes=30))
+
+    assert len(series.counts) == WINDOW
+    assert series.head == (WINDOW + 4) % WINDOW
+    assert series.bucket_start == start + timedelta(hours=WINDOW + 4)
+    assert series.recent(3) == [1, 1, 1]
+    # A steady rate of one per hour is the baseline, not a spike
+    assert abs(series.ewma - 1.0) < 0.01
+    assert series.zscore() < 1
+
+
+def test_series_late_arrival_counts_in_its_own_bucket():
+    start = datetime(2026, 10, 19, 5, 0)
+    series = TrendSeries(bucket_start=start)
+    assert series.observe(start - timedelta(hours=3)) is False
+    assert series.current == 0
+    assert series.recent(4) == [1, 0, 0, 0]
+    assert series.bucket_start == start
+
+
+def test_record_flags_burst_and_persists_state():
+    mock_db = MagicMock()
+    mock_db.execute.return_value = []
+    detector = TrendDetector(mock_db)
+
+    start = datetime(2026, 10, 19, 0, 0)
+    spikes = [detector.record(_issue(start + timedelta(hours=h))) for h in range(48)]
+    assert not any(spikes)
+
+    burst_hour = start + timedelta(hours=48, minutes=10)
+    spikes = [detector.record(_issue(burst_hour)) for _ in range(6)]
+    spike = spikes[-1]
+    assert spike is not None
+    assert spike.observed == 6
+    assert spike.bucket_start == bucket_start(burst_hour)
+    assert spike.zscore >= 3
+    assert any("INSERT INTO trend_alerts" in c.args[0] for c in mock_db.execute.call_args_list)
+
+    # Nothing stored yet: flush creates the row, then locks and fills it
+    empty = {"bucket_start": start, "counts": [0] * WINDOW, "head": 0, "ewma": 0.0, "ewm_var": 0.0}
+    mock_db.execute.side_effect = lambda query, params=(): [empty] if "FOR UPDATE" in query else []
+    detector.flush()
+    statements = [c.args[0] for c in mock_db.execute.call_args_list]
+    assert any("INSERT INTO trend_state" in s and "DO NOTHING" in s for s in statements)
+    query, params = mock_db.execute_many.call_args.args
+    assert "UPDATE trend_state" in query
+    assert params[0][-3:] == ("app-123", "critical", "crash")
+    assert len(params[0][1]) == WINDOW
+    assert sum(params[0][1]) == 48 + 6
+
+    mock_db.execute_many.reset_mock()
+    detector.flush()
+    mock_db.execute_many.assert_not_called()
+
+
+def test_record_resumes_from_persisted_state():
+    start = datetime(2026, 10, 19, 9, 0)
+    counts = [0] * WINDOW
+    counts[7] = 2
+    mock_db = MagicMock()
+    mock_db.execute.return_value = [{
+        "bucket_start": start, "counts": counts, "head": 7, "ewma": 2.0, "ewm_var": 0.5,
+    }]
+    detector = TrendDetector(mock_db)
+
+    assert detector.record(_issue(start + timedelta(minutes=20))) is None
+    series = detector._series[("app-123", "critical", "crash")]
+    assert series.counts == array("i", counts[:7] + [3] + counts[8:])
+    assert series.ewma == 2.0
+
+
+def test_flush_adds_to_counts_stored_by_another_detector():
+    start = datetime(2026, 10, 19, 9, 0)
+    mock_db = MagicMock()
+    mock_db.execute.return_value = []
+    detector = TrendDetector(mock_db)
+    for _ in range(2):
+        detector.record(_issue(start + timedelta(minutes=5)))
+
+    # Meanwhile the spool loader's detector stored 3 arrivals in the same bucket
+    counts = [0] * WINDOW
+    counts[0] = 3
+    stored = {"bucket_start": start, "counts": counts, "head": 0, "ewma": 0.5, "ewm_var": 0.1}
+    mock_db.execute.side_effect = lambda query, params=(): [stored] if "FOR UPDATE" in query else []
+    detector.flush()
+
+    params = mock_db.execute_many.call_args.args[1]
+    assert params[0][1][0] == 5
+    assert params[0][3] == 0.5
+    assert detector._series[("app-123", "critical", "crash")].current == 5
+
+
+def test_spike_upsert_updates_expected():
+    mock_db = MagicMock()
+    mock_db.execute.return_value = []
+    detector = TrendDetector(mock_db)
+    start = datetime(2026, 10, 19, 0, 0)
+    for h in range(48):
+        detector.record(_issue(start + timedelta(hours=h)))
+    for _ in range(6):
+        detector.record(_issue(start + timedelta(hours=48)))
+
+    query = next(c.args[0] for c in mock_db.execute.call_args_list if "INSERT INTO trend_alerts" in c.args[0])
+    assert "expected = EXCLUDED.expected" in query
+
+
+def test_steady_daily_crawl_does_not_alert():
+    """Four critical issues stored by one crawl a day is the baseline, not a daily spike."""
+    mock_db = MagicMock()
+    mock_db.execute.return_value = []
+    detector = TrendDetector(mock_db)
+
+    crawl_hour = datetime(2026, 9, 1, 6, 0)
+    spikes = []
+    for day in range(30):
+        stored_at = crawl_hour + timedelta(days=day, minutes=5)
+        spikes += [detector.record(_issue(stored_at)) for _ in range(4)]
+
+    assert not any(spikes)
+
+    burst_at = crawl_hour + timedelta(days=30, minutes=5)
+    assert any([detector.record(_issue(burst_at)) for _ in range(12)])
+
+
+def test_record_buckets_by_source_date():
+    """A feed item is counted in the hour it was published, not the hour it was polled."""
+    mock_db = MagicMock()
+    mock_db.execute.return_value = []
+    detector = TrendDetector(mock_db)
+    stored_at = datetime(2026, 10, 19, 12, 30)
+    detector.record(_issue(stored_at))
+
+    issue = _issue(stored_at + timedelta(minutes=1))
+    issue["source_date"] = datetime(2026, 10, 19, 9, 45)
+    assert detector.record(issue) is None
+
+    series = detector._series[("app-123", "critical", "crash")]
+    assert series.current == 1
+    assert series.recent(4) == [1, 0, 0, 1]
+    assert detector._pending[("app-123", "critical", "crash")][datetime(2026, 10, 19, 9, 0)] == 1
@@ -0,0 +1,77 @@
+from unittest.mock import MagicMock
+from src.vector_index import (
+    VectorIndexManager, recall_at_k, percentile, index_name,
+)
+
+
+def test_recall_at_k():
+    assert recall_at_k(["a", "b", "c", "d"], ["a", "b", "c", "e"]) == 0.75
+    assert recall_at_k(["a"], []) == 1.0
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile([], 50) == 0.0
+    # Nearest rank rounds up: p50 of 5 values is the 3rd, p95 of 10 is the 10th
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 50) == 3.0
+    assert percentile([float(v) for v in range(1, 11)], 95) == 10.0
+
+
+def test_index_name():
+    assert index_name("text-embedding-3-small") == "idx_issues_embedding"
+    assert index_name("sentence-transformers/all-MiniLM-L6-v2") == "idx_issues_embedding_minilm"
+    assert index_name("BAAI/bge-small-en-v1.5") == "idx_issues_embedding_bge_small_en_v1_5"
+
+    scoped = index_name("text-embedding-3-small", "11b7d676-db8e-49ef-8111-3877dc9fb2f7")
+    assert scoped == "idx_issues_embedding_app_11b7d676db8e"
+    assert len(index_name("sentence-transformers/all-MiniLM-L6-v2", "11b7d676-db8e-49ef-8111-3877dc9fb2f7")) <= 63
+
+
+def _fake_execute(query, params=()):
+    query = str(query)
+    if "embedding_dim" in query:
+        return [{"embedding_dim": 1536}]
+    if "pg_partition_tree" in query:
+        return [
+            {"name": "issues", "parent": None, "isleaf": False},
+            {"name": "issues_p202602", "parent": "issues", "isleaf": True},
+            {"name": "issues_p202603", "parent": "issues", "isleaf": True},
+        ]
+    return []
+
+
+def test_rebuild_builds_partitions_concurrently_and_swaps():
+    mock_db = MagicMock()
+    mock_db.execute.side_effect = _fake_execute
+    manager = VectorIndexManager(mock_db)
+
+    name = manager.rebuild("text-embedding-3-small", m=24, ef_construction=128)
+
+    assert name == "idx_issues_embedding"
+    statements = [
+        call.args[0].as_string(None) if hasattr(call.args[0], "as_string") else call.args[0]
+        for call in mock_db.execute.call_args_list
+    ]
+    creates = [s for s in statements if "CREATE INDEX" in s]
+    assert len(creates) == 3
+    # Parent index is declared ONLY on the parent; leaves are built concurrently
+    assert 'ON ONLY "issues"' in creates[0]
+    assert "CONCURRENTLY" not in creates[0]
+    assert all("CONCURRENTLY" in c for c in creates[1:])
+    assert all("m = 24, ef_construction = 128" in c for c in creates)
+    assert all("vector(1536)" in c for c in creates)
+    assert all("embedding_model = 'text-embedding-3-small'" in c for c in creates)
+
+    attaches = [s for s in statements if "ATTACH PARTITION" in s]
+    assert len(attaches) == 2
+    assert all(a.startswith('ALTER INDEX "idx_issues_embedding_new" ATTACH') for a in attaches)
+    assert statements[-1] == 'ALTER INDEX "idx_issues_embedding_new" RENAME TO "idx_issues_embedding"'
+    mock_db.autocommit.assert_called_once()
+
+
+def test_set_ef_search():
+    mock_db = MagicMock()
+    VectorIndexManager(mock_db).set_ef_search(100)
+    assert mock_db.execute.call_args.args[1] == ("100",)
@@ -49,3 +49,28 @@ def test_search_returns_web_search_results():
     assert results[0].url == "https://example.com/page1"
     assert results[0].title == "Page 1"
     assert results[0].snippet == "Snippet 1"
+
+
+def test_iter_search_yields_before_later_queries_run():
+    ws = WebSearch(api_key="test-key")
+    queries_run = []
+
+    def fake_query(query):
+        queries_run.append(query)
+        return [
+            {"url": "https://example.com/shared", "title": "Shared", "description": ""},
+            {"url": f"https://example.com/{len(queries_run)}", "title": query, "description": ""},
+        ]
+
+    with patch.object(ws, "_search_single_query", side_effect=fake_query), \
+            patch("src.sources.web_search.time.sleep"):
+        results = ws.iter_search(["test keyword"])
+        first = next(results)
+        assert len(queries_run) == 1
+        assert first.url == "https://example.com/shared"
+
+        rest = list(results)
+
+    assert len(queries_run) == len(SEARCH_SUFFIXES)
+    urls = [first.url] + [r.url for r in rest]
+    assert len(urls) == len(set(urls)) == len(SEARCH_SUFFIXES) + 1
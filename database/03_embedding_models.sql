@@ -0,0 +1,31 @@
+-- database/03_embedding_models.sql
+-- Record which model produced each embedding so vectors from different
+-- backends never share an ANN index. The embedding column is left
+-- dimensionless and each model gets its own partial expression index.
+
+ALTER TABLE issues
+    ADD COLUMN embedding_model TEXT,
+    ADD COLUMN embedding_dim   INTEGER;
+
+UPDATE issues
+SET embedding_model = 'text-embedding-3-small', embedding_dim = 1536
+WHERE embedding IS NOT NULL;
+
+DROP INDEX IF EXISTS idx_issues_embedding;
+
+ALTER TABLE issues ALTER COLUMN embedding TYPE vector;
+
+ALTER TABLE issues ADD CONSTRAINT issues_embedding_model_check CHECK (
+    embedding IS NULL
+    OR (embedding_model IS NOT NULL AND vector_dims(embedding) = embedding_dim)
+);
+
+-- One HNSW index per embedding model. Queries must filter on embedding_model
+-- and order by the same cast expression to use them.
+CREATE INDEX idx_issues_embedding ON issues
+    USING hnsw ((embedding::vector(1536)) vector_cosine_ops)
+    WHERE embedding_model = 'text-embedding-3-small';
+
+CREATE INDEX idx_issues_embedding_minilm ON issues
+    USING hnsw ((embedding::vector(384)) vector_cosine_ops)
+    WHERE embedding_model = 'sentence-transformers/all-MiniLM-L6-v2';
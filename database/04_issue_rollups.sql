@@ -0,0 +1,75 @@
+-- database/04_issue_rollups.sql
+-- Issue counts per application, maintained by a trigger so dashboards read
+-- O(apps) rows instead of aggregating the issues table.
+
+-- Running totals per application / severity / issue type
+CREATE TABLE issue_counts (
+    application_id  UUID NOT NULL REFERENCES applications(id) ON DELETE CASCADE,
+    severity        TEXT NOT NULL,
+    issue_type      TEXT NOT NULL DEFAULT '',
+    issue_count     INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (application_id, severity, issue_type)
+);
+
+-- Same counts bucketed by the day issues were added
+CREATE TABLE issue_daily_counts (
+    application_id  UUID NOT NULL REFERENCES applications(id) ON DELETE CASCADE,
+    day             DATE NOT NULL,
+    severity        TEXT NOT NULL,
+    issue_type      TEXT NOT NULL DEFAULT '',
+    issue_count     INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (application_id, day, severity, issue_type)
+);
+
+CREATE FUNCTION issue_rollups_add(app UUID, d DATE, sev TEXT, itype TEXT) RETURNS void AS $$
+    INSERT INTO issue_counts AS c (application_id, severity, issue_type, issue_count)
+    VALUES (app, sev, COALESCE(itype, ''), 1)
+    ON CONFLICT (application_id, severity, issue_type)
+    DO UPDATE SET issue_count = c.issue_count + 1;
+
+    INSERT INTO issue_daily_counts AS c (application_id, day, severity, issue_type, issue_count)
+    VALUES (app, d, sev, COALESCE(itype, ''), 1)
+    ON CONFLICT (application_id, day, severity, issue_type)
+    DO UPDATE SET issue_count = c.issue_count + 1;
+$$ LANGUAGE sql;
+
+-- Decrements only update existing rows: when an application is deleted its
+-- rollup rows may already be gone by the time the cascaded issue deletes fire.
+CREATE FUNCTION issue_rollups_remove(app UUID, d DATE, sev TEXT, itype TEXT) RETURNS void AS $$
+    UPDATE issue_counts SET issue_count = issue_count - 1
+    WHERE application_id = app AND severity = sev AND issue_type = COALESCE(itype, '');
+
+    UPDATE issue_daily_counts SET issue_count = issue_count - 1
+    WHERE application_id = app AND day = d AND severity = sev AND issue_type = COALESCE(itype, '');
+$$ LANGUAGE sql;
+
+-- Issues created before created_at was NOT NULL may have none; count them
+-- under the day the trigger runs rather than a NULL day.
+CREATE FUNCTION issue_rollups_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.application_id IS NOT NULL THEN
+        PERFORM issue_rollups_remove(OLD.application_id, COALESCE(OLD.created_at, now())::date, OLD.severity, OLD.issue_type);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.application_id IS NOT NULL THEN
+        PERFORM issue_rollups_add(NEW.application_id, COALESCE(NEW.created_at, now())::date, NEW.severity, NEW.issue_type);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER issues_rollups
+    AFTER INSERT OR DELETE OR UPDATE OF application_id, severity, issue_type, created_at ON issues
+    FOR EACH ROW EXECUTE FUNCTION issue_rollups_trigger();
+
+-- Backfill from existing issues
+INSERT INTO issue_counts (application_id, severity, issue_type, issue_count)
+SELECT application_id, severity, COALESCE(issue_type, ''), COUNT(*)
+FROM issues
+WHERE application_id IS NOT NULL
+GROUP BY 1, 2, 3;
+
+INSERT INTO issue_daily_counts (application_id, day, severity, issue_type, issue_count)
+SELECT application_id, COALESCE(created_at, now())::date, severity, COALESCE(issue_type, ''), COUNT(*)
+FROM issues
+WHERE application_id IS NOT NULL
+GROUP BY 1, 2, 3, 4;
@@ -0,0 +1,11 @@
+-- database/05_issue_listing.sql
+-- Keyset pagination for issue lists: newest first, ties broken by id.
+
+UPDATE issues SET created_at = NOW() WHERE created_at IS NULL;
+ALTER TABLE issues ALTER COLUMN created_at SET NOT NULL;
+
+-- One index per list variant (all issues / filtered by severity). The second
+-- starts with idx_issues_app_severity's columns, which makes that one redundant.
+CREATE INDEX idx_issues_app_created ON issues (application_id, created_at DESC, id DESC);
+CREATE INDEX idx_issues_app_severity_created ON issues (application_id, severity, created_at DESC, id DESC);
+DROP INDEX IF EXISTS idx_issues_app_severity;
@@ -0,0 +1,25 @@
+-- database/06_issue_contents.sql
+-- Cold storage for extracted page text. Content is deduplicated by SHA-256
+-- and stored compressed outside the hot issues heap.
+
+-- zstd dictionaries trained on stored forum text
+CREATE TABLE content_dictionaries (
+    id              SERIAL PRIMARY KEY,
+    data            BYTEA NOT NULL,
+    created_at      TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE issue_contents (
+    content_hash    BYTEA PRIMARY KEY,     -- sha256 of the UTF-8 text
+    codec           TEXT NOT NULL CHECK (codec IN ('zstd', 'zlib')),
+    dictionary_id   INTEGER REFERENCES content_dictionaries(id),
+    raw_size        INTEGER NOT NULL,
+    data            BYTEA NOT NULL,
+    created_at      TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Already compressed: skip TOAST's own compression attempt
+ALTER TABLE issue_contents ALTER COLUMN data SET STORAGE EXTERNAL;
+
+-- issues.raw_content is kept for rows not yet moved by `main.py migrate-content`
+ALTER TABLE issues ADD COLUMN content_hash BYTEA REFERENCES issue_contents(content_hash);
@@ -0,0 +1,158 @@
+-- database/07_partition_issues.sql
+-- Partition issues by created_at month so indexes stay per-partition and old
+-- data can be dropped cheaply (see `main.py partitions`).
+--
+-- A unique constraint on a partitioned table must include the partition key,
+-- so source_url uniqueness moves to the issue_urls table, maintained by a
+-- trigger. The primary key becomes (id, created_at).
+
+ALTER TABLE issues RENAME TO issues_unpartitioned;
+
+CREATE TABLE issues (
+    id              UUID NOT NULL DEFAULT gen_random_uuid(),
+    application_id  UUID REFERENCES applications(id) ON DELETE CASCADE,
+    version_id      UUID REFERENCES versions(id) ON DELETE SET NULL,
+
+    title           TEXT NOT NULL,
+    summary         TEXT NOT NULL,
+    raw_content     TEXT,
+    content_hash    BYTEA REFERENCES issue_contents(content_hash),
+    source_type     TEXT NOT NULL,
+    source_url      TEXT NOT NULL,
+
+    severity        TEXT NOT NULL CHECK (severity IN ('critical', 'major', 'minor')),
+    issue_type      TEXT,
+
+    upvotes         INTEGER DEFAULT 0,
+    comment_count   INTEGER DEFAULT 0,
+    source_date     TIMESTAMP,
+
+    embedding       vector,
+    embedding_model TEXT,
+    embedding_dim   INTEGER,
+
+    created_at      TIMESTAMP NOT NULL DEFAULT NOW(),
+
+    CONSTRAINT issues_embedding_model_check CHECK (
+        embedding IS NULL
+        OR (embedding_model IS NOT NULL AND vector_dims(embedding) = embedding_dim)
+    )
+) PARTITION BY RANGE (created_at);
+
+-- Create the partition for the month containing `month` if missing. With
+-- app_buckets > 0 the month is sub-partitioned by hash of application_id.
+CREATE FUNCTION create_issue_partition(month DATE, app_buckets INTEGER DEFAULT 0) RETURNS TEXT AS $$
+DECLARE
+    start_date  DATE := date_trunc('month', month)::date;
+    end_date    DATE := (date_trunc('month', month) + INTERVAL '1 month')::date;
+    part_name   TEXT := 'issues_p' || to_char(month, 'YYYYMM');
+BEGIN
+    IF to_regclass(part_name) IS NOT NULL THEN
+        RETURN part_name;
+    END IF;
+
+    IF app_buckets > 0 THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF issues FOR VALUES FROM (%L) TO (%L) PARTITION BY HASH (application_id)',
+            part_name, start_date, end_date
+        );
+        FOR bucket IN 0 .. app_buckets - 1 LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES WITH (MODULUS %s, REMAINDER %s)',
+                part_name || '_h' || bucket, part_name, app_buckets, bucket
+            );
+        END LOOP;
+    ELSE
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF issues FOR VALUES FROM (%L) TO (%L)',
+            part_name, start_date, end_date
+        );
+    END IF;
+
+    RETURN part_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partitions for existing data plus two months ahead
+DO $$
+DECLARE
+    month DATE;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', COALESCE(oldest, NOW())),
+            date_trunc('month', NOW()) + INTERVAL '2 months',
+            INTERVAL '1 month'
+        )::date
+        FROM (SELECT MIN(created_at) AS oldest FROM issues_unpartitioned) s
+    LOOP
+        PERFORM create_issue_partition(month);
+    END LOOP;
+END;
+$$;
+
+-- Catches rows no monthly partition covers yet
+CREATE TABLE issues_default PARTITION OF issues DEFAULT;
+
+INSERT INTO issues (
+    id, application_id, version_id, title, summary, raw_content, content_hash,
+    source_type, source_url, severity, issue_type, upvotes, comment_count,
+    source_date, embedding, embedding_model, embedding_dim, created_at
+)
+SELECT
+    id, application_id, version_id, title, summary, raw_content, content_hash,
+    source_type, source_url, severity, issue_type, upvotes, comment_count,
+    source_date, embedding, embedding_model, embedding_dim, created_at
+FROM issues_unpartitioned;
+
+-- Global source_url dedup across partitions
+CREATE TABLE issue_urls (
+    source_url      TEXT PRIMARY KEY,
+    issue_id        UUID NOT NULL,
+    created_at      TIMESTAMP NOT NULL
+);
+
+INSERT INTO issue_urls (source_url, issue_id, created_at)
+SELECT source_url, id, created_at FROM issues_unpartitioned;
+
+CREATE INDEX idx_issue_urls_created ON issue_urls (created_at);
+
+DROP TABLE issues_unpartitioned;
+
+-- Indexes are created on the parent and cascade to every partition
+ALTER TABLE issues ADD PRIMARY KEY (id, created_at);
+CREATE INDEX idx_issues_app_created ON issues (application_id, created_at DESC, id DESC);
+CREATE INDEX idx_issues_app_severity_created ON issues (application_id, severity, created_at DESC, id DESC);
+CREATE INDEX idx_issues_version ON issues (version_id);
+CREATE INDEX idx_issues_fulltext ON issues USING gin (to_tsvector('english', title || ' ' || summary));
+
+CREATE INDEX idx_issues_embedding ON issues
+    USING hnsw ((embedding::vector(1536)) vector_cosine_ops)
+    WHERE embedding_model = 'text-embedding-3-small';
+
+CREATE INDEX idx_issues_embedding_minilm ON issues
+    USING hnsw ((embedding::vector(384)) vector_cosine_ops)
+    WHERE embedding_model = 'sentence-transformers/all-MiniLM-L6-v2';
+
+-- A duplicate source_url fails the insert, as the old UNIQUE constraint did
+CREATE FUNCTION issue_urls_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM issue_urls WHERE source_url = OLD.source_url AND issue_id = OLD.id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO issue_urls (source_url, issue_id, created_at)
+        VALUES (NEW.source_url, NEW.id, NEW.created_at);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER issues_source_url
+    AFTER INSERT OR DELETE OR UPDATE OF source_url, created_at ON issues
+    FOR EACH ROW EXECUTE FUNCTION issue_urls_trigger();
+
+-- Recreated after the copy so existing rows are not counted twice
+CREATE TRIGGER issues_rollups
+    AFTER INSERT OR DELETE OR UPDATE OF application_id, severity, issue_type, created_at ON issues
+    FOR EACH ROW EXECUTE FUNCTION issue_rollups_trigger();
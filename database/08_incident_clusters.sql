@@ -0,0 +1,19 @@
+-- database/08_incident_clusters.sql
+-- Incident clusters: groups of issues about the same underlying problem,
+-- assigned online by the crawler from issue embeddings.
+
+CREATE TABLE incident_clusters (
+    id              UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    application_id  UUID NOT NULL REFERENCES applications(id) ON DELETE CASCADE,
+    embedding_model TEXT NOT NULL,
+    centroid        vector NOT NULL,       -- unit-length mean of member embeddings
+    issue_count     INTEGER NOT NULL DEFAULT 0,
+    title           TEXT,                  -- title of the first issue, as a label
+    created_at      TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at      TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX idx_incident_clusters_app ON incident_clusters (application_id, embedding_model);
+
+ALTER TABLE issues ADD COLUMN cluster_id UUID REFERENCES incident_clusters(id) ON DELETE SET NULL;
+CREATE INDEX idx_issues_cluster ON issues (cluster_id);
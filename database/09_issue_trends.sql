@@ -0,0 +1,31 @@
+-- database/09_issue_trends.sql
+-- State of the crawler's streaming spike detector, and the spikes it found.
+
+-- One row per (application, severity, issue type) series
+CREATE TABLE trend_state (
+    application_id  UUID NOT NULL REFERENCES applications(id) ON DELETE CASCADE,
+    severity        TEXT NOT NULL,
+    issue_type      TEXT NOT NULL DEFAULT '',
+    bucket_start    TIMESTAMP NOT NULL,            -- start of the newest bucket
+    counts          INTEGER[] NOT NULL,            -- ring buffer of per-bucket counts
+    head            INTEGER NOT NULL,              -- ring index of the newest bucket
+    ewma            DOUBLE PRECISION NOT NULL DEFAULT 0,
+    ewm_var         DOUBLE PRECISION NOT NULL DEFAULT 0,
+    updated_at      TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (application_id, severity, issue_type)
+);
+
+CREATE TABLE trend_alerts (
+    id              BIGSERIAL PRIMARY KEY,
+    application_id  UUID NOT NULL REFERENCES applications(id) ON DELETE CASCADE,
+    severity        TEXT NOT NULL,
+    issue_type      TEXT NOT NULL DEFAULT '',
+    bucket_start    TIMESTAMP NOT NULL,
+    observed        INTEGER NOT NULL,
+    expected        DOUBLE PRECISION NOT NULL,
+    zscore          DOUBLE PRECISION NOT NULL,
+    created_at      TIMESTAMP NOT NULL DEFAULT NOW(),
+    UNIQUE (application_id, severity, issue_type, bucket_start)
+);
+
+CREATE INDEX idx_trend_alerts_bucket ON trend_alerts (bucket_start DESC);
@@ -0,0 +1,6 @@
+-- database/10_application_names.sql
+-- Application names are unique regardless of case, and `--app` lookups
+-- (ApplicationRepository.get_by_name) use this index instead of a full scan.
+-- Resolve any existing case-insensitive duplicates before applying.
+
+CREATE UNIQUE INDEX idx_applications_name_lower ON applications (lower(name));
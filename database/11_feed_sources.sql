@@ -0,0 +1,19 @@
+-- database/11_feed_sources.sql
+-- Feeds polled incrementally for an application (see src/sources/connectors).
+-- The cursor columns let each poll ask only for what changed since the last one.
+
+CREATE TABLE feed_sources (
+    id              UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    application_id  UUID NOT NULL REFERENCES applications(id) ON DELETE CASCADE,
+    kind            TEXT NOT NULL CHECK (kind IN ('rss', 'reddit')),
+    url             TEXT NOT NULL,
+
+    etag            TEXT,           -- validators for conditional GET
+    last_modified   TEXT,
+    last_seen       TEXT,           -- newest item timestamp already processed
+
+    last_polled_at  TIMESTAMP,
+    created_at      TIMESTAMP NOT NULL DEFAULT NOW(),
+
+    UNIQUE (application_id, url)
+);
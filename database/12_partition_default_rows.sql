@@ -0,0 +1,58 @@
+-- database/12_partition_default_rows.sql
+-- Rows that landed in issues_default before their month's partition existed
+-- made create_issue_partition fail ("updated partition constraint for default
+-- partition would be violated"). The partition is now built detached, the
+-- month's rows are moved out of the default partition into it, and it is
+-- attached afterwards. Moving rows between detached tables fires no triggers,
+-- so the rollups and issue_urls are left as they are.
+
+CREATE OR REPLACE FUNCTION create_issue_partition(month DATE, app_buckets INTEGER DEFAULT 0) RETURNS TEXT AS $$
+DECLARE
+    start_date  DATE := date_trunc('month', month)::date;
+    end_date    DATE := (date_trunc('month', month) + INTERVAL '1 month')::date;
+    part_name   TEXT := 'issues_p' || to_char(month, 'YYYYMM');
+    move_rows   BOOLEAN := FALSE;
+BEGIN
+    IF to_regclass(part_name) IS NOT NULL THEN
+        RETURN part_name;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE issues INCLUDING DEFAULTS INCLUDING CONSTRAINTS)%s',
+        part_name, CASE WHEN app_buckets > 0 THEN ' PARTITION BY HASH (application_id)' ELSE '' END
+    );
+    FOR bucket IN 0 .. app_buckets - 1 LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF %I FOR VALUES WITH (MODULUS %s, REMAINDER %s)',
+            part_name || '_h' || bucket, part_name, app_buckets, bucket
+        );
+    END LOOP;
+
+    IF to_regclass('issues_default') IS NOT NULL THEN
+        EXECUTE format(
+            'SELECT EXISTS (SELECT 1 FROM issues_default WHERE created_at >= %L AND created_at < %L)',
+            start_date, end_date
+        ) INTO move_rows;
+    END IF;
+
+    IF move_rows THEN
+        ALTER TABLE issues DETACH PARTITION issues_default;
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM issues_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+            'INSERT INTO %I SELECT * FROM moved',
+            start_date, end_date, part_name
+        );
+    END IF;
+
+    EXECUTE format(
+        'ALTER TABLE issues ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        part_name, start_date, end_date
+    );
+
+    IF move_rows THEN
+        ALTER TABLE issues ATTACH PARTITION issues_default DEFAULT;
+    END IF;
+
+    RETURN part_name;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,16 @@
+-- database/13_crawl_schedule.sql
+-- Per-application cadence learned by `main.py serve` (see src/scheduler.py),
+-- so a restarted daemon resumes its schedule instead of crawling every
+-- application at once.
+
+CREATE TABLE crawl_schedule (
+    application_id  UUID PRIMARY KEY REFERENCES applications(id) ON DELETE CASCADE,
+    next_run        TIMESTAMP NOT NULL,
+    interval_secs   DOUBLE PRECISION NOT NULL,
+    yield_ewma      DOUBLE PRECISION NOT NULL,   -- new issues per crawl
+    crawls          INTEGER NOT NULL DEFAULT 0,
+    last_run        TIMESTAMP,
+    last_new        INTEGER,
+    last_error      TEXT,
+    updated_at      TIMESTAMP NOT NULL DEFAULT NOW()
+);
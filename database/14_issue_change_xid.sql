@@ -0,0 +1,25 @@
+-- database/14_issue_change_xid.sql
+-- Id of the transaction that last inserted or updated each issue, so the
+-- Parquet export (src/export.py) can pick up every change exactly once.
+-- created_at is not a usable watermark: spooled issues carry the time they
+-- were spooled, and NOW() is the transaction start, so rows commit out of
+-- created_at order; updates (cluster_id, re-embeddings) never change it.
+--
+-- The export reads up to pg_snapshot_xmin(), below which every transaction
+-- has finished, and resumes from there next time.
+
+-- Existing rows get 0 so the first export includes them
+ALTER TABLE issues ADD COLUMN change_xid xid8 NOT NULL DEFAULT '0';
+
+CREATE FUNCTION issues_change_xid_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.change_xid := pg_current_xact_id();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER issues_change_xid
+    BEFORE INSERT OR UPDATE ON issues
+    FOR EACH ROW EXECUTE FUNCTION issues_change_xid_trigger();
+
+CREATE INDEX idx_issues_change_xid ON issues (change_xid);
@@ -0,0 +1,6 @@
+-- database/15_issue_content_hash_index.sql
+-- Retention deletes issue_contents rows no longer referenced by any issue
+-- (see PartitionManager.drop). Each delete checks the issues foreign key, and
+-- without an index on the referencing column every check scans issues.
+
+CREATE INDEX idx_issues_content_hash ON issues (content_hash);